@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Audio Fingerprinting
+Compact acoustic fingerprints used to find duplicate recordings before transcription
+"""
+
+import bisect
+import numpy as np
+from voice_activity import SAMPLE_RATE, detect_speech
+
+FRAME_SIZE = 4096
+HOP_SIZE = 1024
+NUM_BANDS = 33
+MIN_FREQ = 200
+MAX_FREQ = 4000
+# Frames transformed at once; bounds the spectrum's memory (~50 MB) whatever the length
+BLOCK_FRAMES = 1024
+
+# Fraction of differing bits below which two recordings count as the same.
+# Re-encodes of one recording differ in roughly 5-20% of bits (up to ~30% with
+# added noise), unrelated audio in about 50%.
+DEFAULT_THRESHOLD = 0.35
+MAX_OFFSET_FRAMES = 4
+MIN_LENGTH_RATIO = 0.9
+
+def fingerprint(audio, sample_rate=SAMPLE_RATE):
+    """
+    Compute a fingerprint of a waveform
+    
+    One 32-bit word per 64 ms frame. Each bit is the sign of the change, from
+    one frame to the next, of the energy difference between two adjacent
+    frequency bands. That survives re-encoding, resampling and volume changes.
+    Leading and trailing silence is dropped so copies with different padding
+    still line up.
+    
+    Args:
+        audio (np.ndarray): Mono float32 waveform
+        sample_rate (int): Sample rate of the waveform
+    
+    Returns:
+        np.ndarray: uint32 words, one per frame (empty for very short audio)
+    """
+    audio = np.asarray(audio, dtype=np.float32)
+    regions = detect_speech(audio, sample_rate)
+    if regions:
+        audio = audio[regions[0][0]:regions[-1][1]]
+    
+    num_frames = 1 + (len(audio) - FRAME_SIZE) // HOP_SIZE
+    if num_frames < 2:
+        return np.zeros(0, dtype=np.uint32)
+    
+    # Log-spaced band edges, as FFT bin indices
+    edges = np.geomspace(MIN_FREQ, MAX_FREQ, NUM_BANDS + 1) * FRAME_SIZE / sample_rate
+    edges = np.unique(np.round(edges).astype(int))
+    window = np.hanning(FRAME_SIZE).astype(np.float32)
+    
+    # Only the band energies are kept for the whole recording, not the spectrum
+    blocks = []
+    for first in range(0, num_frames, BLOCK_FRAMES):
+        starts = np.arange(first, min(first + BLOCK_FRAMES, num_frames)) * HOP_SIZE
+        frames = audio[starts[:, None] + np.arange(FRAME_SIZE)] * window
+        power = np.abs(np.fft.rfft(frames, axis=1)) ** 2
+        blocks.append(np.add.reduceat(power, edges[:-1], axis=1)[:, :NUM_BANDS])
+    bands = np.concatenate(blocks)
+    
+    band_diff = bands[:, :-1] - bands[:, 1:]
+    bits = (band_diff[1:] - band_diff[:-1]) > 0
+    
+    weights = (1 << np.arange(bits.shape[1], dtype=np.uint64)).astype(np.uint64)
+    return (bits.astype(np.uint64) @ weights).astype(np.uint32)
+
+def fingerprint_file(file_path):
+    """Decode an audio file and return its fingerprint"""
+    import whisper
+    return fingerprint(whisper.load_audio(str(file_path)))
+
+def bit_error_rate(a, b, max_offset=MAX_OFFSET_FRAMES):
+    """
+    Fraction of differing bits between two fingerprints at their best alignment
+    
+    Args:
+        a (np.ndarray): Fingerprint
+        b (np.ndarray): Fingerprint
+        max_offset (int): Largest shift, in frames, tried in either direction
+    
+    Returns:
+        float: 0.0 for identical fingerprints, about 0.5 for unrelated audio
+    """
+    best = 1.0
+    for offset in range(-max_offset, max_offset + 1):
+        x = a[max(0, offset):]
+        y = b[max(0, -offset):]
+        n = min(len(x), len(y))
+        if n == 0:
+            continue
+        differing = np.unpackbits((x[:n] ^ y[:n]).view(np.uint8)).sum()
+        best = min(best, differing / (32.0 * n))
+    return best
+
+def group_duplicates(fingerprints, threshold=DEFAULT_THRESHOLD):
+    """
+    Group recordings whose fingerprints match
+    
+    Each recording is compared with the first member of every existing group
+    of similar length, and joins the first group it matches.
+    
+    Args:
+        fingerprints (list): Fingerprints, or None where a file could not be decoded
+        threshold (float): Largest bit error rate still counted as a match
+    
+    Returns:
+        list: Groups of indices into fingerprints, in input order; files that
+              match nothing form groups of one
+    """
+    groups = []
+    # (length, group index) of each group's first member, sorted by length
+    leaders = []
+    
+    for index, fp in enumerate(fingerprints):
+        match = None
+        if fp is not None and len(fp):
+            low = bisect.bisect_left(leaders, (len(fp) * MIN_LENGTH_RATIO, -1))
+            high = bisect.bisect_right(leaders, (len(fp) / MIN_LENGTH_RATIO, len(fingerprints)))
+            for _, group in leaders[low:high]:
+                if bit_error_rate(fp, fingerprints[groups[group][0]]) <= threshold:
+                    match = group
+                    break
+        
+        if match is None:
+            groups.append([index])
+            if fp is not None and len(fp):
+                bisect.insort(leaders, (len(fp), len(groups) - 1))
+        else:
+            groups[match].append(index)
+    
+    return groups
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Batch Schedule
+Order batch jobs by audio duration and estimate the time left from the measured real-time factor
+"""
+
+import os
+import time
+import wave
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+SCHEDULES = ["fifo", "shortest", "longest"]
+
+def probe_duration(audio_file):
+    """
+    Duration of an audio file from its container headers, without decoding the audio
+
+    Uses ffprobe (shipped with ffmpeg), or the header itself for WAV files.
+
+    Returns:
+        float: Seconds, or None if it cannot be read
+    """
+    command = [
+        "ffprobe", "-v", "error", "-show_entries", "format=duration",
+        "-of", "default=noprint_wrappers=1:nokey=1", str(audio_file)
+    ]
+    try:
+        output = subprocess.run(command, capture_output=True, text=True, timeout=30).stdout
+        return float(output.strip())
+    except (OSError, ValueError, subprocess.TimeoutExpired):
+        pass
+
+    try:
+        with wave.open(str(audio_file), 'rb') as f:
+            return f.getnframes() / f.getframerate()
+    except (OSError, EOFError, wave.Error):
+        return None
+
+def probe_durations(audio_files):
+    """
+    Read the durations of many files at once
+
+    Returns:
+        dict: str(audio_file) -> seconds or None
+    """
+    # ffprobe runs in subprocesses, so threads overlap well
+    with ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as executor:
+        durations = list(executor.map(probe_duration, audio_files))
+    return {str(audio_file): duration for audio_file, duration in zip(audio_files, durations)}
+
+def order_jobs(jobs, durations, policy="fifo"):
+    """
+    Order (audio_file, output_file) jobs by a scheduling policy
+
+    "shortest" gets short recordings done first, "longest" starts long ones
+    first so a pool of workers finishes together, "fifo" keeps the given
+    order. Files whose duration is unknown go last and keep their order.
+    """
+    if policy == "fifo":
+        return list(jobs)
+    if policy not in SCHEDULES:
+        raise ValueError(f"unknown schedule '{policy}' (choose from {', '.join(SCHEDULES)})")
+
+    known = [job for job in jobs if durations.get(str(job[0])) is not None]
+    unknown = [job for job in jobs if durations.get(str(job[0])) is None]
+    known.sort(key=lambda job: durations[str(job[0])], reverse=policy == "longest")
+    return known + unknown
+
+def format_duration(seconds):
+    """Short human-readable duration such as 45s, 12m 03s or 2h 05m"""
+    seconds = int(round(seconds))
+    if seconds < 60:
+        return f"{seconds}s"
+    if seconds < 3600:
+        return f"{seconds // 60}m {seconds % 60:02d}s"
+    return f"{seconds // 3600}h {seconds % 3600 // 60:02d}m"
+
+class RunProgress:
+    def __init__(self, durations, start=None):
+        """
+        Track audio left in a run and estimate when it will be done
+
+        Args:
+            durations (dict): str(audio_file) -> seconds (None if unknown) for every job
+            start (float): time.perf_counter() when the run started (default: now)
+        """
+        known = [seconds for seconds in durations.values() if seconds is not None]
+        # Files without a duration are assumed to be as long as the average one
+        average = sum(known) / len(known) if known else 0.0
+        self.durations = {
+            audio_file: seconds if seconds is not None else average
+            for audio_file, seconds in durations.items()
+        }
+        self.remaining_seconds = sum(self.durations.values())
+        self.processed_seconds = 0.0
+        self.start = start if start is not None else time.perf_counter()
+
+    def finish(self, audio_file, measured=True):
+        """
+        Count one job as done
+
+        Args:
+            audio_file: The job's audio file
+            measured (bool): Whether the model transcribed it; cache hits and
+                             failures say nothing about the model's speed
+        """
+        seconds = self.durations.pop(str(audio_file), 0.0)
+        self.remaining_seconds = max(0.0, self.remaining_seconds - seconds)
+        if measured:
+            self.processed_seconds += seconds
+
+    def real_time_factor(self):
+        """Wall time per second of audio so far (None until something was transcribed)"""
+        if self.processed_seconds <= 0:
+            return None
+        return (time.perf_counter() - self.start) / self.processed_seconds
+
+    def describe(self):
+        """ETA note for a status line (empty until there is a measured rate)"""
+        rtf = self.real_time_factor()
+        if rtf is None or not self.durations:
+            return ""
+        eta = self.remaining_seconds * rtf
+        return (f" [ETA {format_duration(eta)}, {format_duration(self.remaining_seconds)} "
+                f"of audio left, RTF {rtf:.2f}]")
@@ -5,19 +5,245 @@ Process multiple audio files at once using OpenAI Whisper
 """
 
 import os
-import glob
-import whisper
+import queue
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import time
 import argparse
+from transcript_cache import TranscriptCache, DEFAULT_CACHE_SIZE_MB
+from completion_journal import CompletionJournal
+from voice_activity import (SAMPLE_RATE, transcribe_speech_only, describe_skipped, detect_speech,
+                            extract_speech, remap_timestamps, speech_stats)
+from model_registry import QUANTIZE_MODES, get_model, quantized_name
+from stage_metrics import StageMetrics, transcribe_timed
+from audio_fingerprint import fingerprint_file, group_duplicates
+from segment_stream import PCMWindowReader, transcribe_windows
+from output_writers import FORMATS, output_paths, parse_formats, write_outputs
+from transcript_store import TranscriptStore
+from model_cascade import DEFAULT_THRESHOLDS, CascadeReport, transcribe_cascade
+from thread_profile import best_layout, set_torch_threads
+from batch_schedule import SCHEDULES, RunProgress, format_duration, order_jobs, probe_durations
+from language_hints import HINT_FILE, LanguageResolver
+
+def write_transcript(output_file, audio_name, model_size, result, formats=("txt",)):
+    """
+    Write a result in every requested format, txt with the standard batch header
+    
+    Args:
+        output_file (Path): Transcript path; other formats replace its extension
+        audio_name (str): Audio file name for the header
+        model_size (str): Whisper model size for the header
+        result (dict): Whisper result
+        formats (list): Output formats
+    """
+    header = (f"File: {audio_name}\n"
+              f"Model: {model_size}\n"
+              f"Timestamp: {time.strftime('%Y-%m-%d %H:%M:%S')}\n"
+              + "-" * 40 + "\n\n")
+    write_outputs(result, output_paths(output_file, formats), header)
+
+# Supported audio extensions
+AUDIO_EXTENSIONS = ['.mp3', '.wav', '.m4a', '.flac', '.ogg', '.aac']
+
+# Clips up to this long fit in one Whisper window, so several can share a batch
+BATCH_CLIP_SECONDS = 30
+
+# Files fingerprinted at once when looking for duplicates
+FINGERPRINT_WORKERS = 4
+
+def decode_batch(model, audios, language=None):
+    """
+    Transcribe several short clips with one encoder and one decoder pass
+    
+    Each clip is padded to Whisper's 30-second window and the log-mel
+    spectrograms are stacked, so the model runs on the whole batch at once.
+    Greedy decoding without timestamps, like a single transcribe window at
+    temperature 0; the language is detected per clip.
+    
+    Args:
+        model: Loaded Whisper model
+        audios (list): Waveforms of at most 30 seconds each
+        language (str): Language of every clip (default: detected per clip)
+    
+    Returns:
+        list: whisper.DecodingResult for each clip, in order
+    """
+    import torch
+    import whisper
+    n_mels = getattr(getattr(model, "dims", None), "n_mels", 80)
+    mel = torch.stack([
+        whisper.log_mel_spectrogram(whisper.pad_or_trim(audio), n_mels) for audio in audios
+    ])
+    options = whisper.DecodingOptions(
+        task="transcribe", language=language, without_timestamps=True,
+        fp16=model.device.type == "cuda"
+    )
+    return whisper.decode(model, mel.to(model.device), options)
+
+def _needs_fallback(decoded):
+    """Whether a batched result fails the checks transcribe uses to retry at higher temperature"""
+    if decoded.no_speech_prob > 0.6 and decoded.avg_logprob < -1.0:
+        return False
+    return decoded.compression_ratio > 2.4 or decoded.avg_logprob < -1.0
+
+def _batch_result(decoded, duration):
+    """Turn a DecodingResult into the result dict model.transcribe would return"""
+    # Whisper treats a confident "no speech" with poor text as silence
+    silent = decoded.no_speech_prob > 0.6 and decoded.avg_logprob < -1.0
+    text = "" if silent else decoded.text
+    segments = []
+    if text.strip():
+        segments.append({
+            "id": 0, "seek": 0, "start": 0.0, "end": round(duration, 3), "text": text,
+            "tokens": list(decoded.tokens), "temperature": decoded.temperature,
+            "avg_logprob": decoded.avg_logprob, "compression_ratio": decoded.compression_ratio,
+            "no_speech_prob": decoded.no_speech_prob,
+        })
+    return {"text": text, "segments": segments, "language": decoded.language}
+
+def _worker_main(config, task_queue, result_queue):
+    """
+    Worker process entry point for parallel batch transcription
+    
+    Each worker loads its own model, limits torch to its share of the
+    threads and pulls (index, audio_file, output_file) jobs from the shared
+    queue until it receives None.
+    """
+    import torch
+    config = dict(config)
+    torch.set_num_threads(config.pop("threads"))
+    duplicates = config.pop("duplicates")
+    language_samples = config.pop("language_samples")
+    
+    transcriber = BatchTranscriber(workers=1, **config)
+    transcriber.duplicates = duplicates
+    transcriber.languages.samples = language_samples
+    # Reported once, with this worker's first finished file
+    model_load_time = transcriber.model_load_time
+    
+    while True:
+        job = task_queue.get()
+        if job is None:
+            break
+        
+        index, audio_file, output_file = job
+        try:
+            info = transcriber._process_file(audio_file, output_file)
+            if model_load_time is not None:
+                info["model_load"] = model_load_time
+                model_load_time = None
+            result_queue.put((index, True, info))
+        except Exception as e:
+            result_queue.put((index, False, str(e)))
 
 class BatchTranscriber:
-    def __init__(self, model_size="base"):
-        """Initialize batch transcriber with specified model"""
-        print(f"Loading Whisper model: {model_size}")
-        self.model = whisper.load_model(model_size)
+    def __init__(self, model_size="base", workers=1, use_cache=True, cache_dir=None,
+                 cache_size_mb=DEFAULT_CACHE_SIZE_MB, resume=True, prefetch=0, vad=False,
+                 metrics=False, dedupe=False, batch_size=1, stream_decode=False, formats=None,
+                 db_path=None, write_files=True, cascade=None, cascade_thresholds=None,
+                 threads=None, schedule="fifo", language=None):
+        """
+        Initialize batch transcriber with specified model
+        
+        Args:
+            model_size (str): Whisper model size to use
+            workers (int): Number of worker processes (1 = transcribe in this process)
+            use_cache (bool): Reuse cached results for audio transcribed before
+            cache_dir (str): Transcript cache directory (optional)
+            cache_size_mb (float): Transcript cache size limit in MB
+            resume (bool): Skip files the output journal records as done and unchanged
+            prefetch (int): Files to decode ahead of the model in a pipelined run (0 = off)
+            vad (bool): Skip silence with voice activity detection before transcribing
+            metrics (bool): Time every stage of every file for export with StageMetrics
+            dedupe (bool): Transcribe duplicate recordings once and copy the transcript
+            batch_size (int): Short files (up to 30 s) transcribed together per model call (1 = off)
+            stream_decode (bool): Decode and transcribe each file window by window so memory
+                                  use does not depend on recording length
+            formats (list): Output formats written for every file (default: txt)
+            db_path (str): Also store every transcript in this SQLite database (optional)
+            write_files (bool): Write transcript files; with db_path off, only the database
+            cascade (str): Larger model size for segments model_size is unsure of (optional)
+            cascade_thresholds (dict): Escalation limits (default: model_cascade.DEFAULT_THRESHOLDS)
+            threads (int): Torch threads per process (default: the cores shared evenly)
+            schedule (str): Job order by audio duration: fifo, shortest or longest
+            language (str): Language code for every file, "auto" to detect it once per
+                            directory, or None; hint files apply unless a code is given
+        """
         self.model_size = model_size
+        self.workers = max(1, int(workers))
+        self.threads = max(1, int(threads)) if threads else None
+        self.schedule = schedule
+        self.languages = LanguageResolver(language)
+        # Audio left and ETA of the run in progress, and jobs finished before it was known
+        self.progress = None
+        self._finished_early = None
+        self._progress_lock = threading.Lock()
+        self.model = None
+        self.cache = TranscriptCache(cache_dir, cache_size_mb) if use_cache else None
+        self.cache_hits = 0
+        self.resume = resume
+        self.skipped = 0
+        self._journals = {}
+        self.prefetch = max(0, int(prefetch))
+        self.stage_times = {}
+        self.vad = vad
+        self.vad_totals = {"total_seconds": 0.0, "skipped_seconds": 0.0}
+        self.metrics = StageMetrics("batch", model_size) if metrics else None
+        self.model_load_time = None
+        self.dedupe = dedupe
+        # Transcribed audio file -> (audio_file, output_file) of its duplicates
+        self.duplicates = {}
+        self.duplicate_counts = {"successful": 0, "failed": 0}
+        self.batch_size = max(1, int(batch_size))
+        self.batch_fallbacks = 0
+        self.stream_decode = stream_decode
+        self.formats = list(formats or ["txt"])
+        self.write_files = write_files
+        # Only this process writes to the database; workers send their results back
+        self.store = TranscriptStore(db_path) if db_path else None
+        self.cascade = cascade
+        self.cascade_thresholds = dict(DEFAULT_THRESHOLDS, **(cascade_thresholds or {}))
+        self.cascade_report = CascadeReport(model_size, cascade) if cascade else None
+        
+        # Options that change the result, and so belong in the cache key
+        self.cache_options = {"vad": True} if vad else {}
+        if self.batch_size > 1:
+            # Batched results have a single segment per file
+            self.cache_options["batched"] = True
+        if stream_decode:
+            # Windows are transcribed separately, so segment boundaries can differ
+            self.cache_options["streamed"] = True
+        if cascade:
+            self.cache_options["cascade"] = {"model": cascade, "thresholds": self.cascade_thresholds}
         
+        # Settings each worker process needs to rebuild an equivalent transcriber
+        self._worker_config = {
+            "model_size": model_size,
+            "use_cache": use_cache,
+            "cache_dir": cache_dir,
+            "cache_size_mb": cache_size_mb,
+            "vad": vad,
+            "metrics": metrics,
+            "stream_decode": stream_decode,
+            "formats": self.formats,
+            "write_files": write_files,
+            "cascade": cascade,
+            "cascade_thresholds": cascade_thresholds,
+            "language": language,
+        }
+        
+        # With a worker pool every process loads its own model instead
+        if self.workers == 1:
+            if self.threads:
+                set_torch_threads(self.threads)
+            start = time.perf_counter()
+            self.model = get_model(model_size)
+            self.model_load_time = time.perf_counter() - start
+            if self.metrics is not None:
+                self.metrics.observe("model_load", self.model_load_time)
+    
     def transcribe_folder(self, folder_path, output_dir=None, file_pattern="*"):
         """
         Transcribe all audio files in a folder
@@ -31,14 +257,11 @@ class BatchTranscriber:
             print(f"Error: Folder '{folder_path}' not found.")
             return
         
-        # Supported audio extensions
-        audio_extensions = ['.mp3', '.wav', '.m4a', '.flac', '.ogg', '.aac']
-        
         # Find audio files
         audio_files = []
         folder_path = Path(folder_path)
         
-        for ext in audio_extensions:
+        for ext in AUDIO_EXTENSIONS:
             pattern = file_pattern.replace('*', f'*{ext}')
             audio_files.extend(folder_path.glob(pattern))
         
@@ -57,46 +280,14 @@ class BatchTranscriber:
         print(f"Output directory: {output_dir}")
         print("-" * 50)
         
-        successful = 0
-        failed = 0
-        start_time = time.time()
+        jobs = [
+            (audio_file, output_dir / self.output_name(audio_file))
+            for audio_file in audio_files
+        ]
         
-        for i, audio_file in enumerate(audio_files, 1):
-            print(f"[{i}/{len(audio_files)}] Processing: {audio_file.name}")
-            
-            try:
-                # Transcribe
-                result = self.model.transcribe(str(audio_file))
-                transcript = result["text"].strip()
-                
-                # Save transcript
-                output_file = output_dir / f"{audio_file.stem}_transcript.txt"
-                with open(output_file, 'w', encoding='utf-8') as f:
-                    f.write(f"File: {audio_file.name}\n")
-                    f.write(f"Model: {self.model_size}\n")
-                    f.write(f"Timestamp: {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
-                    f.write("-" * 40 + "\n\n")
-                    f.write(transcript)
-                
-                print(f"  ✓ Saved to: {output_file.name}")
-                successful += 1
-                
-            except Exception as e:
-                print(f"  ✗ Failed: {str(e)}")
-                failed += 1
-            
-            print()
-        
-        # Summary
-        total_time = time.time() - start_time
-        print("=" * 50)
-        print("BATCH TRANSCRIPTION COMPLETE")
-        print("=" * 50)
-        print(f"Total files processed: {len(audio_files)}")
-        print(f"Successful: {successful}")
-        print(f"Failed: {failed}")
-        print(f"Total time: {total_time:.2f} seconds")
-        print(f"Average time per file: {total_time/len(audio_files):.2f} seconds")
+        start_time = time.time()
+        successful, failed = self._run_jobs(jobs)
+        self._print_summary(len(audio_files), successful, failed, time.time() - start_time)
     
     def transcribe_file_list(self, file_list, output_dir=None):
         """
@@ -114,58 +305,744 @@ class BatchTranscriber:
         print(f"Output directory: {output_dir or 'Same as input files'}")
         print("-" * 50)
         
-        successful = 0
-        failed = 0
         start_time = time.time()
+        jobs = []
+        missing = 0
         
-        for i, file_path in enumerate(file_list, 1):
+        for file_path in file_list:
             file_path = Path(file_path)
             
             if not file_path.exists():
-                print(f"[{i}/{len(file_list)}] ✗ File not found: {file_path}")
-                failed += 1
+                print(f"✗ File not found: {file_path}")
+                missing += 1
                 continue
             
-            print(f"[{i}/{len(file_list)}] Processing: {file_path.name}")
+            # Determine output file path
+            if output_dir:
+                output_file = output_dir / self.output_name(file_path)
+            else:
+                output_file = file_path.parent / self.output_name(file_path)
+            
+            jobs.append((file_path, output_file))
+        
+        successful, failed = self._run_jobs(jobs)
+        self._print_summary(len(file_list), successful, failed + missing, time.time() - start_time)
+    
+    def output_name(self, audio_file):
+        """
+        Name of the transcript for an audio file, in the first output format
+        
+        The journal tracks this file; the other formats are written next to it.
+        """
+        return f"{Path(audio_file).stem}_transcript.{self.formats[0]}"
+    
+    def _decode(self, audio_file):
+        """
+        Decode stage: look the file up in the cache, otherwise decode it to a waveform
+        
+        With stream_decode the waveform is a PCMWindowReader that decodes
+        lazily while the model works through it.
+        
+        Returns:
+            tuple: (cache key, cached result or None, 16 kHz waveform or None)
+        """
+        cache_key = None
+        if self.cache is not None:
+            options = self.cache_options
+            language = self._language(audio_file)
+            if language:
+                options = dict(options, language=language)
+            cache_key = self.cache.make_key(audio_file, self.model_size, options)
+            result = self.cache.get(cache_key)
+            if result is not None:
+                return cache_key, result, None
+        
+        if self.stream_decode:
+            return cache_key, None, PCMWindowReader(audio_file)
+        
+        import whisper
+        return cache_key, None, whisper.load_audio(str(audio_file))
+    
+    def _language(self, audio_file):
+        """Language passed to Whisper for a file (None lets it detect the language)"""
+        return self.languages.language_for(self.model, audio_file)
+    
+    def _infer(self, audio, cache_key=None, timings=None, language=None):
+        """Inference stage: transcribe a decoded waveform and cache the result"""
+        options = {"language": language} if language else {}
+        if isinstance(audio, PCMWindowReader):
+            result = transcribe_windows(self.model, audio, vad=self.vad,
+                                        timings=timings if self.metrics is not None else None,
+                                        **options)
+            # Decoding happened inside the model loop; book it under decode instead
+            if timings is not None:
+                timings["decode"] = timings.get("decode", 0.0) + audio.decode_seconds
+                if "decoder" in timings:
+                    timings["decoder"] = max(0.0, timings["decoder"] - audio.decode_seconds)
+        elif self.cascade:
+            result = transcribe_cascade(self.model, audio, self.cascade, self.cascade_thresholds,
+                                        vad=self.vad, **options)
+        elif self.metrics is not None:
+            result = transcribe_timed(self.model, audio, timings, vad=self.vad, **options)
+        elif self.vad:
+            result = transcribe_speech_only(self.model, audio, **options)
+        else:
+            result = self.model.transcribe(audio, **options)
+        if cache_key is not None:
+            self.cache.put(cache_key, result)
+        return result
+    
+    @staticmethod
+    def _audio_seconds(audio):
+        """Duration of a decoded waveform (known for a PCMWindowReader once it has been read)"""
+        if audio is None:
+            return None
+        if isinstance(audio, PCMWindowReader):
+            return audio.duration
+        return len(audio) / SAMPLE_RATE
+    
+    def _write(self, audio_file, output_file, result):
+        """Write stage: save the transcript for one file and any duplicates of it"""
+        if not self.write_files:
+            return
+        write_transcript(output_file, Path(audio_file).name, self.model_size, result, self.formats)
+        for duplicate_audio, duplicate_output in self.duplicates.get(str(audio_file), []):
+            write_transcript(duplicate_output, Path(duplicate_audio).name, self.model_size, result,
+                             self.formats)
+    
+    def _process_file(self, audio_file, output_file):
+        """
+        Transcribe one file with this process's model and save the transcript
+        
+        Returns:
+            dict: Per-file details for the summary
+        """
+        timings = {}
+        
+        start = time.perf_counter()
+        cache_key, result, audio = self._decode(audio_file)
+        timings["decode"] = time.perf_counter() - start
+        
+        cached = result is not None
+        if not cached:
+            start = time.perf_counter()
+            result = self._infer(audio, cache_key, timings, self._language(audio_file))
+            timings["inference"] = time.perf_counter() - start
+            if isinstance(audio, PCMWindowReader):
+                timings["inference"] -= audio.decode_seconds
+        audio_seconds = self._audio_seconds(audio)
+        
+        start = time.perf_counter()
+        self._write(audio_file, output_file, result)
+        timings["write"] = time.perf_counter() - start
+        
+        return {"cached": cached, "timings": timings, "vad": result.get("vad"),
+                "cascade": None if cached else result.get("cascade"),
+                "audio_seconds": audio_seconds, "result": result}
+    
+    
+    def transcribe_job(self, audio_file, output_file):
+        """
+        Transcribe one file with the in-process model and record the outcome
+        
+        Args:
+            audio_file (Path): Audio file to transcribe
+            output_file (Path): Transcript to write
+        
+        Returns:
+            tuple: (True, per-file details) on success, (False, error message) on failure
+        """
+        try:
+            info = self._process_file(audio_file, output_file)
+        except Exception as e:
+            self._job_finished(audio_file, output_file, False, str(e))
+            return False, str(e)
+        self._job_finished(audio_file, output_file, True, info)
+        return True, info
+    
+    @staticmethod
+    def _describe(info):
+        """Extra detail appended to a file's status line"""
+        details = []
+        if info["cached"]:
+            details.append("cached")
+        if info.get("vad"):
+            details.append("VAD " + describe_skipped(info["vad"]))
+        if info.get("cascade") and info["cascade"]["escalated_segments"]:
+            cascade = info["cascade"]
+            details.append(f"{cascade['escalated_segments']} of {cascade['segments']} segments "
+                           f"redone with {cascade['model']}")
+        if info.get("duplicates"):
+            details.append(f"also saved for {info['duplicates']} duplicates")
+        return f" ({'; '.join(details)})" if details else ""
+    
+    def _eta(self):
+        """ETA note for status lines while a run is in progress"""
+        return self.progress.describe() if self.progress is not None else ""
+    
+    def _destination(self, output_file):
+        """Where a transcript went, for status lines"""
+        return output_file if self.write_files else self.store.db_path
+    
+    def _is_done(self, audio_file, output_file):
+        """Whether an earlier run already transcribed this unchanged file"""
+        if not self.write_files:
+            return self.store.is_complete(audio_file, self.model_size)
+        return self._journal_for(output_file).is_complete(audio_file, self.model_size, output_file)
+    
+    def _journal_for(self, output_file):
+        """Return the completion journal of the directory a transcript goes to"""
+        output_dir = Path(output_file).parent
+        if output_dir not in self._journals:
+            self._journals[output_dir] = CompletionJournal(output_dir)
+        return self._journals[output_dir]
+    
+    def _job_finished(self, audio_file, output_file, ok, info):
+        """Record the outcome of one job in the journal, the database and the run counters"""
+        duplicates = self.duplicates.get(str(audio_file), [])
+        result = info.pop("result", None) if ok else None
+        if self.store is not None and result is not None:
+            for stored_audio in [audio_file] + [duplicate for duplicate, _ in duplicates]:
+                self.store.add(stored_audio, result, self.model_size, info["timings"],
+                               info.get("audio_seconds"))
+        # Without transcript files the database is the resume state: nothing goes in the output folder
+        if self.write_files:
+            for duplicate_audio, duplicate_output in duplicates:
+                self._journal_for(duplicate_output).record(
+                    duplicate_audio, self.model_size, duplicate_output, ok,
+                    error=None if ok else info
+                )
+        self.duplicate_counts["successful" if ok else "failed"] += len(duplicates)
+        
+        if ok:
+            info["duplicates"] = len(duplicates)
+            self.cache_hits += info["cached"]
+            for stage, seconds in info["timings"].items():
+                self.stage_times[stage] = self.stage_times.get(stage, 0.0) + seconds
+            if info.get("vad"):
+                for key in self.vad_totals:
+                    self.vad_totals[key] += info["vad"][key]
+            if info.get("cascade") and self.cascade_report is not None:
+                self.cascade_report.add(info["cascade"])
+        if self.metrics is not None:
+            if not ok:
+                self.metrics.record_file(audio_file, ok=False)
+            else:
+                if "model_load" in info:
+                    self.metrics.observe("model_load", info["model_load"])
+                self.metrics.record_file(audio_file, info["timings"], info.get("audio_seconds"),
+                                         cached=info["cached"])
+        if self.write_files:
+            self._journal_for(output_file).record(
+                audio_file, self.model_size, output_file, ok,
+                error=None if ok else info
+            )
+        with self._progress_lock:
+            if self.progress is not None:
+                self.progress.finish(audio_file, measured=ok and not info["cached"])
+            elif self._finished_early is not None:
+                self._finished_early.append((audio_file, ok and not info["cached"]))
+    
+    def _run_jobs(self, jobs):
+        """Run (audio_file, output_file) jobs and return (successful, failed)"""
+        self.cache_hits = 0
+        self.skipped = 0
+        self.stage_times = {}
+        self.vad_totals = {"total_seconds": 0.0, "skipped_seconds": 0.0}
+        self.duplicates = {}
+        self.duplicate_counts = {"successful": 0, "failed": 0}
+        self.batch_fallbacks = 0
+        if self.cascade:
+            self.cascade_report = CascadeReport(self.model_size, self.cascade)
+        
+        if self.resume:
+            pending = [
+                (audio_file, output_file) for audio_file, output_file in jobs
+                if not self._is_done(audio_file, output_file)
+            ]
+            self.skipped = len(jobs) - len(pending)
+            if self.skipped:
+                print(f"Resuming: skipping {self.skipped} files already transcribed")
+                print()
+            jobs = pending
+        
+        if self.dedupe and len(jobs) > 1:
+            jobs = self._drop_duplicates(jobs)
+        
+        if not jobs:
+            return 0, 0
+        
+        if self.schedule == "fifo":
+            # The order does not depend on durations, so the first file need not wait for them
+            self._probe_in_background([audio_file for audio_file, _ in jobs])
+            print(f"Files to transcribe: {len(jobs)} (in order)")
+        else:
+            # Durations come from the container headers, so this reads very little
+            durations = probe_durations([audio_file for audio_file, _ in jobs])
+            jobs = order_jobs(jobs, durations, self.schedule)
+            self.progress = RunProgress(durations)
+            print(f"Audio to transcribe: {format_duration(self.progress.remaining_seconds)} "
+                  f"in {len(jobs)} files ({self.schedule} first)")
+        print()
+        
+        if not self.languages.forced:
+            self._resolve_languages([audio_file for audio_file, _ in jobs])
+        
+        try:
+            if self.workers > 1:
+                successful, failed = self._run_parallel(jobs)
+            elif self.batch_size > 1:
+                successful, failed = self._run_batched(jobs)
+            elif self.prefetch > 0:
+                successful, failed = self._run_pipelined(jobs)
+            else:
+                successful, failed = self._run_serial(jobs)
+        finally:
+            # Commit the last partial batch, even if the run was interrupted
+            if self.store is not None:
+                self.store.flush()
+            with self._progress_lock:
+                self.progress = None
+                self._finished_early = None
+        
+        # Duplicates share the outcome of the file that was transcribed for them
+        return (successful + self.duplicate_counts["successful"],
+                failed + self.duplicate_counts["failed"])
+    
+    def _resolve_languages(self, audio_files):
+        """
+        Settle each directory's language before the run
+        
+        Hint files are read here. In auto mode an in-process model also
+        detects the language of every directory now, from one batched pass
+        over a sample of its files; worker processes detect it themselves
+        the first time they meet a directory.
+        """
+        self.languages.plan(audio_files)
+        notes = []
+        for directory in self.languages.samples:
+            language, source = self.languages.resolve(self.model, directory)
+            if source == "hint":
+                notes.append(f"Language for {directory}: {language} (from {HINT_FILE})")
+            elif source == "detected":
+                notes.append(f"Language for {directory}: {language} "
+                             f"(detected from {len(self.languages.samples[directory])} files)")
+            elif source == "mixed":
+                notes.append(f"Language for {directory}: mixed, detected per file")
+        for note in notes:
+            print(note)
+        if notes:
+            print()
+    
+    def _probe_in_background(self, audio_files):
+        """
+        Read durations for the ETA while the run goes ahead
+        
+        Status lines show no ETA until the durations are in; jobs that finish
+        before then are counted once they are.
+        """
+        start = time.perf_counter()
+        finished = self._finished_early = []
+        
+        def probe():
+            durations = probe_durations(audio_files)
+            with self._progress_lock:
+                # The run may be over, or another one started, by now
+                if self._finished_early is not finished:
+                    return
+                progress = RunProgress(durations, start)
+                for audio_file, measured in finished:
+                    progress.finish(audio_file, measured)
+                self.progress = progress
+                self._finished_early = None
+        
+        threading.Thread(target=probe, daemon=True).start()
+    
+    def _drop_duplicates(self, jobs):
+        """
+        Fingerprint every file and keep one job per group of duplicate recordings
+        
+        The other members of each group are remembered in self.duplicates and get
+        a copy of the transcript when the kept file is written.
+        
+        Returns:
+            list: Jobs still to run
+        """
+        print(f"Fingerprinting {len(jobs)} files to find duplicates...")
+        
+        def safe_fingerprint(audio_file):
+            try:
+                return fingerprint_file(audio_file)
+            except Exception:
+                # Undecodable files are left to fail in the normal run
+                return None
+        
+        # Decoding runs in ffmpeg subprocesses, so threads overlap well, but each
+        # holds a whole decoded file: a few at a time keeps memory bounded
+        with ThreadPoolExecutor(max_workers=min(FINGERPRINT_WORKERS, os.cpu_count() or 1)) as executor:
+            fingerprints = list(executor.map(safe_fingerprint, [audio_file for audio_file, _ in jobs]))
+        
+        kept = []
+        for group in group_duplicates(fingerprints):
+            audio_file, output_file = jobs[group[0]]
+            kept.append((audio_file, output_file))
+            if len(group) > 1:
+                self.duplicates[str(audio_file)] = [jobs[index] for index in group[1:]]
+                names = ", ".join(Path(jobs[index][0]).name for index in group[1:])
+                print(f"  {Path(audio_file).name} duplicated by: {names}")
+        
+        duplicate_files = len(jobs) - len(kept)
+        print(f"Found {duplicate_files} duplicates in {len(self.duplicates)} groups")
+        print()
+        return kept
+    
+    def _run_serial(self, jobs):
+        """Transcribe jobs one after another with the in-process model"""
+        successful = 0
+        failed = 0
+        
+        for i, (audio_file, output_file) in enumerate(jobs, 1):
+            print(f"[{i}/{len(jobs)}] Processing: {audio_file.name}")
             
             try:
-                result = self.model.transcribe(str(file_path))
-                transcript = result["text"].strip()
-                
-                # Determine output file path
-                if output_dir:
-                    output_file = output_dir / f"{file_path.stem}_transcript.txt"
-                else:
-                    output_file = file_path.parent / f"{file_path.stem}_transcript.txt"
-                
-                # Save transcript
-                with open(output_file, 'w', encoding='utf-8') as f:
-                    f.write(f"File: {file_path.name}\n")
-                    f.write(f"Model: {self.model_size}\n")
-                    f.write(f"Timestamp: {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
-                    f.write("-" * 40 + "\n\n")
-                    f.write(transcript)
-                
-                print(f"  ✓ Saved to: {output_file}")
+                info = self._process_file(audio_file, output_file)
+                self._job_finished(audio_file, output_file, True, info)
+                print(f"  ✓ Saved to: {self._destination(output_file)}{self._describe(info)}{self._eta()}")
                 successful += 1
                 
             except Exception as e:
-                print(f"  ✗ Failed: {str(e)}")
+                print(f"  ✗ Failed: {str(e)}{self._eta()}")
+                self._job_finished(audio_file, output_file, False, str(e))
                 failed += 1
             
             print()
         
-        # Summary
-        total_time = time.time() - start_time
+        return successful, failed
+    
+    def _run_pipelined(self, jobs):
+        """
+        Overlap decoding, inference and writing
+        
+        A decoder thread keeps up to `prefetch` waveforms ready while the model
+        works on the current file, and a writer thread saves finished results.
+        The stages are joined by bounded queues so memory stays capped.
+        """
+        decode_queue = queue.Queue(maxsize=self.prefetch)
+        write_queue = queue.Queue(maxsize=self.prefetch)
+        counts = {"successful": 0, "failed": 0}
+        
+        print(f"Pipelined run: decoding up to {self.prefetch} files ahead")
+        print()
+        
+        def decode_stage():
+            for index, (audio_file, output_file) in enumerate(jobs):
+                start = time.perf_counter()
+                try:
+                    decoded, error = self._decode(audio_file), None
+                except Exception as e:
+                    decoded, error = None, str(e)
+                decode_queue.put((index, decoded, error, time.perf_counter() - start))
+            decode_queue.put(None)
+        
+        def write_stage():
+            done = 0
+            while True:
+                item = write_queue.get()
+                if item is None:
+                    break
+                
+                index, result, info = item
+                audio_file, output_file = jobs[index]
+                done += 1
+                
+                if result is not None:
+                    start = time.perf_counter()
+                    try:
+                        self._write(audio_file, output_file, result)
+                        info["timings"]["write"] = time.perf_counter() - start
+                        info["result"] = result
+                    except Exception as e:
+                        result, info = None, str(e)
+                
+                self._job_finished(audio_file, output_file, result is not None, info)
+                if result is not None:
+                    print(f"[{done}/{len(jobs)}] ✓ {audio_file.name} -> {self._destination(output_file)}{self._describe(info)}{self._eta()}")
+                    counts["successful"] += 1
+                else:
+                    print(f"[{done}/{len(jobs)}] ✗ {audio_file.name}: {info}{self._eta()}")
+                    counts["failed"] += 1
+        
+        decoder = threading.Thread(target=decode_stage, daemon=True)
+        writer = threading.Thread(target=write_stage, daemon=True)
+        decoder.start()
+        writer.start()
+        
+        # Inference runs on this thread, fed by the decoder
+        while True:
+            item = decode_queue.get()
+            if item is None:
+                break
+            
+            index, decoded, error, decode_time = item
+            if error is not None:
+                write_queue.put((index, None, error))
+                continue
+            
+            cache_key, result, audio = decoded
+            timings = {"decode": decode_time}
+            info = {"cached": result is not None, "timings": timings}
+            
+            if result is None:
+                start = time.perf_counter()
+                try:
+                    result = self._infer(audio, cache_key, timings, self._language(jobs[index][0]))
+                except Exception as e:
+                    write_queue.put((index, None, str(e)))
+                    continue
+                finally:
+                    info["timings"]["inference"] = time.perf_counter() - start
+                    if isinstance(audio, PCMWindowReader):
+                        info["timings"]["inference"] -= audio.decode_seconds
+            info["vad"] = result.get("vad")
+            info["cascade"] = None if info["cached"] else result.get("cascade")
+            info["audio_seconds"] = self._audio_seconds(audio)
+            
+            del decoded, audio
+            write_queue.put((index, result, info))
+        
+        write_queue.put(None)
+        writer.join()
+        decoder.join()
+        
+        print()
+        return counts["successful"], counts["failed"]
+    
+    def _run_batched(self, jobs):
+        """
+        Transcribe short files in batches with one model call per batch
+        
+        Files are decoded in order and collected until there are `batch_size`
+        clips of at most 30 seconds (after VAD, if enabled), which then go
+        through the encoder and decoder together. Longer files are transcribed
+        on their own as usual, and so is any clip whose batched result fails
+        Whisper's quality checks.
+        """
+        counts = {"successful": 0, "failed": 0, "done": 0}
+        pending = []
+        max_samples = BATCH_CLIP_SECONDS * SAMPLE_RATE
+        
+        print(f"Batched run: up to {self.batch_size} short files per model call")
+        print()
+        
+        def finish(audio_file, output_file, result, info):
+            counts["done"] += 1
+            if result is not None:
+                start = time.perf_counter()
+                try:
+                    self._write(audio_file, output_file, result)
+                    info["timings"]["write"] = time.perf_counter() - start
+                    info["result"] = result
+                except Exception as e:
+                    result, info = None, str(e)
+            
+            self._job_finished(audio_file, output_file, result is not None, info)
+            if result is not None:
+                print(f"[{counts['done']}/{len(jobs)}] ✓ {audio_file.name} -> {self._destination(output_file)}{self._describe(info)}{self._eta()}")
+                counts["successful"] += 1
+            else:
+                print(f"[{counts['done']}/{len(jobs)}] ✗ {audio_file.name}: {info}{self._eta()}")
+                counts["failed"] += 1
+        
+        def flush():
+            batch = pending[:]
+            pending.clear()
+            
+            start = time.perf_counter()
+            try:
+                # One language for the batch if its files share one; otherwise detected per clip
+                languages = {item["language"] for item in batch}
+                language = languages.pop() if len(languages) == 1 else None
+                decoded = decode_batch(self.model, [item["clip"] for item in batch], language)
+            except Exception as e:
+                for item in batch:
+                    finish(item["audio_file"], item["output_file"], None, str(e))
+                return
+            # The batch ran as one call, so each file gets an equal share of it
+            share = (time.perf_counter() - start) / len(batch)
+            
+            for item, result in zip(batch, decoded):
+                info = item["info"]
+                info["timings"]["inference"] = share
+                try:
+                    if _needs_fallback(result):
+                        self.batch_fallbacks += 1
+                        start = time.perf_counter()
+                        result = self._infer(item["audio"], item["cache_key"], info["timings"],
+                                             language=item["language"])
+                        info["timings"]["inference"] += time.perf_counter() - start
+                    else:
+                        result = _batch_result(result, len(item["clip"]) / SAMPLE_RATE)
+                        if item["regions"] is not None:
+                            remap_timestamps(result, item["regions"])
+                            result["vad"] = speech_stats(len(item["audio"]), item["regions"])
+                        if item["cache_key"] is not None:
+                            self.cache.put(item["cache_key"], result)
+                except Exception as e:
+                    finish(item["audio_file"], item["output_file"], None, str(e))
+                    continue
+                
+                info["vad"] = result.get("vad")
+                finish(item["audio_file"], item["output_file"], result, info)
+        
+        for audio_file, output_file in jobs:
+            start = time.perf_counter()
+            try:
+                cache_key, result, audio = self._decode(audio_file)
+            except Exception as e:
+                finish(audio_file, output_file, None, str(e))
+                continue
+            
+            info = {
+                "cached": result is not None,
+                "timings": {"decode": time.perf_counter() - start},
+                "audio_seconds": len(audio) / SAMPLE_RATE if audio is not None else None,
+            }
+            
+            if result is not None:
+                info["vad"] = result.get("vad")
+                finish(audio_file, output_file, result, info)
+                continue
+            
+            clip, regions = audio, None
+            if self.vad:
+                regions = detect_speech(audio)
+                clip = extract_speech(audio, regions)
+            
+            if len(clip) > max_samples:
+                start = time.perf_counter()
+                try:
+                    result = self._infer(audio, cache_key, info["timings"],
+                                         language=self._language(audio_file))
+                except Exception as e:
+                    finish(audio_file, output_file, None, str(e))
+                    continue
+                info["timings"]["inference"] = time.perf_counter() - start
+                info["vad"] = result.get("vad")
+                finish(audio_file, output_file, result, info)
+                continue
+            
+            pending.append({
+                "audio_file": audio_file, "output_file": output_file, "cache_key": cache_key,
+                "audio": audio, "clip": clip, "regions": regions, "info": info,
+                "language": self._language(audio_file),
+            })
+            if len(pending) == self.batch_size:
+                flush()
+        
+        if pending:
+            flush()
+        
+        print()
+        return counts["successful"], counts["failed"]
+    
+    def _run_parallel(self, jobs):
+        """Transcribe jobs on a pool of worker processes fed from a shared queue"""
+        workers = min(self.workers, len(jobs))
+        threads = self.threads or max(1, (os.cpu_count() or 1) // workers)
+        config = dict(self._worker_config, threads=threads, duplicates=self.duplicates,
+                      language_samples=self.languages.samples)
+        
+        print(f"Starting {workers} workers ({threads} torch threads each)")
+        print()
+        
+        # Spawn rather than fork: torch does not survive forking reliably
+        ctx = multiprocessing.get_context("spawn")
+        task_queue = ctx.Queue()
+        result_queue = ctx.Queue()
+        
+        for index, (audio_file, output_file) in enumerate(jobs):
+            task_queue.put((index, audio_file, output_file))
+        for _ in range(workers):
+            task_queue.put(None)
+        
+        processes = [
+            ctx.Process(target=_worker_main, args=(config, task_queue, result_queue))
+            for _ in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        
+        successful = 0
+        failed = 0
+        done = 0
+        
+        while done < len(jobs):
+            try:
+                index, ok, info = result_queue.get(timeout=1)
+            except queue.Empty:
+                if not any(process.is_alive() for process in processes):
+                    # Workers died without reporting (e.g. out of memory)
+                    print(f"  ✗ Workers exited early, {len(jobs) - done} files not processed")
+                    failed += len(jobs) - done
+                    break
+                continue
+            
+            done += 1
+            audio_file, output_file = jobs[index]
+            self._job_finished(audio_file, output_file, ok, info)
+            if ok:
+                print(f"[{done}/{len(jobs)}] ✓ {audio_file.name} -> {self._destination(output_file)}{self._describe(info)}{self._eta()}")
+                successful += 1
+            else:
+                print(f"[{done}/{len(jobs)}] ✗ {audio_file.name}: {info}{self._eta()}")
+                failed += 1
+        
+        for process in processes:
+            process.join()
+        
+        print()
+        return successful, failed
+    
+    def _print_summary(self, total_files, successful, failed, total_time):
+        """Print the end-of-batch summary"""
         print("=" * 50)
         print("BATCH TRANSCRIPTION COMPLETE")
         print("=" * 50)
-        print(f"Total files processed: {len(file_list)}")
+        print(f"Total files processed: {total_files}")
         print(f"Successful: {successful}")
         print(f"Failed: {failed}")
+        if self.skipped:
+            print(f"Skipped (already transcribed): {self.skipped}")
+        if self.workers > 1:
+            print(f"Workers: {self.workers}")
+        if self.cache is not None:
+            print(f"Cache hits: {self.cache_hits}")
+        if self.duplicates:
+            saved = sum(len(group) for group in self.duplicates.values())
+            print(f"Duplicates: {saved} files in {len(self.duplicates)} groups "
+                  f"({saved} model runs saved)")
+        if self.stage_times:
+            stages = ", ".join(
+                f"{stage} {self.stage_times[stage]:.2f}s"
+                for stage in ("decode", "inference", "write") if stage in self.stage_times
+            )
+            print(f"Time in stages: {stages}")
+        if self.vad and self.vad_totals["total_seconds"]:
+            print(f"Voice activity detection: {describe_skipped(self.vad_totals)}")
+        if self.batch_fallbacks:
+            print(f"Batched results retried individually: {self.batch_fallbacks}")
+        if self.cascade_report is not None:
+            for line in self.cascade_report.summary_lines():
+                print(line)
+        if self.metrics is not None:
+            self.metrics.wall_seconds = total_time
+            rtf = self.metrics.summary()["real_time_factor"]
+            if rtf is not None:
+                print(f"Real-time factor: {rtf:.3f}")
         print(f"Total time: {total_time:.2f} seconds")
-        if len(file_list) > 0:
-            print(f"Average time per file: {total_time/len(file_list):.2f} seconds")
+        processed = total_files - self.skipped
+        if processed > 0:
+            print(f"Average time per file: {total_time/processed:.2f} seconds")
 
 def main():
     """Main CLI function for batch processing"""
@@ -176,7 +1053,21 @@ def main():
 Examples:
   python batch_transcribe.py --folder ./audio_files
   python batch_transcribe.py --folder ./voicemails --model medium --output ./transcripts
+  python batch_transcribe.py --folder ./lectures --formats srt,vtt,txt
+  python batch_transcribe.py --folder ./voicemails --db transcripts.db --db-only
   python batch_transcribe.py --files file1.mp3 file2.wav file3.mp3
+  python batch_transcribe.py --folder ./voicemails --workers 8
+  python batch_transcribe.py --folder ./voicemails --force
+  python batch_transcribe.py --folder ./voicemails --prefetch 4
+  python batch_transcribe.py --folder ./voicemails --dedupe
+  python batch_transcribe.py --folder ./voicemails --batch-size 16
+  python batch_transcribe.py --folder ./voicemails --schedule shortest
+  python batch_transcribe.py --folder ./voicemails --language auto
+  python batch_transcribe.py --folder ./voicemails --model tiny --cascade medium
+  python batch_transcribe.py --folder ./voicemails --model small --quantize int8
+  python batch_transcribe.py --folder ./hearings --workers 2 --stream-decode
+  python batch_transcribe.py --folder ./voicemails --output ./transcripts --watch
+  python batch_transcribe.py --folder ./voicemails --metrics-prom /var/lib/node_exporter/whisper.prom
         """
     )
     
@@ -198,29 +1089,321 @@ Examples:
         help="Whisper model size to use (default: base)"
     )
     
+    parser.add_argument(
+        "--quantize",
+        choices=QUANTIZE_MODES,
+        help="Run the model with dynamically quantized int8 linear layers on the CPU "
+             "(built once and cached in ~/.cache/whisper_quantized)"
+    )
+    
+    parser.add_argument(
+        "--cascade",
+        choices=["tiny", "base", "small", "medium", "large"],
+        metavar="MODEL",
+        help="Re-transcribe only the segments --model is unsure of with this larger model"
+    )
+    
+    parser.add_argument(
+        "--escalate-logprob",
+        type=float,
+        default=DEFAULT_THRESHOLDS["logprob"],
+        metavar="X",
+        help=f"With --cascade, escalate segments with average log probability below X "
+             f"(default: {DEFAULT_THRESHOLDS['logprob']})"
+    )
+    
+    parser.add_argument(
+        "--escalate-no-speech",
+        type=float,
+        default=DEFAULT_THRESHOLDS["no_speech"],
+        metavar="P",
+        help=f"With --cascade, escalate text with no-speech probability above P "
+             f"(default: {DEFAULT_THRESHOLDS['no_speech']})"
+    )
+    
+    parser.add_argument(
+        "--escalate-compression",
+        type=float,
+        default=DEFAULT_THRESHOLDS["compression"],
+        metavar="R",
+        help=f"With --cascade, escalate segments with compression ratio above R "
+             f"(default: {DEFAULT_THRESHOLDS['compression']})"
+    )
+    
     parser.add_argument(
         "--output", "-o",
         help="Output directory for transcripts (optional)"
     )
     
+    parser.add_argument(
+        "--formats",
+        default="txt",
+        metavar="LIST",
+        help=f"Comma-separated output formats written in one pass: {', '.join(FORMATS)} (default: txt)"
+    )
+    
+    parser.add_argument(
+        "--db",
+        metavar="FILE",
+        help="Also store transcripts, segments and timings in a searchable SQLite database "
+             "(query it with transcript_store.py)"
+    )
+    
+    parser.add_argument(
+        "--db-only",
+        action="store_true",
+        help="With --db, write only the database and no transcript files"
+    )
+    
     parser.add_argument(
         "--pattern",
         default="*",
         help="File pattern to match when using --folder (default: *)"
     )
     
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always re-transcribe instead of reusing cached results"
+    )
+    
+    parser.add_argument(
+        "--cache-dir",
+        help="Transcript cache directory (default: ~/.cache/whisper_transcripts)"
+    )
+    
+    parser.add_argument(
+        "--cache-size",
+        type=float,
+        default=DEFAULT_CACHE_SIZE_MB,
+        help=f"Transcript cache size limit in MB (default: {DEFAULT_CACHE_SIZE_MB})"
+    )
+    
+    resume_group = parser.add_mutually_exclusive_group()
+    resume_group.add_argument(
+        "--resume",
+        dest="resume",
+        action="store_true",
+        default=True,
+        help="Skip files already transcribed by an earlier run (default)"
+    )
+    resume_group.add_argument(
+        "--force",
+        dest="resume",
+        action="store_false",
+        help="Re-transcribe every file, ignoring the completion journal"
+    )
+    
+    parser.add_argument(
+        "--language",
+        metavar="CODE",
+        help="Language of every file (e.g. en), or 'auto' to detect it once per folder from a "
+             f"sample of files (default: a folder's {HINT_FILE} file, otherwise per file)"
+    )
+    
+    parser.add_argument(
+        "--vad",
+        action="store_true",
+        help="Skip silence and hold music with voice activity detection before transcribing"
+    )
+    
+    parser.add_argument(
+        "--dedupe",
+        action="store_true",
+        help="Find duplicate recordings by acoustic fingerprint and transcribe each only once"
+    )
+    
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Transcribe up to N short files (30 s or less) per model call (default: 1, off)"
+    )
+    
+    parser.add_argument(
+        "--stream-decode",
+        action="store_true",
+        help="Decode and transcribe each file window by window so memory use stays flat "
+             "however long the recording is"
+    )
+    
+    parser.add_argument(
+        "--prefetch",
+        type=int,
+        default=0,
+        metavar="K",
+        help="Decode up to K files ahead while the model transcribes (default: 0, off)"
+    )
+    
+    parser.add_argument(
+        "--schedule",
+        choices=SCHEDULES,
+        default="fifo",
+        help="Order files by audio duration: shortest first, longest first (packs workers), "
+             "or fifo (default)"
+    )
+    
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Number of worker processes, each with its own model "
+             "(default: the calibrated layout from thread_profile.py, otherwise 1)"
+    )
+    
+    parser.add_argument(
+        "--threads",
+        type=int,
+        metavar="N",
+        help="Torch threads per worker (default: the calibrated layout, otherwise the cores "
+             "shared evenly)"
+    )
+    
+    parser.add_argument(
+        "--no-profile",
+        action="store_true",
+        help="Ignore the layouts recorded by thread_profile.py"
+    )
+    
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and transcribe new or changed files in --folder as they arrive"
+    )
+    
+    parser.add_argument(
+        "--poll",
+        action="store_true",
+        help="With --watch, scan the folder periodically instead of using filesystem events"
+    )
+    
+    parser.add_argument(
+        "--settle",
+        type=float,
+        default=2.0,
+        metavar="SECONDS",
+        help="With --watch, how long a file must stop growing before it is taken (default: 2)"
+    )
+    
+    parser.add_argument(
+        "--metrics-json",
+        metavar="FILE",
+        help="Time every stage and write a JSON report with per-file and aggregate timings"
+    )
+    
+    parser.add_argument(
+        "--metrics-prom",
+        metavar="FILE",
+        help="Time every stage and write a Prometheus textfile (for node exporter)"
+    )
+    
     args = parser.parse_args()
     
     if not args.folder and not args.files:
         parser.error("Either --folder or --files must be specified")
     
+    try:
+        formats = parse_formats(args.formats)
+    except ValueError as e:
+        parser.error(f"--formats: {e}")
+    
+    if args.db_only and not args.db:
+        parser.error("--db-only needs --db")
+    
+    if args.cascade and (args.batch_size > 1 or args.stream_decode):
+        parser.error("--cascade cannot be combined with --batch-size or --stream-decode")
+    
+    if args.cascade == args.model:
+        parser.error("--cascade must name a different model than --model")
+    
+    # Quantized models have their own registry and cache entries (e.g. base-int8)
+    model_name = quantized_name(args.model, args.quantize)
+    cascade = quantized_name(args.cascade, args.quantize) if args.cascade else None
+    
+    workers = args.workers or 1
+    if workers < 1:
+        parser.error("--workers must be at least 1")
+    
+    if args.threads is not None and args.threads < 1:
+        parser.error("--threads must be at least 1")
+    
+    if args.prefetch < 0:
+        parser.error("--prefetch cannot be negative")
+    
+    if args.prefetch and workers > 1:
+        parser.error("--prefetch applies to single-process runs; it cannot be combined with --workers")
+    
+    if args.batch_size < 1:
+        parser.error("--batch-size must be at least 1")
+    
+    if args.batch_size > 1 and (workers > 1 or args.prefetch):
+        parser.error("--batch-size cannot be combined with --workers or --prefetch")
+    
+    if args.stream_decode and (args.batch_size > 1 or args.prefetch or args.dedupe):
+        parser.error("--stream-decode cannot be combined with --batch-size, --prefetch or --dedupe, "
+                     "which all hold whole decoded files in memory")
+    
+    if args.watch and not args.folder:
+        parser.error("--watch needs --folder")
+    
+    if args.watch and (workers > 1 or args.prefetch or args.batch_size > 1 or args.dedupe):
+        parser.error("--watch transcribes files one at a time as they arrive; "
+                     "it cannot be combined with --workers, --prefetch, --batch-size or --dedupe")
+    
+    # Fill in whatever the command line left open from the calibrated layout
+    threads = args.threads
+    if not args.no_profile and (args.workers is None or threads is None):
+        single_process = args.prefetch or args.batch_size > 1 or args.watch
+        # A thread count from the command line only takes a layout calibrated for it, so
+        # workers x threads never exceeds what was measured (no match: one worker)
+        layout = best_layout(model_name, workers=1 if single_process else args.workers,
+                             threads=threads)
+        if layout:
+            workers, threads = layout
+            print(f"Using calibrated layout for {model_name}: {workers} workers x {threads} threads")
+    
     # Initialize transcriber
-    transcriber = BatchTranscriber(args.model)
+    transcriber = BatchTranscriber(
+        model_name,
+        workers=workers,
+        threads=threads,
+        schedule=args.schedule,
+        language=args.language.lower() if args.language else None,
+        use_cache=not args.no_cache,
+        cache_dir=args.cache_dir,
+        cache_size_mb=args.cache_size,
+        resume=args.resume,
+        prefetch=args.prefetch,
+        vad=args.vad,
+        metrics=bool(args.metrics_json or args.metrics_prom),
+        dedupe=args.dedupe,
+        batch_size=args.batch_size,
+        stream_decode=args.stream_decode,
+        formats=formats,
+        db_path=args.db,
+        write_files=not args.db_only,
+        cascade=cascade,
+        cascade_thresholds={
+            "logprob": args.escalate_logprob,
+            "no_speech": args.escalate_no_speech,
+            "compression": args.escalate_compression,
+        }
+    )
     
-    if args.folder:
+    if args.watch:
+        from watch_folder import FolderWatcher
+        FolderWatcher(args.folder, transcriber, args.output, settle_seconds=args.settle,
+                      use_polling=args.poll).run()
+    elif args.folder:
         transcriber.transcribe_folder(args.folder, args.output, args.pattern)
     elif args.files:
         transcriber.transcribe_file_list(args.files, args.output)
+    
+    if transcriber.metrics is not None:
+        transcriber.metrics.export(args.metrics_json, args.metrics_prom)
+    
+    if transcriber.store is not None:
+        transcriber.store.close()
 
 if __name__ == "__main__":
     main()
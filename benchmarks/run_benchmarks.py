@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+"""
+Offline Benchmark Suite
+Measures model load time, per-file latency, real-time factor, batch throughput and
+peak memory for transcribe_cli.py and batch_transcribe.py without network or GPU
+"""
+
+import io
+import os
+import re
+import sys
+import json
+import time
+import platform
+import argparse
+import resource
+import tempfile
+import statistics
+import subprocess
+import contextlib
+from pathlib import Path
+
+BENCHMARK_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCHMARK_DIR.parent))
+sys.path.insert(0, str(BENCHMARK_DIR))
+
+from synthetic_audio import generate_speech_like, write_wav, SAMPLE_RATE
+
+REAL_MODELS = ["tiny", "base", "small", "medium", "large"]
+DEFAULT_LENGTHS = [5, 30, 120]
+
+class StubModel:
+    """
+    Stand-in for a Whisper model
+    
+    Takes time in proportion to the audio it is given and returns plausible
+    segments, so the surrounding pipeline (decoding, caching, writing) can be
+    measured without model weights.
+    """
+    
+    def __init__(self, seconds_per_audio_second=0.02):
+        self.seconds_per_audio_second = seconds_per_audio_second
+    
+    def parameters(self):
+        return []
+    
+    def buffers(self):
+        return []
+    
+    def transcribe(self, audio, **options):
+        if isinstance(audio, str):
+            import whisper
+            audio = whisper.load_audio(audio)
+        
+        duration = len(audio) / SAMPLE_RATE
+        time.sleep(duration * self.seconds_per_audio_second)
+        
+        segments = []
+        start = 0.0
+        while start < duration:
+            end = min(duration, start + 5.0)
+            segments.append({
+                "id": len(segments), "start": round(start, 3), "end": round(end, 3),
+                "text": f" Synthetic segment {len(segments) + 1}.",
+                "tokens": [], "temperature": 0.0, "avg_logprob": -0.2,
+                "compression_ratio": 1.0, "no_speech_prob": 0.01,
+            })
+            start = end
+        
+        return {
+            "text": "".join(segment["text"] for segment in segments),
+            "segments": segments,
+            "language": options.get("language") or "en",
+        }
+
+def word_errors(reference, hypothesis):
+    """
+    Word-level edit distance, ignoring case and punctuation
+    
+    Returns:
+        tuple: (substitutions + deletions + insertions, words in the reference)
+    """
+    ref = re.sub(r"[^\w\s']", " ", reference.lower()).split()
+    hyp = re.sub(r"[^\w\s']", " ", hypothesis.lower()).split()
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hyp, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1,
+                               previous[j - 1] + (ref_word != hyp_word)))
+        previous = current
+    return previous[-1], len(ref)
+
+def reference_set(directory):
+    """Audio files in a directory that have a reference transcript (same name, .txt)"""
+    from batch_transcribe import AUDIO_EXTENSIONS
+    pairs = []
+    for path in sorted(Path(directory).iterdir()):
+        reference = path.with_suffix(".txt")
+        if path.suffix.lower() in AUDIO_EXTENSIONS and reference.exists():
+            pairs.append((path, reference.read_text(encoding="utf-8")))
+    return pairs
+
+def benchmark_reference(model, pairs):
+    """
+    Transcribe a reference set and measure its word error rate and speed
+    
+    Returns:
+        dict: Word error rate over all files, wall time and real-time factor
+    """
+    from batch_schedule import probe_duration
+    errors = words = 0
+    audio_seconds = wall = 0.0
+    for path, reference in pairs:
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            hypothesis = model.transcribe(str(path))["text"]
+        wall += time.perf_counter() - start
+        audio_seconds += probe_duration(path) or 0.0
+        file_errors, file_words = word_errors(reference, hypothesis)
+        errors += file_errors
+        words += file_words
+    return {
+        "files": len(pairs),
+        "words": words,
+        "word_error_rate": round(errors / words, 4) if words else None,
+        "audio_seconds": round(audio_seconds, 3),
+        "wall_seconds": round(wall, 3),
+        "real_time_factor": round(wall / audio_seconds, 4) if audio_seconds else None,
+    }
+
+def compare_quantized(results):
+    """
+    Compare each quantized model with its fp32 counterpart in the same report
+    
+    Returns:
+        list: Speedups, memory ratio and word error rates for every pair
+    """
+    from model_registry import split_model_name
+    by_model = {result["model"]: result for result in results if "error" not in result}
+    comparisons = []
+    for name, quantized in by_model.items():
+        size, mode = split_model_name(name)
+        full = by_model.get(size)
+        if not mode or full is None:
+            continue
+        comparison = {
+            "model": size,
+            "quantization": mode,
+            "load_speedup": round(full["load_seconds"] / quantized["load_seconds"], 2),
+            "batch_speedup": round(quantized["batch"]["files_per_minute"]
+                                   / full["batch"]["files_per_minute"], 2),
+            "peak_rss_ratio": round(quantized["peak_rss_mb"] / full["peak_rss_mb"], 3),
+        }
+        if "reference" in full and "reference" in quantized:
+            comparison["word_error_rate"] = full["reference"]["word_error_rate"]
+            comparison["quantized_word_error_rate"] = quantized["reference"]["word_error_rate"]
+        comparisons.append(comparison)
+    return comparisons
+
+def cached_real_models():
+    """Real models whose weights are already downloaded"""
+    root = Path(os.getenv("XDG_CACHE_HOME", Path.home() / ".cache")) / "whisper"
+    return [name for name in REAL_MODELS if (root / f"{name}.pt").exists()]
+
+def peak_rss_mb():
+    """Peak resident memory of this process in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def make_audio_files(directory, lengths, batch_files):
+    """Write one file per length, plus a batch of files cycling through the lengths"""
+    singles = {}
+    for length in lengths:
+        path = Path(directory) / f"single_{length:g}s.wav"
+        write_wav(path, generate_speech_like(length, seed=int(length * 1000)))
+        singles[length] = path
+    
+    batch = []
+    for i in range(batch_files):
+        length = lengths[i % len(lengths)]
+        path = Path(directory) / f"batch_{i:03d}_{length:g}s.wav"
+        write_wav(path, generate_speech_like(length, seed=1000 + i))
+        batch.append((path, length))
+    
+    return singles, batch
+
+def benchmark_model(model_name, lengths, batch_files, repeat, stub_cost, reference=None):
+    """
+    Run every scenario for one model in this process
+    
+    With a reference directory, real models are also scored on its
+    recordings against their reference transcripts.
+    
+    Returns:
+        dict: Machine-readable results for the model
+    """
+    from model_registry import get_registry
+    from transcribe_cli import transcribe_audio
+    from batch_transcribe import BatchTranscriber
+    
+    registry = get_registry()
+    quiet = contextlib.redirect_stdout(io.StringIO())
+    
+    start = time.perf_counter()
+    with quiet:
+        if model_name == "stub":
+            registry.register("stub", StubModel(stub_cost))
+        else:
+            registry.get(model_name)
+    load_seconds = time.perf_counter() - start
+    
+    results = {"model": model_name, "load_seconds": round(load_seconds, 3)}
+    
+    with tempfile.TemporaryDirectory() as workdir:
+        singles, batch = make_audio_files(workdir, lengths, batch_files)
+        output_dir = Path(workdir) / "out"
+        output_dir.mkdir()
+        
+        single_results = []
+        for length, path in singles.items():
+            latencies = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    ok = transcribe_audio(
+                        str(path), model_name, "txt", str(output_dir / f"{path.stem}.txt"),
+                        use_cache=False, use_daemon=False
+                    )
+                latencies.append(time.perf_counter() - start)
+                if not ok:
+                    raise RuntimeError(f"transcribe_audio failed on {path.name}")
+            
+            latency = statistics.median(latencies)
+            single_results.append({
+                "audio_seconds": length,
+                "latency_seconds": round(latency, 4),
+                "real_time_factor": round(latency / length, 4),
+            })
+        results["single_file"] = single_results
+        
+        with contextlib.redirect_stdout(io.StringIO()):
+            transcriber = BatchTranscriber(model_name, use_cache=False, resume=False)
+            start = time.perf_counter()
+            transcriber.transcribe_file_list([str(path) for path, _ in batch], str(output_dir))
+            wall = time.perf_counter() - start
+        
+        audio_seconds = sum(length for _, length in batch)
+        results["batch"] = {
+            "files": len(batch),
+            "audio_seconds": audio_seconds,
+            "wall_seconds": round(wall, 3),
+            "files_per_minute": round(60.0 * len(batch) / wall, 2) if wall else None,
+            "real_time_factor": round(wall / audio_seconds, 4) if audio_seconds else None,
+        }
+    
+    if reference and model_name != "stub":
+        results["reference"] = benchmark_reference(registry.get(model_name), reference_set(reference))
+    
+    results["peak_rss_mb"] = round(peak_rss_mb(), 1)
+    return results
+
+def run_isolated(model_name, args):
+    """Benchmark a model in a fresh process so its load time and peak memory are its own"""
+    cmd = [
+        sys.executable, str(Path(__file__).resolve()), "--single-model", model_name,
+        "--lengths", *[str(length) for length in args.lengths],
+        "--batch-files", str(args.batch_files),
+        "--repeat", str(args.repeat),
+        "--stub-cost", str(args.stub_cost),
+    ]
+    if args.reference:
+        cmd += ["--reference", args.reference]
+    completed = subprocess.run(cmd, capture_output=True, text=True)
+    if completed.returncode != 0:
+        return {"model": model_name, "error": completed.stderr.strip().splitlines()[-1:]}
+    return json.loads(completed.stdout)
+
+def print_summary(report):
+    """Human-readable summary on stderr"""
+    for result in report["results"]:
+        print(f"\n{result['model']}", file=sys.stderr)
+        if "error" in result:
+            print(f"  ✗ Failed: {result['error']}", file=sys.stderr)
+            continue
+        print(f"  Load time: {result['load_seconds']:.2f}s   Peak RSS: {result['peak_rss_mb']:.0f} MB",
+              file=sys.stderr)
+        for single in result["single_file"]:
+            print(f"  {single['audio_seconds']:>5g}s audio: {single['latency_seconds']:.2f}s "
+                  f"(RTF {single['real_time_factor']:.3f})", file=sys.stderr)
+        batch = result["batch"]
+        print(f"  Batch of {batch['files']}: {batch['files_per_minute']:.1f} files/min "
+              f"(RTF {batch['real_time_factor']:.3f})", file=sys.stderr)
+        reference = result.get("reference")
+        if reference and reference["word_error_rate"] is not None:
+            print(f"  Reference set ({reference['files']} files): "
+                  f"WER {100 * reference['word_error_rate']:.1f}%", file=sys.stderr)
+    
+    for comparison in report.get("quantization", []):
+        line = (f"\n{comparison['model']} {comparison['quantization']} vs fp32: "
+                f"{comparison['batch_speedup']:.2f}x batch speed, "
+                f"{comparison['load_speedup']:.2f}x load speed, "
+                f"{comparison['peak_rss_ratio']:.2f}x peak memory")
+        if comparison.get("quantized_word_error_rate") is not None:
+            line += (f", WER {100 * comparison['word_error_rate']:.1f}% -> "
+                     f"{100 * comparison['quantized_word_error_rate']:.1f}%")
+        print(line, file=sys.stderr)
+
+def main():
+    """Main benchmark function"""
+    parser = argparse.ArgumentParser(
+        description="Offline performance benchmarks for the transcription tools",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python benchmarks/run_benchmarks.py
+  python benchmarks/run_benchmarks.py --models stub tiny --output results.json
+  python benchmarks/run_benchmarks.py --lengths 10 60 --batch-files 20
+  python benchmarks/run_benchmarks.py --models base base-int8 --reference ./reference_calls
+        """
+    )
+    
+    parser.add_argument(
+        "--models",
+        nargs='+',
+        help="Models to benchmark: 'stub' and/or real sizes, optionally quantized such as base-int8 "
+             "(default: stub plus every locally cached model)"
+    )
+    
+    parser.add_argument(
+        "--lengths",
+        nargs='+',
+        type=float,
+        default=DEFAULT_LENGTHS,
+        help=f"Synthetic audio lengths in seconds (default: {' '.join(map(str, DEFAULT_LENGTHS))})"
+    )
+    
+    parser.add_argument(
+        "--batch-files",
+        type=int,
+        default=10,
+        help="Number of files in the batch scenario (default: 10)"
+    )
+    
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="Runs per single-file measurement; the median is reported (default: 3)"
+    )
+    
+    parser.add_argument(
+        "--stub-cost",
+        type=float,
+        default=0.02,
+        help="Stub model processing seconds per audio second (default: 0.02)"
+    )
+    
+    parser.add_argument(
+        "--reference",
+        metavar="DIR",
+        help="Also score real models on the recordings in DIR against reference transcripts "
+             "with the same name and a .txt extension (word error rate)"
+    )
+    
+    parser.add_argument(
+        "--output", "-o",
+        help="Write the JSON report to this file instead of stdout"
+    )
+    
+    parser.add_argument(
+        "--single-model",
+        help=argparse.SUPPRESS
+    )
+    
+    args = parser.parse_args()
+    
+    if args.single_model:
+        result = benchmark_model(args.single_model, args.lengths, args.batch_files,
+                                 args.repeat, args.stub_cost, args.reference)
+        print(json.dumps(result))
+        return
+    
+    from model_registry import split_model_name
+    models = args.models or ["stub"] + cached_real_models()
+    for model in models:
+        if model != "stub" and split_model_name(model)[0] not in cached_real_models():
+            parser.error(f"Model '{model}' is not downloaded; benchmarks never use the network")
+    
+    report = {
+        "benchmark_version": 2,
+        "timestamp": time.strftime('%Y-%m-%dT%H:%M:%S'),
+        "host": {
+            "hostname": platform.node(),
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+        },
+        "config": {
+            "lengths": args.lengths,
+            "batch_files": args.batch_files,
+            "repeat": args.repeat,
+            "stub_cost": args.stub_cost,
+            "reference": args.reference,
+        },
+        "results": [],
+    }
+    
+    for model in models:
+        print(f"Benchmarking {model}...", file=sys.stderr)
+        report["results"].append(run_isolated(model, args))
+    
+    report["quantization"] = compare_quantized(report["results"])
+    print_summary(report)
+    
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+        print(f"\nReport saved to: {args.output}", file=sys.stderr)
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main()
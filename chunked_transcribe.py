@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Parallel Chunked Transcription
+Split one long recording at silences and transcribe the pieces on a process pool
+"""
+
+import os
+import re
+import multiprocessing
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from voice_activity import SAMPLE_RATE, frame_energy_db, transcribe_speech_only
+from model_registry import get_model
+
+DEFAULT_CHUNK_SECONDS = 300
+DEFAULT_OVERLAP_SECONDS = 5
+
+# Model loaded once per worker process by _init_worker
+_worker_model = None
+
+def plan_chunks(audio, sample_rate=SAMPLE_RATE, chunk_seconds=DEFAULT_CHUNK_SECONDS,
+                overlap_seconds=DEFAULT_OVERLAP_SECONDS, search_seconds=10, frame_ms=30):
+    """
+    Choose chunk boundaries at the quietest point near every chunk_seconds
+    
+    Args:
+        audio (np.ndarray): Mono float32 waveform
+        sample_rate (int): Sample rate of the waveform
+        chunk_seconds (float): Target chunk length
+        overlap_seconds (float): Extra audio decoded on each side of a cut
+        search_seconds (float): How far from the target a cut may move to find silence
+        frame_ms (int): Energy analysis frame length
+    
+    Returns:
+        list: Chunks as dicts with the sample range to decode ("start", "end") and the
+              time range in seconds whose segments the chunk owns ("keep_start", "keep_end")
+    """
+    total = len(audio)
+    chunk_len = int(chunk_seconds * sample_rate)
+    if total <= chunk_len:
+        return [{"start": 0, "end": total, "keep_start": 0.0, "keep_end": total / sample_rate}]
+    
+    energy = frame_energy_db(audio, sample_rate, frame_ms)
+    frame_len = int(sample_rate * frame_ms / 1000)
+    search = int(search_seconds * 1000 / frame_ms)
+    
+    cuts = [0]
+    target = chunk_len
+    while target < total - chunk_len // 4:
+        center = target // frame_len
+        lo = max(0, center - search)
+        hi = min(len(energy), center + search + 1)
+        cut = (lo + int(energy[lo:hi].argmin())) * frame_len if hi > lo else target
+        cuts.append(cut)
+        target = cut + chunk_len
+    cuts.append(total)
+    
+    overlap = int(overlap_seconds * sample_rate)
+    chunks = []
+    for cut_start, cut_end in zip(cuts[:-1], cuts[1:]):
+        chunks.append({
+            "start": max(0, cut_start - overlap),
+            "end": min(total, cut_end + overlap),
+            "keep_start": cut_start / sample_rate,
+            "keep_end": cut_end / sample_rate,
+        })
+    return chunks
+
+def _init_worker(model_size, threads):
+    """Load the model once in each pool process"""
+    global _worker_model
+    import torch
+    torch.set_num_threads(threads)
+    _worker_model = get_model(model_size)
+
+def _transcribe_chunk(audio, vad, options):
+    if vad:
+        return transcribe_speech_only(_worker_model, audio, **options)
+    return _worker_model.transcribe(audio, **options)
+
+def _normalize(text):
+    return re.sub(r"[^\w\s]", "", text).lower().split()
+
+def stitch_results(chunks, results, sample_rate=SAMPLE_RATE):
+    """
+    Join per-chunk results into one result on the original timeline
+    
+    Segments are shifted by their chunk's offset, and each chunk only keeps the
+    segments centred inside the span it owns, so text decoded twice in an
+    overlap appears once. A segment repeating the previous one word for word
+    (a sentence straddling a cut) is also dropped.
+    """
+    segments = []
+    languages = Counter()
+    vad_totals = None
+    
+    for chunk, result in zip(chunks, results):
+        offset = chunk["start"] / sample_rate
+        if result.get("language"):
+            languages[result["language"]] += 1
+        if result.get("vad"):
+            vad_totals = vad_totals or {"total_seconds": 0.0, "speech_seconds": 0.0, "skipped_seconds": 0.0}
+            for key in vad_totals:
+                vad_totals[key] += result["vad"][key]
+        
+        for segment in result.get("segments", []):
+            segment = dict(segment)
+            segment["start"] = round(float(segment["start"] + offset), 3)
+            segment["end"] = round(float(segment["end"] + offset), 3)
+            for word in segment.get("words", []):
+                word["start"] = round(float(word["start"] + offset), 3)
+                word["end"] = round(float(word["end"] + offset), 3)
+            
+            middle = (segment["start"] + segment["end"]) / 2
+            if not chunk["keep_start"] <= middle < chunk["keep_end"]:
+                continue
+            if segments and _normalize(segment["text"]) == _normalize(segments[-1]["text"]):
+                continue
+            segments.append(segment)
+    
+    for i, segment in enumerate(segments):
+        segment["id"] = i
+    
+    stitched = {
+        "text": "".join(segment["text"] for segment in segments),
+        "segments": segments,
+        "language": languages.most_common(1)[0][0] if languages else None,
+        "chunks": len(chunks),
+    }
+    if vad_totals:
+        # Overlaps are analysed twice, so the totals are approximate
+        stitched["vad"] = {key: round(value, 2) for key, value in vad_totals.items()}
+    return stitched
+
+def transcribe_chunked(file_path, model_size="base", workers=None,
+                       chunk_seconds=DEFAULT_CHUNK_SECONDS, overlap_seconds=DEFAULT_OVERLAP_SECONDS,
+                       vad=False, **options):
+    """
+    Transcribe one long file on a pool of processes
+    
+    Args:
+        file_path (str): Path to the audio file
+        model_size (str): Whisper model size to use
+        workers (int): Number of processes, each with its own model (default: one per 2 cores)
+        chunk_seconds (float): Target chunk length
+        overlap_seconds (float): Audio shared between neighbouring chunks
+        vad (bool): Skip silence inside each chunk
+        **options: Passed through to model.transcribe
+    
+    Returns:
+        dict: Whisper-style result for the whole file
+    """
+    import whisper
+    
+    audio = whisper.load_audio(str(file_path))
+    chunks = plan_chunks(audio, SAMPLE_RATE, chunk_seconds, overlap_seconds)
+    
+    cpus = os.cpu_count() or 1
+    workers = max(1, min(workers or max(1, cpus // 2), len(chunks)))
+    threads = max(1, cpus // workers)
+    
+    duration = len(audio) / SAMPLE_RATE
+    print(f"Split {duration:.0f}s of audio into {len(chunks)} chunks "
+          f"for {workers} workers ({threads} torch threads each)")
+    
+    # Spawn rather than fork: torch does not survive forking reliably
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx,
+                             initializer=_init_worker, initargs=(model_size, threads)) as pool:
+        futures = [
+            pool.submit(_transcribe_chunk, audio[chunk["start"]:chunk["end"]], vad, options)
+            for chunk in chunks
+        ]
+        results = []
+        for i, future in enumerate(futures, 1):
+            results.append(future.result())
+            print(f"  Chunk {i}/{len(chunks)} done")
+    
+    return stitch_results(chunks, results)
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Completion Journal
+Append-only record of finished batch transcriptions so interrupted runs can resume
+"""
+
+import os
+import json
+import time
+from pathlib import Path
+
+JOURNAL_NAME = ".transcription_journal.jsonl"
+
+class CompletionJournal:
+    def __init__(self, output_dir):
+        """
+        Open (or create) the journal in an output directory
+        
+        Args:
+            output_dir (str): Directory where transcripts are written
+        """
+        self.path = Path(output_dir) / JOURNAL_NAME
+        self.entries = {}
+        self._load()
+    
+    def _load(self):
+        """Read existing entries; the last entry for a file wins"""
+        if not self.path.exists():
+            return
+        
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A run killed mid-write can leave a truncated last line
+                    continue
+                self.entries[entry["file"]] = entry
+    
+    @staticmethod
+    def _key(path):
+        # Absolute, so a resumed run naming the same paths differently still matches
+        return str(Path(path).resolve())
+    
+    def is_complete(self, audio_file, model_size, output_file):
+        """
+        Check whether a file was already transcribed and is unchanged since
+        
+        Args:
+            audio_file (str): Path to the audio file
+            model_size (str): Whisper model size of the current run
+            output_file (str): Transcript path the current run would write
+        """
+        entry = self.entries.get(self._key(audio_file))
+        if entry is None or entry["status"] != "done":
+            return False
+        
+        try:
+            stat = os.stat(audio_file)
+        except OSError:
+            return False
+        
+        return (
+            entry["size"] == stat.st_size
+            and entry["mtime"] == stat.st_mtime
+            and entry["model"] == model_size
+            and entry["output"] == self._key(output_file)
+            and os.path.exists(output_file)
+        )
+    
+    def record(self, audio_file, model_size, output_file, ok, error=None):
+        """
+        Append the outcome for one file and flush it to disk
+        
+        Args:
+            audio_file (str): Path to the audio file
+            model_size (str): Whisper model size used
+            output_file (str): Transcript path written
+            ok (bool): Whether transcription succeeded
+            error (str): Error message for failures (optional)
+        """
+        try:
+            stat = os.stat(audio_file)
+            size, mtime = stat.st_size, stat.st_mtime
+        except OSError:
+            # Input vanished during the run; the entry will never match as complete
+            size, mtime = None, None
+        
+        entry = {
+            "file": self._key(audio_file),
+            "size": size,
+            "mtime": mtime,
+            "model": model_size,
+            "output": self._key(output_file),
+            "status": "done" if ok else "failed",
+            "finished": time.strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        if error:
+            entry["error"] = error
+        
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        
+        self.entries[entry["file"]] = entry
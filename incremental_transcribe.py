@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Incremental Transcription
+Transcribe only the newly recorded tail of a growing recording and append it to the outputs
+"""
+
+import os
+import json
+import tempfile
+from pathlib import Path
+from segment_stream import PCMWindowReader, iter_segments, format_segment, PROMPT_CHARS
+from output_writers import HEADERS, format_tsv_segment, format_vtt_segment, output_paths
+
+# json holds one document for the whole result, so it cannot grow by appending
+INCREMENTAL_FORMATS = ["txt", "srt", "vtt", "tsv", "jsonl"]
+STATE_VERSION = 1
+LAST_SEGMENTS = 3
+
+def state_path(base_path):
+    """State file kept next to the outputs of a recording"""
+    return Path(base_path).with_suffix(".incremental.json")
+
+def load_state(path):
+    """Saved state of a recording, or None if there is none (or it is unreadable)"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return state if state.get("version") == STATE_VERSION else None
+
+def save_state(path, state):
+    """Replace the state file in one step"""
+    path = Path(path)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-", suffix=".json")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def format_appended(output_format, segments, first_id, new_file):
+    """
+    Text to append to an output for new segments
+
+    Args:
+        output_format (str): One of INCREMENTAL_FORMATS
+        segments (list): New segments, on the recording's timeline
+        first_id (int): Number of segments already in the output
+        new_file (bool): Whether the output is empty so far (headers go first)
+    """
+    parts = []
+    if output_format == "txt":
+        text = "".join(segment["text"] for segment in segments)
+        parts.append(text.lstrip() if new_file else text)
+    elif output_format in ("vtt", "tsv"):
+        if new_file:
+            parts.append(HEADERS[output_format])
+        format_one = format_vtt_segment if output_format == "vtt" else format_tsv_segment
+        parts.extend(format_one(segment) for segment in segments)
+    else:
+        for index, segment in enumerate(segments):
+            parts.append(format_segment(dict(segment, id=first_id + index), output_format))
+    return "".join(parts)
+
+def _held_back(reader, final, held):
+    """
+    Yield every window of a reader except the last, unless the recording is final
+
+    The last window ends wherever the recording currently stops, often in the
+    middle of a word, so it is transcribed again next time instead. Its offset
+    is left in held["offset"].
+    """
+    previous = None
+    for window in reader:
+        if previous is not None:
+            yield previous
+        previous = window
+    if previous is not None:
+        if final:
+            yield previous
+            held["offset"] = None
+        else:
+            held["offset"] = previous[0]
+
+def transcribe_incremental(model, file_path, model_size, formats, base_path=None, vad=False,
+                           final=False):
+    """
+    Bring the outputs of a growing recording up to date
+
+    Only audio after the offset saved by the previous run is decoded (the
+    decoder seeks there) and transcribed, with the end of the text so far as
+    the prompt. New segments are appended to the outputs, so an update costs
+    about the same however long the recording already is. The last window is
+    held back until the recording grows past it, or until a run finds the
+    file unchanged (or final is set), which means the recording has ended.
+
+    Args:
+        model: Loaded Whisper model
+        file_path (str): Recording that may still be growing
+        model_size (str): Model size, recorded in the state; a different one starts over
+        formats (list): Output formats, from INCREMENTAL_FORMATS
+        base_path (str): Outputs are named after this path (default: the recording)
+        vad (bool): Skip silence inside each window
+        final (bool): The recording is complete; transcribe everything left
+
+    Returns:
+        dict: "segments" appended, "from_seconds"/"to_seconds" transcribed, "held_back"
+              seconds not yet committed and the output "paths"
+    """
+    base_path = Path(base_path or file_path)
+    paths = output_paths(base_path, formats)
+    path = state_path(base_path)
+    size = os.path.getsize(file_path)
+
+    state = load_state(path)
+    if (state is None or state["model"] != model_size or state["formats"] != list(formats)
+            or size < state["audio_size"]):
+        # A new recording, or a different one under the same name: start the outputs over
+        state = {
+            "version": STATE_VERSION, "audio_file": str(file_path), "model": model_size,
+            "formats": list(formats), "audio_size": 0, "offset_seconds": 0.0,
+            "language": None, "prompt": "", "segments_written": 0, "last_segments": [],
+            "outputs": {output_format: 0 for output_format in formats},
+        }
+    else:
+        # The recording stopped growing since the last run: nothing more will come
+        final = final or size == state["audio_size"]
+
+    reader = PCMWindowReader(file_path, start_seconds=state["offset_seconds"])
+    held = {"offset": None}
+    stats = {}
+    options = {"initial_prompt": state["prompt"] or None}
+    if state["language"]:
+        options["language"] = state["language"]
+    segments = list(iter_segments(model, _held_back(reader, final, held), vad=vad, stats=stats,
+                                  **options))
+
+    # Drop anything a crashed run appended after its last saved state
+    for output_format, output_path in paths.items():
+        written = state["outputs"].get(output_format, 0)
+        with open(output_path, 'a+b') as f:
+            f.truncate(written)
+
+    first_id = state["segments_written"]
+    for index, segment in enumerate(segments):
+        segment["id"] = first_id + index
+    if segments:
+        for output_format, output_path in paths.items():
+            new_file = state["outputs"].get(output_format, 0) == 0
+            with open(output_path, 'a', encoding='utf-8') as f:
+                f.write(format_appended(output_format, segments, first_id, new_file))
+
+    end = held["offset"] if held["offset"] is not None else reader.duration
+    text = state["prompt"] + "".join(segment["text"] for segment in segments)
+    previous_offset = state["offset_seconds"]
+    state.update({
+        "audio_size": size,
+        "offset_seconds": round(max(end, previous_offset), 3),
+        "language": state["language"] or stats.get("language"),
+        "prompt": text.strip()[-PROMPT_CHARS:],
+        "segments_written": first_id + len(segments),
+        "last_segments": (state["last_segments"] + segments)[-LAST_SEGMENTS:],
+        "outputs": {output_format: os.path.getsize(output_path)
+                    for output_format, output_path in paths.items()},
+    })
+    save_state(path, state)
+
+    return {
+        "segments": len(segments),
+        "from_seconds": previous_offset,
+        "to_seconds": state["offset_seconds"],
+        "held_back": round(max(0.0, reader.duration - state["offset_seconds"]), 3),
+        "paths": list(paths.values()),
+    }
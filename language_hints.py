@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Language Hints
+Decide the spoken language once per folder instead of detecting it again for every file
+"""
+
+import subprocess
+from pathlib import Path
+
+HINT_FILE = ".whisper_language"
+DEFAULT_SAMPLE_SIZE = 8
+# Mean probability the top language needs across a folder's sample before it is reused
+MIN_AGREEMENT = 0.7
+DETECT_SECONDS = 30
+
+def read_hint(directory):
+    """
+    Language code from a directory's hint file, if it has one
+
+    The file holds a Whisper language code such as "en" or "de"; blank lines
+    and lines starting with # are ignored.
+    """
+    try:
+        with open(Path(directory) / HINT_FILE, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    return line.lower()
+    except OSError:
+        pass
+    return None
+
+def load_head(audio_file, seconds=DETECT_SECONDS, sample_rate=16000):
+    """Decode only the first seconds of a file, which is all language detection looks at"""
+    import numpy as np
+    command = [
+        "ffmpeg", "-nostdin", "-threads", "0", "-loglevel", "error",
+        "-i", str(audio_file), "-t", str(seconds),
+        "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(sample_rate), "-"
+    ]
+    output = subprocess.run(command, capture_output=True, check=True).stdout
+    return np.frombuffer(output, np.int16).flatten().astype(np.float32) / 32768.0
+
+def detect_common_language(model, audios, min_agreement=MIN_AGREEMENT):
+    """
+    Detect the language shared by several clips with one batched forward pass
+
+    Args:
+        model: Loaded Whisper model
+        audios (list): Waveforms; only the first 30 seconds of each are used
+        min_agreement (float): Mean probability the top language needs
+
+    Returns:
+        tuple: (language code or None if the clips disagree, mean probability)
+    """
+    import torch
+    import whisper
+    if not getattr(model, "is_multilingual", True):
+        return "en", 1.0
+    audios = [audio for audio in audios if len(audio)]
+    if not audios:
+        return None, 0.0
+
+    n_mels = getattr(getattr(model, "dims", None), "n_mels", 80)
+    mel = torch.stack([
+        whisper.log_mel_spectrogram(whisper.pad_or_trim(audio), n_mels) for audio in audios
+    ])
+    _, probs = model.detect_language(mel.to(model.device))
+
+    totals = {}
+    for clip_probs in probs:
+        for language, probability in clip_probs.items():
+            totals[language] = totals.get(language, 0.0) + probability
+    language = max(totals, key=totals.get)
+    agreement = totals[language] / len(probs)
+    return (language if agreement >= min_agreement else None), agreement
+
+class LanguageResolver:
+    def __init__(self, language=None, sample_size=DEFAULT_SAMPLE_SIZE):
+        """
+        Work out the language to pass to Whisper for each file
+
+        A language code forces that language everywhere. Otherwise a directory's
+        hint file decides, and with "auto" the language is detected once per
+        directory from a sample of its files. Files left without a language
+        are detected one by one, as Whisper does by default.
+
+        Args:
+            language (str): Language code, "auto", or None
+            sample_size (int): Files per directory sampled in auto mode
+        """
+        self.language = language
+        self.sample_size = sample_size
+        # Directory -> language (None: detect per file)
+        self.directories = {}
+        # Directory -> files to sample when it is first needed
+        self.samples = {}
+
+    @property
+    def forced(self):
+        """Whether one language was given for everything"""
+        return self.language not in (None, "auto")
+
+    def plan(self, audio_files):
+        """Choose evenly spread sample files for every directory in a run"""
+        by_directory = {}
+        for audio_file in audio_files:
+            by_directory.setdefault(Path(audio_file).parent, []).append(audio_file)
+        for directory, files in by_directory.items():
+            step = max(1, len(files) // self.sample_size)
+            self.samples[directory] = files[::step][:self.sample_size]
+
+    def resolve(self, model, directory):
+        """
+        Language for one directory, detecting it if needed (and possible)
+
+        Returns:
+            tuple: (language or None, where it came from: hint, detected, mixed or None)
+        """
+        directory = Path(directory)
+        hint = read_hint(directory)
+        if hint:
+            self.directories[directory] = hint
+            return hint, "hint"
+        if self.language != "auto" or model is None:
+            return None, None
+        # Only cache what a model decided; a worker with a model may still detect it
+        audios = []
+        for audio_file in self.samples.get(directory, []):
+            try:
+                audios.append(load_head(audio_file))
+            except (OSError, subprocess.CalledProcessError):
+                # Undecodable files are left to fail in the normal run
+                continue
+        language, _ = detect_common_language(model, audios)
+        self.directories[directory] = language
+        return language, "detected" if language else "mixed"
+
+    def language_for(self, model, audio_file):
+        """Language for one file (None lets Whisper detect it)"""
+        if self.forced:
+            return self.language
+        directory = Path(audio_file).parent
+        if directory not in self.directories:
+            self.samples.setdefault(directory, [audio_file])
+            self.resolve(model, directory)
+        return self.directories.get(directory)
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Model Cascade
+Transcribe with a small model and re-transcribe only its low-confidence segments with a larger one
+"""
+
+import math
+import time
+from voice_activity import SAMPLE_RATE, transcribe_speech_only
+from model_registry import get_model, split_model_name
+
+# Whisper's own fallback thresholds for a decode it does not trust
+DEFAULT_THRESHOLDS = {
+    "logprob": -1.0,       # escalate below this average token log probability
+    "no_speech": 0.6,      # escalate text whose no-speech probability is above this
+    "compression": 2.4,    # escalate above this gzip compression ratio (repetition loops)
+}
+
+# Audio padded around escalated segments, and gap below which two regions are merged
+PADDING_SECONDS = 0.5
+MERGE_GAP_SECONDS = 1.0
+PROMPT_CHARS = 200
+# Whisper decodes in windows of this length, so a short region costs a whole one
+WINDOW_SECONDS = 30
+
+# Approximate speed of each model relative to large (Whisper's model card), used to
+# estimate the large model's time on everything when it never had to run
+RELATIVE_SPEED = {"tiny": 32, "base": 16, "small": 6, "medium": 2, "large": 1}
+
+def escalation_reasons(segment, thresholds=DEFAULT_THRESHOLDS):
+    """
+    Which confidence checks a segment fails
+
+    Args:
+        segment (dict): Whisper segment with avg_logprob, no_speech_prob and compression_ratio
+        thresholds (dict): "logprob", "no_speech" and "compression" limits
+
+    Returns:
+        list: Names of the failed checks (empty if the segment is trusted)
+    """
+    reasons = []
+    if segment.get("avg_logprob", 0.0) < thresholds["logprob"]:
+        reasons.append("logprob")
+    if segment.get("no_speech_prob", 0.0) > thresholds["no_speech"] and segment.get("text", "").strip():
+        reasons.append("no_speech")
+    if segment.get("compression_ratio", 0.0) > thresholds["compression"]:
+        reasons.append("compression")
+    return reasons
+
+def plan_escalations(segments, total_seconds, thresholds=DEFAULT_THRESHOLDS):
+    """
+    Group the segments that need a second opinion into padded time regions
+
+    Returns:
+        list: Regions as (start seconds, end seconds, indices of the segments they replace)
+    """
+    regions = []
+    for index, segment in enumerate(segments):
+        if not escalation_reasons(segment, thresholds):
+            continue
+        start = max(0.0, segment["start"] - PADDING_SECONDS)
+        end = min(total_seconds, segment["end"] + PADDING_SECONDS)
+        if regions and start - regions[-1][1] <= MERGE_GAP_SECONDS:
+            regions[-1] = (regions[-1][0], max(end, regions[-1][1]), regions[-1][2] + [index])
+        else:
+            regions.append((start, end, [index]))
+    return regions
+
+def transcribe_cascade(model, audio, escalate_to, thresholds=None, vad=False, **options):
+    """
+    Transcribe a waveform with a small model, escalating doubtful segments
+
+    Segments that fail a confidence check are cut out (with a little context),
+    transcribed again by the larger model and spliced back in place of the
+    originals. Only redone segments centred inside the span the originals
+    covered are kept, so words decoded again from the padding are not
+    repeated. The larger model is only loaded if something needs it.
+
+    Args:
+        model: Loaded small Whisper model
+        audio (np.ndarray): Mono float32 waveform at 16 kHz
+        escalate_to (str): Model size used for doubtful segments
+        thresholds (dict): Escalation limits (default: DEFAULT_THRESHOLDS)
+        vad (bool): Skip silence in the first pass
+        **options: Passed through to model.transcribe
+
+    Returns:
+        dict: Whisper result with a "cascade" entry counting escalated segments and model time
+    """
+    thresholds = dict(DEFAULT_THRESHOLDS, **(thresholds or {}))
+    total_seconds = len(audio) / SAMPLE_RATE
+
+    start = time.perf_counter()
+    if vad:
+        result = transcribe_speech_only(model, audio, **options)
+    else:
+        result = model.transcribe(audio, **options)
+    small_seconds = time.perf_counter() - start
+
+    segments = result.get("segments", [])
+    regions = plan_escalations(segments, total_seconds, thresholds)
+    stats = {
+        "model": escalate_to,
+        "segments": len(segments),
+        "escalated_segments": sum(len(indices) for _, _, indices in regions),
+        "audio_seconds": round(total_seconds, 3),
+        "escalated_seconds": round(sum(end - begin for begin, end, _ in regions), 3),
+        "escalated_window_seconds": sum(math.ceil((end - begin) / WINDOW_SECONDS) * WINDOW_SECONDS
+                                        for begin, end, _ in regions),
+        "small_seconds": round(small_seconds, 3),
+        "large_seconds": 0.0,
+    }
+    if not regions:
+        result["cascade"] = stats
+        return result
+
+    large_model = get_model(escalate_to)
+    options = dict(options, language=options.get("language") or result.get("language"))
+    replaced = set()
+    spliced = []
+
+    start = time.perf_counter()
+    for begin, end, indices in regions:
+        # The trusted text just before the region keeps names and spelling consistent
+        before = "".join(segments[i]["text"] for i in range(indices[0]) if i not in replaced)
+        piece = audio[int(begin * SAMPLE_RATE):int(end * SAMPLE_RATE)]
+        redo = large_model.transcribe(piece, initial_prompt=before.strip()[-PROMPT_CHARS:] or None,
+                                      **options)
+        # The padding is only context: the region owns the span of the segments it replaces
+        keep_start = segments[indices[0]]["start"]
+        keep_end = segments[indices[-1]]["end"]
+        for segment in redo.get("segments", []):
+            middle = (segment["start"] + segment["end"]) / 2 + begin
+            if not keep_start <= middle < keep_end:
+                continue
+            segment["start"] = round(float(max(segment["start"] + begin, keep_start)), 3)
+            segment["end"] = round(float(min(segment["end"] + begin, keep_end)), 3)
+            for word in segment.get("words", []):
+                word["start"] = round(float(word["start"] + begin), 3)
+                word["end"] = round(float(word["end"] + begin), 3)
+            segment["escalated"] = True
+            spliced.append(segment)
+        # Trusted segments merged into the region were decoded again too
+        replaced.update(index for index, segment in enumerate(segments)
+                        if keep_start <= (segment["start"] + segment["end"]) / 2 <= keep_end)
+    stats["large_seconds"] = round(time.perf_counter() - start, 3)
+
+    merged = [segment for index, segment in enumerate(segments) if index not in replaced] + spliced
+    merged.sort(key=lambda segment: segment["start"])
+    for index, segment in enumerate(merged):
+        segment["id"] = index
+
+    result["segments"] = merged
+    result["text"] = "".join(segment["text"] for segment in merged)
+    result["cascade"] = stats
+    return result
+
+class CascadeReport:
+    def __init__(self, model_size, escalate_to):
+        """
+        Running totals of a cascade over many files
+
+        Args:
+            model_size (str): First-pass model size
+            escalate_to (str): Model size used for doubtful segments
+        """
+        self.model_size = model_size
+        self.escalate_to = escalate_to
+        self.files = 0
+        self.totals = {"segments": 0, "escalated_segments": 0, "audio_seconds": 0.0,
+                       "escalated_seconds": 0.0, "escalated_window_seconds": 0.0,
+                       "small_seconds": 0.0, "large_seconds": 0.0}
+
+    def add(self, stats):
+        """Add the "cascade" entry of one result"""
+        self.files += 1
+        for key in self.totals:
+            self.totals[key] += stats.get(key, 0)
+
+    def estimated_large_only_seconds(self):
+        """
+        Estimated model time had the larger model transcribed all of the audio
+
+        Measured from the escalated regions when there were some, per 30 s
+        window the larger model actually decoded (a 2 s region costs as much as
+        a full window), otherwise scaled from the small model's time by the
+        models' relative speeds.
+        """
+        totals = self.totals
+        if totals["escalated_window_seconds"] > 0 and totals["large_seconds"] > 0:
+            return (totals["large_seconds"] / totals["escalated_window_seconds"]
+                    * totals["audio_seconds"])
+        # Both sides share any quantization, so the plain sizes give the ratio
+        small_speed = RELATIVE_SPEED.get(split_model_name(self.model_size)[0])
+        large_speed = RELATIVE_SPEED.get(split_model_name(self.escalate_to)[0])
+        if small_speed and large_speed:
+            return totals["small_seconds"] * small_speed / large_speed
+        return None
+
+    def summary_lines(self):
+        """Human-readable escalation rate and time saved"""
+        totals = self.totals
+        if not self.files:
+            return []
+        segment_rate = 100.0 * totals["escalated_segments"] / totals["segments"] if totals["segments"] else 0.0
+        audio_rate = 100.0 * totals["escalated_seconds"] / totals["audio_seconds"] if totals["audio_seconds"] else 0.0
+        lines = [f"Cascade {self.model_size} -> {self.escalate_to}: escalated "
+                 f"{totals['escalated_segments']} of {totals['segments']} segments "
+                 f"({segment_rate:.1f}%, {audio_rate:.1f}% of audio)"]
+
+        spent = totals["small_seconds"] + totals["large_seconds"]
+        estimate = self.estimated_large_only_seconds()
+        if estimate:
+            saved = 100.0 * (1 - spent / estimate)
+            lines.append(f"Cascade model time: {spent:.1f}s vs ~{estimate:.1f}s for "
+                         f"{self.escalate_to} alone ({saved:.0f}% saved)")
+        return lines
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Model Registry
+Loads each Whisper model once per process and keeps several resident within a memory budget
+"""
+
+import os
+import tempfile
+import threading
+from pathlib import Path
+from collections import OrderedDict
+
+DEFAULT_MEMORY_BUDGET_MB = float(os.environ.get("WHISPER_MODEL_BUDGET_MB", 4096))
+QUANTIZE_MODES = ["int8"]
+DEFAULT_QUANTIZED_DIR = Path(os.environ.get(
+    "WHISPER_QUANTIZED_CACHE",
+    Path.home() / ".cache" / "whisper_quantized"
+))
+
+def model_size_bytes(model):
+    """Memory held by a model's parameters and buffers"""
+    tensors = list(model.parameters()) + list(model.buffers())
+    if hasattr(model, "modules"):
+        for module in model.modules():
+            # Dynamically quantized layers keep their packed weights outside the parameters
+            weight = getattr(module, "weight", None)
+            if callable(weight):
+                tensors.append(weight())
+    return sum(tensor.numel() * tensor.element_size() for tensor in tensors)
+
+def quantized_name(model_size, quantize=None):
+    """Registry name of a model size with optional quantization (e.g. base-int8)"""
+    return f"{model_size}-{quantize}" if quantize else model_size
+
+def split_model_name(name):
+    """
+    Split a registry name into its model size and quantization
+
+    Returns:
+        tuple: (model size, quantization mode or None)
+    """
+    size, _, mode = name.rpartition("-")
+    if size and mode in QUANTIZE_MODES:
+        return size, mode
+    return name, None
+
+def quantize_model(model):
+    """Apply dynamic int8 quantization to every linear layer of a CPU model"""
+    import torch
+    import whisper.model
+    for module in model.modules():
+        # Whisper's Linear only adds a dtype cast, which fp32 weights on CPU never need
+        if isinstance(module, whisper.model.Linear):
+            module.__class__ = torch.nn.Linear
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+def load_quantized(model_size, quantize="int8", cache_dir=None):
+    """
+    Load a quantized model, building it from the fp32 weights on first use
+
+    The quantized model is saved under cache_dir, named after the Whisper and
+    torch versions that built it, so later loads skip the conversion.
+
+    Args:
+        model_size (str): Whisper model size
+        quantize (str): Quantization mode (int8)
+        cache_dir (str): Quantized model directory (default: DEFAULT_QUANTIZED_DIR)
+    """
+    import torch
+    import whisper
+    if quantize not in QUANTIZE_MODES:
+        raise ValueError(f"unknown quantization '{quantize}' (choose from {', '.join(QUANTIZE_MODES)})")
+    
+    cache_dir = Path(cache_dir) if cache_dir else DEFAULT_QUANTIZED_DIR
+    path = cache_dir / f"{model_size}-{quantize}-whisper{whisper.__version__}-torch{torch.__version__}.pt"
+    if path.exists():
+        try:
+            return torch.load(path, map_location="cpu", weights_only=False)
+        except Exception:
+            # Unreadable (e.g. a torn write from an older build): rebuild it
+            pass
+    
+    model = quantize_model(whisper.load_model(model_size, device="cpu"))
+    
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, prefix=".tmp-", suffix=".pt")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            torch.save(model, f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return model
+
+class ModelRegistry:
+    def __init__(self, budget_mb=DEFAULT_MEMORY_BUDGET_MB):
+        """
+        Initialize an empty registry
+        
+        Args:
+            budget_mb (float): Memory the resident models may use together; least
+                               recently used models are dropped to stay under it
+        """
+        self.budget_bytes = int(budget_mb * 1024 * 1024)
+        self.models = OrderedDict()
+        self.sizes = {}
+        self.lock = threading.RLock()
+    
+    def is_loaded(self, model_size):
+        """Check whether a model is resident without loading it"""
+        with self.lock:
+            return model_size in self.models
+    
+    def loaded_models(self):
+        """Resident model names, least recently used first"""
+        with self.lock:
+            return list(self.models)
+    
+    def get(self, model_size):
+        """
+        Return a model, loading it only if it is not already resident
+        
+        Args:
+            model_size (str): Whisper model size, optionally quantized (e.g. base-int8)
+        """
+        with self.lock:
+            if model_size in self.models:
+                self.models.move_to_end(model_size)
+                return self.models[model_size]
+            
+            import whisper
+            print(f"Loading Whisper model: {model_size}")
+            size, quantize = split_model_name(model_size)
+            if quantize:
+                model = load_quantized(size, quantize)
+            else:
+                model = whisper.load_model(size)
+            
+            self.models[model_size] = model
+            self.sizes[model_size] = model_size_bytes(model)
+            self._evict(keep=model_size)
+            return model
+    
+    def register(self, model_size, model):
+        """Make an already-built model available under a name (e.g. a stand-in for tests)"""
+        with self.lock:
+            self.models[model_size] = model
+            self.models.move_to_end(model_size)
+            self.sizes[model_size] = model_size_bytes(model)
+            self._evict(keep=model_size)
+    
+    def unload(self, model_size):
+        """Drop one model if it is resident"""
+        with self.lock:
+            self.models.pop(model_size, None)
+            self.sizes.pop(model_size, None)
+    
+    def set_budget(self, budget_mb):
+        """Change the memory budget, evicting models if it shrank"""
+        with self.lock:
+            self.budget_bytes = int(budget_mb * 1024 * 1024)
+            self._evict()
+    
+    def _evict(self, keep=None):
+        """Drop least recently used models until the budget is met"""
+        while sum(self.sizes.values()) > self.budget_bytes:
+            victim = next((name for name in self.models if name != keep), None)
+            if victim is None:
+                # A single model larger than the budget stays loaded
+                break
+            print(f"Unloading Whisper model: {victim}")
+            del self.models[victim]
+            del self.sizes[victim]
+    
+    def clear(self):
+        """Unload every model"""
+        with self.lock:
+            self.models.clear()
+            self.sizes.clear()
+
+_registry = ModelRegistry()
+
+def get_registry():
+    """Return the process-wide registry"""
+    return _registry
+
+def get_model(model_size):
+    """Return a model from the process-wide registry"""
+    return _registry.get(model_size)
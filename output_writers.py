@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Output Writers
+Write one Whisper result in any set of transcript and caption formats
+"""
+
+import os
+import json
+import tempfile
+from pathlib import Path
+from segment_stream import format_segment, format_timestamp
+
+FORMATS = ["txt", "json", "srt", "vtt", "tsv", "jsonl"]
+
+# Larger than the default so a long caption file goes out in a few system calls
+WRITE_BUFFER_BYTES = 1024 * 1024
+
+def parse_formats(text):
+    """
+    Parse a comma-separated format list such as "srt,vtt,txt"
+    
+    Returns:
+        list: Formats in the order given, without repeats
+    
+    Raises:
+        ValueError: If a format is not supported
+    """
+    formats = []
+    for name in text.split(","):
+        name = name.strip().lower()
+        if not name:
+            continue
+        if name not in FORMATS:
+            raise ValueError(f"unknown format '{name}' (choose from {', '.join(FORMATS)})")
+        if name not in formats:
+            formats.append(name)
+    if not formats:
+        raise ValueError("no output formats given")
+    return formats
+
+def _segments(result):
+    """Segments of a result, or one segment covering the text if there are none"""
+    segments = result.get("segments")
+    if segments:
+        return segments
+    text = result.get("text", "").strip()
+    return [{"id": 0, "start": 0.0, "end": 0.0, "text": text}] if text else []
+
+def write_txt(f, result, header=None):
+    """Plain transcript text, after an optional header"""
+    if header:
+        f.write(header)
+    f.write(result["text"].strip())
+
+def write_json(f, result, header=None):
+    """Complete Whisper result"""
+    json.dump(result, f, indent=2, ensure_ascii=False)
+
+def write_jsonl(f, result, header=None):
+    """One JSON object per segment"""
+    for segment in _segments(result):
+        f.write(format_segment(segment, "jsonl"))
+
+def write_srt(f, result, header=None):
+    """SubRip captions"""
+    for index, segment in enumerate(_segments(result)):
+        f.write(format_segment(dict(segment, id=index), "srt"))
+
+# Text that opens a file, for the formats that have one
+HEADERS = {
+    "vtt": "WEBVTT\n\n",
+    # Same layout as Whisper's own tsv output: start and end in integer milliseconds
+    "tsv": "start\tend\ttext\n",
+}
+
+def format_vtt_segment(segment):
+    """One WebVTT cue"""
+    return (f"{format_timestamp(segment['start'], '.')} --> {format_timestamp(segment['end'], '.')}\n"
+            f"{segment['text'].strip()}\n\n")
+
+def format_tsv_segment(segment):
+    """One tab-separated row"""
+    text = segment["text"].strip().replace("\t", " ")
+    return f"{int(round(segment['start'] * 1000))}\t{int(round(segment['end'] * 1000))}\t{text}\n"
+
+def write_vtt(f, result, header=None):
+    """WebVTT captions"""
+    f.write(HEADERS["vtt"])
+    for segment in _segments(result):
+        f.write(format_vtt_segment(segment))
+
+def write_tsv(f, result, header=None):
+    """Tab-separated segments"""
+    f.write(HEADERS["tsv"])
+    for segment in _segments(result):
+        f.write(format_tsv_segment(segment))
+
+WRITERS = {
+    "txt": write_txt,
+    "json": write_json,
+    "srt": write_srt,
+    "vtt": write_vtt,
+    "tsv": write_tsv,
+    "jsonl": write_jsonl,
+}
+
+def write_output(path, output_format, result, header=None):
+    """
+    Write a result in one format, replacing the file in one step
+    
+    The output goes to a temporary file in the same directory, which is renamed
+    over the target only once it is complete, so a crash or a reader never sees
+    a half-written transcript.
+    
+    Args:
+        path (str): File to write
+        output_format (str): One of FORMATS
+        result (dict): Whisper result
+        header (str): Text written before a txt transcript (optional)
+    """
+    path = Path(path)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-", suffix=path.suffix)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', buffering=WRITE_BUFFER_BYTES) as f:
+            WRITERS[output_format](f, result, header)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def output_paths(base_path, formats):
+    """Map each format to base_path with that format's extension"""
+    base_path = Path(base_path)
+    return {output_format: base_path.with_suffix(f".{output_format}") for output_format in formats}
+
+def write_outputs(result, paths, header=None):
+    """
+    Write one result in several formats
+    
+    Args:
+        result (dict): Whisper result
+        paths (dict): Format -> file path, e.g. from output_paths
+        header (str): Text written before a txt transcript (optional)
+    
+    Returns:
+        list: Paths written, in the order given
+    """
+    for output_format, path in paths.items():
+        write_output(path, output_format, result, header)
+    return list(paths.values())
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Segment Streaming
+Transcribe audio window by window and hand out segments as soon as they are decoded
+"""
+
+import json
+import time
+import subprocess
+import numpy as np
+from voice_activity import SAMPLE_RATE, frame_energy_db, transcribe_speech_only
+from stage_metrics import EncoderTimer
+
+# Windows are cut at silences near this length, staying under Whisper's 30 s context
+DEFAULT_WINDOW_SECONDS = 25
+PROMPT_CHARS = 200
+
+STREAM_FORMATS = ["jsonl", "srt", "txt"]
+
+def quietest_cut(audio, sample_rate=SAMPLE_RATE, target_seconds=DEFAULT_WINDOW_SECONDS,
+                 search_seconds=4, frame_ms=30):
+    """
+    Sample index of the quietest frame within search_seconds of target_seconds
+    
+    The cut always falls inside the waveform (never at its end), so a window
+    ending there is shorter than the audio it was cut from.
+    """
+    energy = frame_energy_db(audio, sample_rate, frame_ms)
+    frame_len = int(sample_rate * frame_ms / 1000)
+    target = int(target_seconds * 1000 / frame_ms)
+    search = int(search_seconds * 1000 / frame_ms)
+    lo = max(1, target - search)
+    hi = min(len(energy), target + search + 1)
+    if hi <= lo:
+        return min(len(audio) - 1, int(target_seconds * sample_rate))
+    return (lo + int(energy[lo:hi].argmin())) * frame_len
+
+def iter_windows(audio, sample_rate=SAMPLE_RATE, window_seconds=DEFAULT_WINDOW_SECONDS):
+    """
+    Split a waveform into consecutive windows that end at silences
+    
+    Cuts are made the same way as PCMWindowReader's, so no window is longer
+    than window_seconds plus the search span around it.
+    
+    Yields:
+        tuple: (offset in seconds, window waveform)
+    """
+    search_seconds = min(4, window_seconds / 5)
+    limit = int((window_seconds + search_seconds) * sample_rate)
+    start = 0
+    while start < len(audio):
+        end = len(audio)
+        if end - start > limit:
+            end = start + quietest_cut(audio[start:start + limit], sample_rate, window_seconds,
+                                       search_seconds)
+        yield start / sample_rate, audio[start:end]
+        start = end
+
+class PCMWindowReader:
+    """
+    Decode an audio file through ffmpeg one window at a time
+    
+    PCM is read from the decoder's pipe into a single fixed-size buffer and
+    handed out in windows cut at silences, so memory use does not grow with the
+    length of the recording the way whisper.load_audio does. Iterating yields
+    the same (offset seconds, window waveform) pairs as iter_windows.
+    
+    After iteration, duration holds the audio length in seconds and
+    decode_seconds the time spent waiting on the decoder. With start_seconds
+    the decoder seeks there first and offsets stay on the file's timeline.
+    """
+    
+    def __init__(self, file_path, sample_rate=SAMPLE_RATE, window_seconds=DEFAULT_WINDOW_SECONDS,
+                 start_seconds=0.0):
+        self.file_path = str(file_path)
+        self.start_seconds = start_seconds
+        self.sample_rate = sample_rate
+        self.window_seconds = window_seconds
+        self.search_seconds = min(4, window_seconds / 5)
+        self.duration = None
+        self.decode_seconds = 0.0
+    
+    def _fill(self, pipe, buffer, filled):
+        """Read from the pipe until the buffer is full or the stream ends; returns samples held"""
+        start = time.perf_counter()
+        view = memoryview(buffer).cast('B')
+        position = filled * 2
+        while position < len(view):
+            count = pipe.readinto(view[position:])
+            if not count:
+                break
+            position += count
+        self.decode_seconds += time.perf_counter() - start
+        return position // 2
+    
+    def __iter__(self):
+        # Seeking on the input skips straight to the offset instead of decoding up to it
+        seek = ["-ss", f"{self.start_seconds:.3f}"] if self.start_seconds > 0 else []
+        command = [
+            "ffmpeg", "-nostdin", "-threads", "0", "-loglevel", "error",
+            *seek, "-i", self.file_path,
+            "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(self.sample_rate),
+            "-",
+        ]
+        # One window plus the stretch searched for a quiet place to cut
+        capacity = int((self.window_seconds + self.search_seconds) * self.sample_rate)
+        buffer = np.empty(capacity, dtype=np.int16)
+        filled = 0
+        offset = 0
+        self.duration = self.start_seconds
+        self.decode_seconds = 0.0
+        
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        try:
+            while True:
+                filled = self._fill(process.stdout, buffer, filled)
+                if filled == 0:
+                    break
+                
+                window = buffer[:filled].astype(np.float32) / 32768.0
+                cut = filled
+                if filled == capacity:
+                    # More audio may follow: end this window at the quietest point near its target length
+                    cut = quietest_cut(window, self.sample_rate, self.window_seconds,
+                                       self.search_seconds)
+                    window = window[:cut]
+                
+                yield self.start_seconds + offset / self.sample_rate, window
+                
+                offset += cut
+                self.duration = self.start_seconds + offset / self.sample_rate
+                buffer[:filled - cut] = buffer[cut:filled]
+                filled -= cut
+            
+            error = process.stderr.read().decode('utf-8', errors='replace').strip()
+            if process.wait() != 0:
+                raise RuntimeError(f"Failed to load audio: {error}")
+        finally:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            process.stdout.close()
+            process.stderr.close()
+
+def iter_segments(model, windows, vad=False, stats=None, **options):
+    """
+    Transcribe windows in order and yield each segment on the original timeline
+    
+    The text of the previous window is passed as the prompt for the next one, and
+    the language found in the first window is reused so it is detected only once.
+    
+    Args:
+        model: Loaded Whisper model
+        windows: Iterable of (offset seconds, waveform) pairs
+        vad (bool): Skip silence inside each window
+        stats (dict): Filled in with the detected "language" and, with vad, the
+                      VAD totals across all windows (optional)
+        **options: Passed through to model.transcribe
+    
+    Yields:
+        dict: Whisper segment with absolute start/end times and a running id
+    """
+    options = dict(options)
+    prompt = options.pop("initial_prompt", None)
+    segment_id = 0
+    
+    for offset, window in windows:
+        if vad:
+            result = transcribe_speech_only(model, window, initial_prompt=prompt, **options)
+        else:
+            result = model.transcribe(window, initial_prompt=prompt, **options)
+        
+        if result.get("language") and not options.get("language"):
+            options["language"] = result["language"]
+        
+        if stats is not None:
+            stats["language"] = options.get("language")
+            if result.get("vad"):
+                totals = stats.setdefault("vad", {})
+                for key, seconds in result["vad"].items():
+                    totals[key] = round(totals.get(key, 0.0) + seconds, 2)
+        
+        for segment in result.get("segments", []):
+            segment["id"] = segment_id
+            segment["start"] = round(float(segment["start"] + offset), 3)
+            segment["end"] = round(float(segment["end"] + offset), 3)
+            for word in segment.get("words", []):
+                word["start"] = round(float(word["start"] + offset), 3)
+                word["end"] = round(float(word["end"] + offset), 3)
+            segment_id += 1
+            yield segment
+        
+        text = result.get("text", "").strip()
+        if text:
+            prompt = text[-PROMPT_CHARS:]
+
+def transcribe_windows(model, windows, vad=False, timings=None, **options):
+    """
+    Transcribe windows in order and gather the segments into one result
+    
+    Args:
+        model: Loaded Whisper model
+        windows: Iterable of (offset seconds, waveform) pairs, e.g. a PCMWindowReader
+        vad (bool): Skip silence inside each window
+        timings (dict): Stage name -> seconds; encoder and decoder time are added (optional)
+        **options: Passed through to model.transcribe
+    
+    Returns:
+        dict: Whisper-style result with text, segments, language and (with vad) VAD totals
+    """
+    stats = {}
+    with EncoderTimer(model) as encoder:
+        start = time.perf_counter()
+        segments = list(iter_segments(model, windows, vad=vad, stats=stats, **options))
+        model_time = time.perf_counter() - start
+    
+    if timings is not None:
+        timings["encoder"] = encoder.seconds
+        timings["decoder"] = max(0.0, model_time - encoder.seconds)
+    
+    result = {
+        "text": "".join(segment["text"] for segment in segments),
+        "segments": segments,
+        "language": stats.get("language"),
+    }
+    if "vad" in stats:
+        result["vad"] = stats["vad"]
+    return result
+
+def format_timestamp(seconds, separator=","):
+    """Format seconds as HH:MM:SS,mmm (SRT) or HH:MM:SS.mmm (VTT)"""
+    milliseconds = int(round(seconds * 1000))
+    hours, milliseconds = divmod(milliseconds, 3_600_000)
+    minutes, milliseconds = divmod(milliseconds, 60_000)
+    secs, milliseconds = divmod(milliseconds, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{milliseconds:03d}"
+
+def format_segment(segment, stream_format):
+    """
+    Render one segment for streaming output
+    
+    Args:
+        segment (dict): Whisper segment
+        stream_format (str): "jsonl", "srt" or "txt"
+    """
+    text = segment["text"].strip()
+    
+    if stream_format == "jsonl":
+        return json.dumps({
+            "id": segment["id"],
+            "start": segment["start"],
+            "end": segment["end"],
+            "text": text,
+        }, ensure_ascii=False) + "\n"
+    
+    if stream_format == "srt":
+        return (f"{segment['id'] + 1}\n"
+                f"{format_timestamp(segment['start'])} --> {format_timestamp(segment['end'])}\n"
+                f"{text}\n\n")
+    
+    return text + "\n"
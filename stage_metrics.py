@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Stage Metrics
+Per-stage timing of transcription runs, exported as a JSON report or a Prometheus textfile
+"""
+
+import os
+import json
+import time
+import socket
+import tempfile
+from pathlib import Path
+from voice_activity import detect_speech, extract_speech, transcribe_speech_only
+
+# Stages in pipeline order; "inference" is the total model time, of which
+# language detection, encoder and decoder are the parts
+STAGES = ["model_load", "decode", "language_detection", "encoder", "decoder", "inference", "write"]
+
+# Histogram bucket upper bounds in seconds
+DEFAULT_BUCKETS = [0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600]
+
+class EncoderTimer:
+    """
+    Context manager that adds up the time spent in a Whisper model's audio encoder
+    
+    Forward hooks are attached to model.encoder for the duration of the block.
+    Models without an encoder (or without hooks) simply report zero.
+    """
+    
+    def __init__(self, model):
+        self.encoder = getattr(model, "encoder", None)
+        self.seconds = 0.0
+        self._start = None
+        self._handles = []
+    
+    def _before(self, module, inputs):
+        self._start = time.perf_counter()
+    
+    def _after(self, module, inputs, output):
+        # CUDA kernels run asynchronously; wait so the time is the encoder's own
+        if getattr(output, "is_cuda", False):
+            import torch
+            torch.cuda.synchronize()
+        self.seconds += time.perf_counter() - self._start
+    
+    def __enter__(self):
+        if hasattr(self.encoder, "register_forward_pre_hook"):
+            self._handles = [
+                self.encoder.register_forward_pre_hook(self._before),
+                self.encoder.register_forward_hook(self._after),
+            ]
+        return self
+    
+    def __exit__(self, *exc_info):
+        for handle in self._handles:
+            handle.remove()
+        self._handles = []
+        return False
+
+def detect_language(model, audio):
+    """Detect the spoken language from the first 30 seconds of a waveform"""
+    import whisper
+    n_mels = getattr(getattr(model, "dims", None), "n_mels", 80)
+    mel = whisper.log_mel_spectrogram(whisper.pad_or_trim(audio), n_mels)
+    _, probs = model.detect_language(mel.to(model.device))
+    return max(probs, key=probs.get)
+
+def transcribe_timed(model, audio, timings, vad=False, **options):
+    """
+    Transcribe a waveform, recording where the model time goes
+    
+    Language detection is run up front (it is what model.transcribe would do
+    first anyway) and the detected language is passed on, so it gets its own
+    timing. The rest is split between encoder and decoder.
+    
+    Args:
+        model: Loaded Whisper model
+        audio (np.ndarray): Mono float32 waveform at 16 kHz
+        timings (dict): Stage name -> seconds; filled in by this function (None: not recorded)
+        vad (bool): Skip silence with voice activity detection
+        **options: Passed through to model.transcribe
+    
+    Returns:
+        dict: Whisper result
+    """
+    if timings is None:
+        timings = {}
+    
+    if (not options.get("language") and hasattr(model, "detect_language")
+            and getattr(model, "is_multilingual", True)):
+        start = time.perf_counter()
+        sample = extract_speech(audio, detect_speech(audio)) if vad else audio
+        if len(sample):
+            options["language"] = detect_language(model, sample)
+        timings["language_detection"] = time.perf_counter() - start
+    
+    with EncoderTimer(model) as encoder:
+        start = time.perf_counter()
+        if vad:
+            result = transcribe_speech_only(model, audio, **options)
+        else:
+            result = model.transcribe(audio, **options)
+        model_time = time.perf_counter() - start
+    
+    timings["encoder"] = encoder.seconds
+    timings["decoder"] = max(0.0, model_time - encoder.seconds)
+    return result
+
+def _percentile(values, fraction):
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))
+    return ordered[index]
+
+def _write_atomic(path, text):
+    """Replace a file in one step so readers (e.g. node exporter) never see half of it"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-", suffix=path.suffix)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+class StageMetrics:
+    def __init__(self, tool, model_size, buckets=DEFAULT_BUCKETS):
+        """
+        Initialize an empty set of metrics
+        
+        Args:
+            tool (str): Name of the tool recording the run ("batch" or "cli")
+            model_size (str): Whisper model size used
+            buckets (list): Histogram bucket upper bounds in seconds
+        """
+        self.tool = tool
+        self.model_size = model_size
+        self.buckets = sorted(buckets)
+        self.observations = {}
+        self.files = []
+        self.wall_seconds = None
+        self.started = time.time()
+    
+    def observe(self, stage, seconds):
+        """Add one timing for a stage"""
+        self.observations.setdefault(stage, []).append(seconds)
+    
+    def record_file(self, audio_file, timings=None, audio_seconds=None, cached=False, ok=True):
+        """
+        Record the outcome and stage timings of one file
+        
+        Args:
+            audio_file (str): Path to the audio file
+            timings (dict): Stage name -> seconds
+            audio_seconds (float): Audio duration, if it was decoded
+            cached (bool): Whether the transcript came from the cache
+            ok (bool): Whether the file was transcribed successfully
+        """
+        timings = dict(timings or {})
+        for stage, seconds in timings.items():
+            self.observe(stage, seconds)
+        
+        entry = {
+            "file": str(audio_file),
+            "ok": ok,
+            "cached": cached,
+            "audio_seconds": round(audio_seconds, 3) if audio_seconds is not None else None,
+            "timings": {stage: round(seconds, 4) for stage, seconds in timings.items()},
+        }
+        
+        # Real-time factor only means something when the model actually ran
+        processing = sum(seconds for stage, seconds in timings.items()
+                         if stage in ("decode", "inference", "write"))
+        if audio_seconds and "inference" in timings:
+            entry["real_time_factor"] = round(processing / audio_seconds, 4)
+        
+        self.files.append(entry)
+    
+    def _histogram(self, values):
+        """Cumulative bucket counts for a list of timings"""
+        counts = [sum(1 for value in values if value <= bound) for bound in self.buckets]
+        return {"buckets": dict(zip(map(str, self.buckets), counts)),
+                "count": len(values), "sum": round(sum(values), 4)}
+    
+    def summary(self):
+        """
+        Aggregate view of the run
+        
+        Returns:
+            dict: Counts, audio totals, real-time factor and per-stage statistics
+        """
+        transcribed = [entry for entry in self.files if "real_time_factor" in entry]
+        audio_seconds = sum(entry["audio_seconds"] for entry in transcribed)
+        processing = sum(sum(seconds for stage, seconds in entry["timings"].items()
+                             if stage in ("decode", "inference", "write"))
+                         for entry in transcribed)
+        
+        stages = {}
+        for stage in sorted(self.observations, key=lambda s: STAGES.index(s) if s in STAGES else len(STAGES)):
+            values = self.observations[stage]
+            stages[stage] = dict(
+                self._histogram(values),
+                mean=round(sum(values) / len(values), 4),
+                p50=round(_percentile(values, 0.5), 4),
+                p95=round(_percentile(values, 0.95), 4),
+                max=round(max(values), 4),
+            )
+        
+        return {
+            "files": len(self.files),
+            "successful": sum(entry["ok"] for entry in self.files),
+            "failed": sum(not entry["ok"] for entry in self.files),
+            "cached": sum(entry["cached"] for entry in self.files),
+            "audio_seconds": round(audio_seconds, 3),
+            "real_time_factor": round(processing / audio_seconds, 4) if audio_seconds else None,
+            "wall_seconds": round(self.wall_seconds, 3) if self.wall_seconds is not None else None,
+            "stages": stages,
+        }
+    
+    def to_json(self):
+        """Full report: run details, aggregate summary and every file"""
+        return json.dumps({
+            "tool": self.tool,
+            "model": self.model_size,
+            "host": socket.gethostname(),
+            "started": time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.started)),
+            "summary": self.summary(),
+            "files": self.files,
+        }, indent=2)
+    
+    def to_prometheus(self):
+        """Aggregate metrics in the Prometheus text exposition format"""
+        labels = f'tool="{self.tool}",model="{self.model_size}"'
+        summary = self.summary()
+        lines = [
+            "# HELP whisper_stage_seconds Time spent in each transcription stage",
+            "# TYPE whisper_stage_seconds histogram",
+        ]
+        for stage, values in summary["stages"].items():
+            stage_labels = f'{labels},stage="{stage}"'
+            for bound, count in values["buckets"].items():
+                lines.append(f'whisper_stage_seconds_bucket{{{stage_labels},le="{bound}"}} {count}')
+            lines.append(f'whisper_stage_seconds_bucket{{{stage_labels},le="+Inf"}} {values["count"]}')
+            lines.append(f'whisper_stage_seconds_sum{{{stage_labels}}} {values["sum"]}')
+            lines.append(f'whisper_stage_seconds_count{{{stage_labels}}} {values["count"]}')
+        
+        lines += [
+            "# HELP whisper_last_run_files Files handled in the last run",
+            "# TYPE whisper_last_run_files gauge",
+            f'whisper_last_run_files{{{labels},status="successful"}} {summary["successful"]}',
+            f'whisper_last_run_files{{{labels},status="failed"}} {summary["failed"]}',
+            f'whisper_last_run_files{{{labels},status="cached"}} {summary["cached"]}',
+            "# HELP whisper_last_run_audio_seconds Audio transcribed by the model in the last run",
+            "# TYPE whisper_last_run_audio_seconds gauge",
+            f'whisper_last_run_audio_seconds{{{labels}}} {summary["audio_seconds"]}',
+        ]
+        if summary["real_time_factor"] is not None:
+            lines += [
+                "# HELP whisper_real_time_factor Processing time divided by audio duration in the last run",
+                "# TYPE whisper_real_time_factor gauge",
+                f'whisper_real_time_factor{{{labels}}} {summary["real_time_factor"]}',
+            ]
+        lines += [
+            "# HELP whisper_last_run_timestamp_seconds When the last run finished",
+            "# TYPE whisper_last_run_timestamp_seconds gauge",
+            f'whisper_last_run_timestamp_seconds{{{labels}}} {time.time():.0f}',
+        ]
+        return "\n".join(lines) + "\n"
+    
+    def export(self, json_path=None, prometheus_path=None):
+        """Write the JSON report and/or Prometheus textfile"""
+        if json_path:
+            _write_atomic(json_path, self.to_json() + "\n")
+            print(f"Metrics report saved to: {json_path}")
+        if prometheus_path:
+            _write_atomic(prometheus_path, self.to_prometheus())
+            print(f"Prometheus metrics saved to: {prometheus_path}")
@@ -6,11 +6,20 @@ Test the transcription tools with a sample or user-provided audio file
 
 import os
 import sys
+import json
+import time
 import tkinter as tk
 from tkinter import filedialog, messagebox
+import tempfile
 import subprocess
 from pathlib import Path
 
+# Importing these takes seconds; the tools must only load them when transcribing
+HEAVY_MODULES = ["torch", "whisper"]
+STARTUP_MODULES = ["transcribe_cli", "batch_transcribe", "transcribe_daemon", "transcription_api",
+                   "transcription_app", "transcript_store", "thread_profile"]
+STARTUP_BUDGET_SECONDS = 1.0
+
 def test_cli_transcription():
     """Test the CLI transcription tool"""
     print("Testing CLI transcription...")
@@ -88,6 +97,12 @@ def check_installation():
     except ImportError:
         print("⚠ Pydub not installed (may affect some audio formats)")
     
+    try:
+        import watchdog
+        print("✓ Watchdog is installed (watch mode uses filesystem events)")
+    except ImportError:
+        print("⚠ Watchdog not installed (watch mode will poll the folder)")
+    
     # Check if scripts exist
     scripts = ["transcription_app.py", "transcribe_cli.py", "batch_transcribe.py"]
     for script in scripts:
@@ -98,6 +113,107 @@ def check_installation():
     
     return True
 
+def check_startup(budget=STARTUP_BUDGET_SECONDS):
+    """
+    Check that the tools start quickly
+    
+    Importing each tool must not pull in torch or Whisper, and `--help` must
+    finish within the time budget.
+    
+    Args:
+        budget (float): Allowed seconds for `--help`
+    
+    Returns:
+        bool: True if every check passed
+    """
+    print("Checking startup time...")
+    
+    here = Path(__file__).parent
+    python_exe = sys.executable
+    passed = True
+    
+    probe = ("import importlib, json, sys; importlib.import_module(sys.argv[1]); "
+             "print(json.dumps([name for name in sys.argv[2:] if name in sys.modules]))")
+    
+    for module in STARTUP_MODULES:
+        result = subprocess.run([python_exe, "-c", probe, module, *HEAVY_MODULES],
+                                cwd=here, capture_output=True, text=True, timeout=120)
+        if result.returncode != 0:
+            error = (result.stderr.strip().splitlines() or ["unknown error"])[-1]
+            if module == "transcription_app" and "tkinter" in error:
+                print(f"⚠ {module} skipped (Tkinter not available)")
+                continue
+            print(f"✗ {module} failed to import: {error}")
+            passed = False
+            continue
+        
+        loaded = json.loads(result.stdout.strip().splitlines()[-1])
+        if loaded:
+            print(f"✗ {module} imports {', '.join(loaded)} at startup")
+            passed = False
+        else:
+            print(f"✓ {module} imports without {' or '.join(HEAVY_MODULES)}")
+    
+    for script in ["transcribe_cli.py", "batch_transcribe.py", "transcribe_daemon.py",
+                   "transcription_api.py", "transcript_store.py"]:
+        start = time.perf_counter()
+        result = subprocess.run([python_exe, str(here / script), "--help"],
+                                capture_output=True, text=True, timeout=120)
+        elapsed = time.perf_counter() - start
+        
+        if result.returncode != 0:
+            print(f"✗ {script} --help failed")
+            passed = False
+        elif elapsed > budget:
+            print(f"✗ {script} --help took {elapsed:.2f}s (budget {budget:.2f}s)")
+            passed = False
+        else:
+            print(f"✓ {script} --help took {elapsed:.2f}s")
+    
+    return passed
+
+def check_window_cuts(seconds=90):
+    """
+    Check that streamed windows are cut at silences inside the decode buffer
+    
+    Decodes synthetic speech-like audio through PCMWindowReader (needs ffmpeg)
+    and fails if a window that was followed by more audio filled the whole
+    buffer, i.e. was hard-cut instead of cut at a quiet point, or if any
+    window is longer than Whisper's 30 s context.
+    
+    Returns:
+        bool: True if every window passed
+    """
+    print("Checking window cuts...")
+    
+    here = Path(__file__).parent
+    sys.path.insert(0, str(here / "benchmarks"))
+    from synthetic_audio import generate_speech_like, write_wav
+    from segment_stream import PCMWindowReader, iter_windows, SAMPLE_RATE
+    
+    audio = generate_speech_like(seconds, seed=7)
+    passed = True
+    
+    with tempfile.TemporaryDirectory() as workdir:
+        path = Path(workdir) / "windows.wav"
+        write_wav(path, audio)
+        reader = PCMWindowReader(path)
+        capacity = int((reader.window_seconds + reader.search_seconds) * SAMPLE_RATE)
+        windows = [len(window) for _, window in reader]
+    
+    for name, lengths in (("PCMWindowReader", windows),
+                          ("iter_windows", [len(window) for _, window in iter_windows(audio)])):
+        bad = [index for index, length in enumerate(lengths)
+               if length > 30 * SAMPLE_RATE or (index < len(lengths) - 1 and length >= capacity)]
+        for index in bad:
+            print(f"✗ {name} window {index} is {lengths[index] / SAMPLE_RATE:.2f}s")
+        passed = passed and not bad
+        if not bad:
+            print(f"✓ {name}: {len(lengths)} windows, longest "
+                  f"{max(lengths) / SAMPLE_RATE:.2f}s")
+    
+    return passed
+
 def main():
     """Main test function"""
     print("="*50)
@@ -112,6 +228,10 @@ def main():
             if check_installation():
                 test_cli_transcription()
             return
+        elif sys.argv[1] == "--check-startup":
+            sys.exit(0 if check_startup() else 1)
+        elif sys.argv[1] == "--check-windows":
+            sys.exit(0 if check_window_cuts() else 1)
     
     print("\nWhat would you like to do?")
     print("1. Check installation")
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Thread Profile
+Find the fastest split of CPU cores between worker processes and torch threads for each model
+"""
+
+import os
+import sys
+import json
+import time
+import queue
+import platform
+import argparse
+import tempfile
+import multiprocessing
+from pathlib import Path
+from model_registry import QUANTIZE_MODES, get_model, quantized_name
+
+DEFAULT_PROFILE_PATH = Path(os.environ.get(
+    "WHISPER_THREAD_PROFILE",
+    Path.home() / ".cache" / "whisper_thread_profile.json"
+))
+DEFAULT_CLIP_SECONDS = 10.0
+BENCHMARK_DIR = Path(__file__).resolve().parent / "benchmarks"
+
+def host_id():
+    """Key for this machine in the profile: a layout tuned on one host says little about another"""
+    return f"{platform.node()}/{platform.machine()}/{os.cpu_count() or 1} cpus"
+
+def candidate_layouts(cpus=None):
+    """
+    Layouts worth timing on a host
+
+    Every power-of-two worker count up to the number of cores, each sharing the
+    cores evenly, plus a single process on half the cores (hyperthreads often
+    add little to one model).
+
+    Returns:
+        list: (workers, threads) pairs
+    """
+    cpus = cpus or os.cpu_count() or 1
+    layouts = []
+    workers = 1
+    while workers <= cpus:
+        layouts.append((workers, cpus // workers))
+        workers *= 2
+    if cpus >= 4:
+        layouts.append((1, cpus // 2))
+    return layouts
+
+def set_torch_threads(threads):
+    """Limit torch in this process to a number of intra-op threads"""
+    import torch
+    torch.set_num_threads(threads)
+
+def load_profile(path=None):
+    """Read the whole profile file (empty if there is none yet)"""
+    path = Path(path) if path else DEFAULT_PROFILE_PATH
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_profile(profile, path=None):
+    """Replace the profile file in one step"""
+    path = Path(path) if path else DEFAULT_PROFILE_PATH
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-", suffix=".json")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(profile, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def best_layout(model_size, workers=None, threads=None, path=None):
+    """
+    Fastest calibrated layout for a model on this host
+
+    Args:
+        model_size (str): Whisper model size
+        workers (int): Only consider layouts with this many workers (optional)
+        threads (int): Only consider layouts with this many threads per worker (optional)
+        path (str): Profile file (default: DEFAULT_PROFILE_PATH)
+
+    Returns:
+        tuple: (workers, threads), or None if the model was not calibrated here
+    """
+    entry = load_profile(path).get(host_id(), {}).get(model_size)
+    if not entry:
+        return None
+    layouts = [layout for layout in entry["layouts"]
+               if (workers is None or layout["workers"] == workers)
+               and (threads is None or layout["threads"] == threads)]
+    if not layouts:
+        return None
+    best = max(layouts, key=lambda layout: layout["files_per_minute"])
+    return best["workers"], best["threads"]
+
+def _calibration_worker(model_size, threads, ready, start_event, task_queue):
+    """Load the model, wait until every worker has, then transcribe clips until the queue is empty"""
+    set_torch_threads(threads)
+    model = get_model(model_size)
+    ready.put(True)
+    start_event.wait()
+    while True:
+        try:
+            path = task_queue.get_nowait()
+        except queue.Empty:
+            break
+        model.transcribe(path, language="en")
+
+def time_layout(model_size, workers, threads, clips):
+    """
+    Wall time for a pool of workers to transcribe a set of clips
+
+    Model loading is left out: the clock starts once every worker is ready.
+
+    Returns:
+        float: Seconds
+    """
+    # Spawn rather than fork: torch does not survive forking reliably
+    ctx = multiprocessing.get_context("spawn")
+    ready = ctx.Queue()
+    start_event = ctx.Event()
+    task_queue = ctx.Queue()
+    for clip in clips:
+        task_queue.put(str(clip))
+
+    processes = [
+        ctx.Process(target=_calibration_worker,
+                    args=(model_size, threads, ready, start_event, task_queue))
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    try:
+        for _ in processes:
+            ready.get(timeout=600)
+        start = time.perf_counter()
+        start_event.set()
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - start
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+    if any(process.exitcode for process in processes):
+        raise RuntimeError(f"a calibration worker failed ({workers} x {threads})")
+    return elapsed
+
+def calibrate(model_size, layouts=None, clips_per_worker=2, clip_seconds=DEFAULT_CLIP_SECONDS,
+              path=None):
+    """
+    Time every layout for one model and record the results in the profile
+
+    Every layout transcribes the same synthetic clips, enough to keep its
+    largest pool busy, so the timings compare directly.
+
+    Args:
+        model_size (str): Whisper model size
+        layouts (list): (workers, threads) pairs (default: candidate_layouts())
+        clips_per_worker (int): Clips for each worker of the largest layout
+        clip_seconds (float): Length of each synthetic clip
+        path (str): Profile file (default: DEFAULT_PROFILE_PATH)
+
+    Returns:
+        dict: The model's profile entry
+    """
+    sys.path.insert(0, str(BENCHMARK_DIR))
+    from synthetic_audio import generate_speech_like, write_wav
+
+    layouts = layouts or candidate_layouts()
+    clip_count = clips_per_worker * max(workers for workers, _ in layouts)
+    results = []
+
+    with tempfile.TemporaryDirectory() as workdir:
+        clips = []
+        for i in range(clip_count):
+            clip = Path(workdir) / f"clip_{i:03d}.wav"
+            write_wav(clip, generate_speech_like(clip_seconds, seed=i))
+            clips.append(clip)
+
+        for workers, threads in layouts:
+            print(f"  {model_size}: {workers} workers x {threads} threads ... ", end="", flush=True)
+            seconds = time_layout(model_size, workers, threads, clips)
+            files_per_minute = 60.0 * len(clips) / seconds
+            print(f"{files_per_minute:.1f} files/min")
+            results.append({"workers": workers, "threads": threads,
+                            "seconds": round(seconds, 3),
+                            "files_per_minute": round(files_per_minute, 2)})
+
+    best = max(results, key=lambda layout: layout["files_per_minute"])
+    entry = {
+        "workers": best["workers"],
+        "threads": best["threads"],
+        "clips": clip_count,
+        "clip_seconds": clip_seconds,
+        "calibrated": time.strftime('%Y-%m-%d %H:%M:%S'),
+        "layouts": results,
+    }
+
+    # Re-read so calibrating models from two shells does not lose either
+    profile = load_profile(path)
+    profile.setdefault(host_id(), {})[model_size] = entry
+    save_profile(profile, path)
+    return entry
+
+def main():
+    """Main CLI function for calibrating and showing thread layouts"""
+    parser = argparse.ArgumentParser(
+        description="Time worker x thread layouts on this machine and remember the fastest per model",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python thread_profile.py --models tiny medium
+  python thread_profile.py --models base --layouts 1x8 2x4 4x2 8x1
+  python thread_profile.py --show
+        """
+    )
+
+    parser.add_argument(
+        "--models",
+        nargs='+',
+        choices=["tiny", "base", "small", "medium", "large"],
+        default=["base"],
+        help="Model sizes to calibrate (default: base)"
+    )
+
+    parser.add_argument(
+        "--quantize",
+        choices=QUANTIZE_MODES,
+        help="Calibrate the quantized models that --quantize runs use"
+    )
+
+    parser.add_argument(
+        "--layouts",
+        nargs='+',
+        metavar="WxT",
+        help="Layouts to time as workers x threads (default: powers of two up to the core count)"
+    )
+
+    parser.add_argument(
+        "--clips-per-worker",
+        type=int,
+        default=2,
+        metavar="N",
+        help="Synthetic clips per worker of the largest layout (default: 2)"
+    )
+
+    parser.add_argument(
+        "--clip-length",
+        type=float,
+        default=DEFAULT_CLIP_SECONDS,
+        metavar="SECONDS",
+        help=f"Length of each synthetic clip (default: {DEFAULT_CLIP_SECONDS:g})"
+    )
+
+    parser.add_argument(
+        "--profile",
+        help=f"Profile file (default: {DEFAULT_PROFILE_PATH})"
+    )
+
+    parser.add_argument(
+        "--show",
+        action="store_true",
+        help="Print the layouts recorded for this machine and exit"
+    )
+
+    args = parser.parse_args()
+
+    if args.show:
+        entries = load_profile(args.profile).get(host_id(), {})
+        if not entries:
+            print(f"No layouts recorded for {host_id()}")
+        for model_size, entry in sorted(entries.items()):
+            print(f"{model_size}: {entry['workers']} workers x {entry['threads']} threads "
+                  f"(calibrated {entry['calibrated']})")
+        return
+
+    layouts = None
+    if args.layouts:
+        try:
+            layouts = [tuple(int(part) for part in layout.lower().split("x")) for layout in args.layouts]
+        except ValueError:
+            layouts = []
+        if not layouts or any(len(layout) != 2 or min(layout) < 1 for layout in layouts):
+            parser.error("--layouts takes WORKERSxTHREADS pairs such as 2x4")
+
+    if args.clips_per_worker < 1 or args.clip_length <= 0:
+        parser.error("--clips-per-worker and --clip-length must be positive")
+
+    print(f"Calibrating thread layouts for {host_id()}")
+    for model_size in args.models:
+        model_size = quantized_name(model_size, args.quantize)
+        entry = calibrate(model_size, layouts, args.clips_per_worker, args.clip_length, args.profile)
+        print(f"{model_size}: fastest is {entry['workers']} workers x {entry['threads']} threads")
+    print(f"Profile saved to: {args.profile or DEFAULT_PROFILE_PATH}")
+
+if __name__ == "__main__":
+    main()
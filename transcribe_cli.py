@@ -5,12 +5,28 @@ Simple CLI tool for transcribing audio files using OpenAI Whisper
 """
 
 import argparse
-import whisper
 import os
 import sys
+import time
+import contextlib
 from pathlib import Path
+from transcript_cache import TranscriptCache, DEFAULT_CACHE_SIZE_MB
+from transcribe_daemon import request_transcription, DaemonUnavailable
+from voice_activity import SAMPLE_RATE, transcribe_file, describe_skipped
+from chunked_transcribe import transcribe_chunked, DEFAULT_CHUNK_SECONDS
+from segment_stream import PCMWindowReader, iter_segments, format_segment, STREAM_FORMATS
+from model_registry import QUANTIZE_MODES, get_model, quantized_name
+from stage_metrics import StageMetrics, transcribe_timed
+from output_writers import FORMATS, output_paths, parse_formats, write_outputs
+from model_cascade import DEFAULT_THRESHOLDS, CascadeReport, transcribe_cascade
+from thread_profile import best_layout, set_torch_threads
+from incremental_transcribe import INCREMENTAL_FORMATS, transcribe_incremental
 
-def transcribe_audio(file_path, model_size="base", output_format="txt", output_file=None):
+def transcribe_audio(file_path, model_size="base", output_format="txt", output_file=None,
+                     use_cache=True, cache_dir=None, cache_size_mb=DEFAULT_CACHE_SIZE_MB,
+                     use_daemon=True, socket_path=None, vad=False,
+                     chunk_workers=0, chunk_seconds=DEFAULT_CHUNK_SECONDS, metrics=None,
+                     formats=None, cascade=None, cascade_thresholds=None, threads=None):
     """
     Transcribe an audio file using Whisper
     
@@ -19,6 +35,20 @@ def transcribe_audio(file_path, model_size="base", output_format="txt", output_f
         model_size (str): Whisper model size to use
         output_format (str): Output format (txt, json, or console)
         output_file (str): Optional output file path
+        use_cache (bool): Reuse a cached result for identical audio
+        cache_dir (str): Transcript cache directory (optional)
+        cache_size_mb (float): Transcript cache size limit in MB
+        use_daemon (bool): Send the job to a running transcription daemon if there is one
+        socket_path (str): Daemon socket path (optional)
+        vad (bool): Skip silence with voice activity detection before transcribing
+        chunk_workers (int): Split the file into chunks transcribed by this many processes (0 = off)
+        chunk_seconds (float): Target chunk length for chunked transcription
+        metrics (StageMetrics): Record per-stage timings for this file (optional)
+        formats (list): Write all of these formats in one pass instead of output_format;
+                        output_file (or the audio file) gives the name, each with its extension
+        cascade (str): Re-transcribe the segments model_size is unsure of with this model (optional)
+        cascade_thresholds (dict): Escalation limits (default: model_cascade.DEFAULT_THRESHOLDS)
+        threads (int): Torch threads when the model runs in this process (default: torch's own)
     """
     
     # Check if file exists
@@ -26,42 +56,215 @@ def transcribe_audio(file_path, model_size="base", output_format="txt", output_f
         print(f"Error: File '{file_path}' not found.")
         return False
     
+    timings = {}
+    audio_seconds = None
+    cached = False
+    
     try:
-        print(f"Loading Whisper model: {model_size}")
-        model = whisper.load_model(model_size)
+        result = None
+        
+        chunked = chunk_workers > 1
+        if cascade:
+            cascade_thresholds = dict(DEFAULT_THRESHOLDS, **(cascade_thresholds or {}))
+        
+        # A running daemon already has the model loaded; fall back to loading it here
+        if use_daemon and not chunked and not cascade:
+            try:
+                start = time.perf_counter()
+                result, cached = request_transcription(
+                    file_path, model_size, socket_path,
+                    use_cache=use_cache, cache_dir=cache_dir, cache_size_mb=cache_size_mb,
+                    vad=vad
+                )
+                if not cached:
+                    timings["inference"] = time.perf_counter() - start
+                source = "cached transcript" if cached else "daemon"
+                print(f"Transcribed {os.path.basename(file_path)} using {source}")
+            except DaemonUnavailable:
+                pass
+        
+        if result is None:
+            cache = TranscriptCache(cache_dir, cache_size_mb) if use_cache else None
+            
+            cache_options = {}
+            if vad:
+                cache_options["vad"] = True
+            if chunked:
+                cache_options["chunk_seconds"] = chunk_seconds
+            if cascade:
+                cache_options["cascade"] = {"model": cascade, "thresholds": cascade_thresholds}
+            
+            # Check the cache first so a hit never pays for loading the model
+            if cache is not None:
+                cache_key = cache.make_key(file_path, model_size, cache_options)
+                result = cache.get(cache_key)
+                if result is not None:
+                    cached = True
+                    print(f"Using cached transcript for: {os.path.basename(file_path)}")
+            
+            if result is None:
+                if chunked:
+                    print(f"Transcribing in parallel chunks: {os.path.basename(file_path)}")
+                    start = time.perf_counter()
+                    result = transcribe_chunked(
+                        file_path, model_size, chunk_workers, chunk_seconds, vad=vad
+                    )
+                    timings["inference"] = time.perf_counter() - start
+                else:
+                    if threads:
+                        set_torch_threads(threads)
+                    start = time.perf_counter()
+                    model = get_model(model_size)
+                    timings["model_load"] = time.perf_counter() - start
+                    
+                    print(f"Transcribing: {os.path.basename(file_path)}")
+                    if cascade:
+                        import whisper
+                        start = time.perf_counter()
+                        audio = whisper.load_audio(file_path)
+                        timings["decode"] = time.perf_counter() - start
+                        audio_seconds = len(audio) / SAMPLE_RATE
+                        
+                        start = time.perf_counter()
+                        result = transcribe_cascade(model, audio, cascade, cascade_thresholds, vad=vad)
+                        timings["inference"] = time.perf_counter() - start
+                    elif metrics is None:
+                        result = transcribe_file(model, file_path, vad)
+                    else:
+                        # Decode separately so it can be timed on its own
+                        import whisper
+                        start = time.perf_counter()
+                        audio = whisper.load_audio(file_path)
+                        timings["decode"] = time.perf_counter() - start
+                        audio_seconds = len(audio) / SAMPLE_RATE
+                        
+                        start = time.perf_counter()
+                        result = transcribe_timed(model, audio, timings, vad=vad)
+                        timings["inference"] = time.perf_counter() - start
+                
+                if cache is not None:
+                    cache.put(cache_key, result)
+        
+        if result.get("vad"):
+            print(f"Voice activity detection {describe_skipped(result['vad'])}")
         
-        print(f"Transcribing: {os.path.basename(file_path)}")
-        result = model.transcribe(file_path)
+        if result.get("cascade") and not cached:
+            report = CascadeReport(model_size, cascade)
+            report.add(result["cascade"])
+            for line in report.summary_lines():
+                print(line)
         
         transcript = result["text"].strip()
+        start = time.perf_counter()
         
-        if output_format == "console":
+        if formats:
+            for path in write_outputs(result, output_paths(output_file or file_path, formats)):
+                print(f"Transcript saved to: {path}")
+        
+        elif output_format == "console":
             print("\n" + "="*50)
             print("TRANSCRIPTION")
             print("="*50)
             print(transcript)
             print("="*50)
         
-        elif output_format == "txt":
+        else:
             if output_file is None:
                 # Generate output filename based on input file
-                input_path = Path(file_path)
-                output_file = input_path.with_suffix('.txt')
+                output_file = Path(file_path).with_suffix(f'.{output_format}')
             
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(transcript)
-            print(f"Transcript saved to: {output_file}")
+            write_outputs(result, {output_format: output_file})
+            label = "Full results" if output_format == "json" else "Transcript"
+            print(f"{label} saved to: {output_file}")
         
-        elif output_format == "json":
-            import json
-            if output_file is None:
-                input_path = Path(file_path)
-                output_file = input_path.with_suffix('.json')
-            
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(result, f, indent=2, ensure_ascii=False)
-            print(f"Full results saved to: {output_file}")
+        timings["write"] = time.perf_counter() - start
+        if metrics is not None:
+            metrics.record_file(file_path, timings, audio_seconds, cached=cached)
+        return True
         
+    except Exception as e:
+        print(f"Error during transcription: {str(e)}")
+        if metrics is not None:
+            metrics.record_file(file_path, ok=False)
+        return False
+
+def stream_transcription(file_path, model_size="base", stream_format="jsonl", output_file=None,
+                         vad=False):
+    """
+    Transcribe an audio file and write each segment as soon as it is decoded
+    
+    Segments go to stdout (or the output file) and are flushed one by one, so
+    downstream tools can start before the whole file is done. The audio is
+    decoded window by window as well, so memory use does not depend on the
+    length of the recording. Progress messages go to stderr to keep stdout clean.
+    
+    Args:
+        file_path (str): Path to the audio file
+        model_size (str): Whisper model size to use
+        stream_format (str): Segment format (jsonl, srt, or txt)
+        output_file (str): Optional output file path (default: stdout)
+        vad (bool): Skip silence with voice activity detection
+    """
+    if not os.path.exists(file_path):
+        print(f"Error: File '{file_path}' not found.", file=sys.stderr)
+        return False
+    
+    try:
+        # Keep stdout for segments while the model loads
+        with contextlib.redirect_stdout(sys.stderr):
+            model = get_model(model_size)
+        
+        print(f"Streaming transcription: {os.path.basename(file_path)}", file=sys.stderr)
+        out = open(output_file, 'w', encoding='utf-8') if output_file else sys.stdout
+        try:
+            for segment in iter_segments(model, PCMWindowReader(file_path), vad=vad):
+                out.write(format_segment(segment, stream_format))
+                out.flush()
+        finally:
+            if output_file:
+                out.close()
+        
+        if output_file:
+            print(f"Transcript saved to: {output_file}", file=sys.stderr)
+        return True
+        
+    except Exception as e:
+        print(f"Error during transcription: {str(e)}", file=sys.stderr)
+        return False
+
+def incremental_transcription(file_path, model_size="base", formats=("txt",), output_file=None,
+                              vad=False, final=False, threads=None):
+    """
+    Transcribe only what was added to a growing recording since the last run
+    
+    Args:
+        file_path (str): Recording that may still be growing
+        model_size (str): Whisper model size to use
+        formats (list): Output formats, appended to on every run
+        output_file (str): Optional output file path (names every format and the state file)
+        vad (bool): Skip silence with voice activity detection
+        final (bool): The recording is complete; also transcribe its last window
+        threads (int): Torch threads (default: torch's own)
+    """
+    if not os.path.exists(file_path):
+        print(f"Error: File '{file_path}' not found.")
+        return False
+    
+    try:
+        if threads:
+            set_torch_threads(threads)
+        model = get_model(model_size)
+        
+        print(f"Transcribing new audio: {os.path.basename(file_path)}")
+        update = transcribe_incremental(model, file_path, model_size, formats, output_file,
+                                        vad=vad, final=final)
+        print(f"Added {update['segments']} segments "
+              f"({update['from_seconds']:.1f}s to {update['to_seconds']:.1f}s)")
+        if update["held_back"]:
+            print(f"Held back {update['held_back']:.1f}s at the end until the recording grows "
+                  f"(or it stops, or --final)")
+        for path in update["paths"]:
+            print(f"Transcript saved to: {path}")
         return True
         
     except Exception as e:
@@ -78,6 +281,13 @@ Examples:
   python transcribe_cli.py audio.mp3
   python transcribe_cli.py audio.wav --model medium --output transcript.txt
   python transcribe_cli.py voicemail.mp3 --format console
+  python transcribe_cli.py lecture.mp3 --formats srt,vtt,txt
+  python transcribe_cli.py board_meeting.mp3 --chunk-workers 8
+  python transcribe_cli.py call.mp3 --model tiny --cascade medium
+  python transcribe_cli.py call.mp3 --model small --quantize int8
+  python transcribe_cli.py meeting.mp3 --stream jsonl | consumer
+  python transcribe_cli.py bridge_recording.wav --incremental --formats txt,srt
+  python transcribe_cli.py audio.mp3 --no-daemon --metrics-json metrics.json
         """
     )
     
@@ -93,33 +303,256 @@ Examples:
         help="Whisper model size to use (default: base)"
     )
     
-    parser.add_argument(
+    format_group = parser.add_mutually_exclusive_group()
+    format_group.add_argument(
         "--format",
         choices=["txt", "json", "console"],
         default="txt",
         help="Output format (default: txt)"
     )
+    format_group.add_argument(
+        "--formats",
+        metavar="LIST",
+        help=f"Write several formats in one pass, comma-separated: {', '.join(FORMATS)}"
+    )
     
     parser.add_argument(
         "--output", "-o",
         help="Output file path (optional, auto-generated if not specified)"
     )
     
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always re-transcribe instead of reusing a cached result"
+    )
+    
+    parser.add_argument(
+        "--cache-dir",
+        help="Transcript cache directory (default: ~/.cache/whisper_transcripts)"
+    )
+    
+    parser.add_argument(
+        "--cache-size",
+        type=float,
+        default=DEFAULT_CACHE_SIZE_MB,
+        help=f"Transcript cache size limit in MB (default: {DEFAULT_CACHE_SIZE_MB})"
+    )
+    
+    parser.add_argument(
+        "--quantize",
+        choices=QUANTIZE_MODES,
+        help="Run the model with dynamically quantized int8 linear layers on the CPU "
+             "(built once and cached in ~/.cache/whisper_quantized)"
+    )
+    
+    parser.add_argument(
+        "--cascade",
+        choices=["tiny", "base", "small", "medium", "large"],
+        metavar="MODEL",
+        help="Re-transcribe only the segments --model is unsure of with this larger model"
+    )
+    
+    parser.add_argument(
+        "--escalate-logprob",
+        type=float,
+        default=DEFAULT_THRESHOLDS["logprob"],
+        metavar="X",
+        help=f"With --cascade, escalate segments with average log probability below X "
+             f"(default: {DEFAULT_THRESHOLDS['logprob']})"
+    )
+    
+    parser.add_argument(
+        "--escalate-no-speech",
+        type=float,
+        default=DEFAULT_THRESHOLDS["no_speech"],
+        metavar="P",
+        help=f"With --cascade, escalate text with no-speech probability above P "
+             f"(default: {DEFAULT_THRESHOLDS['no_speech']})"
+    )
+    
+    parser.add_argument(
+        "--escalate-compression",
+        type=float,
+        default=DEFAULT_THRESHOLDS["compression"],
+        metavar="R",
+        help=f"With --cascade, escalate segments with compression ratio above R "
+             f"(default: {DEFAULT_THRESHOLDS['compression']})"
+    )
+    
+    parser.add_argument(
+        "--stream",
+        choices=STREAM_FORMATS,
+        help="Write segments as they are decoded, to stdout or --output (jsonl, srt, or txt)"
+    )
+    
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only transcribe audio added since the last run of a growing recording and "
+             "append it to the outputs"
+    )
+    
+    parser.add_argument(
+        "--final",
+        action="store_true",
+        help="With --incremental, the recording has ended: also transcribe its last window"
+    )
+    
+    parser.add_argument(
+        "--vad",
+        action="store_true",
+        help="Skip silence and hold music with voice activity detection before transcribing"
+    )
+    
+    parser.add_argument(
+        "--chunk-workers",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Split a long recording at silences and transcribe the chunks on N processes"
+    )
+    
+    parser.add_argument(
+        "--chunk-length",
+        type=float,
+        default=DEFAULT_CHUNK_SECONDS,
+        metavar="SECONDS",
+        help=f"Target chunk length for --chunk-workers (default: {DEFAULT_CHUNK_SECONDS})"
+    )
+    
+    parser.add_argument(
+        "--threads",
+        type=int,
+        metavar="N",
+        help="Torch threads when the model runs in this process "
+             "(default: the calibrated single-process layout from thread_profile.py)"
+    )
+    
+    parser.add_argument(
+        "--no-profile",
+        action="store_true",
+        help="Ignore the layouts recorded by thread_profile.py"
+    )
+    
+    parser.add_argument(
+        "--no-daemon",
+        action="store_true",
+        help="Load the model in this process even if a transcription daemon is running"
+    )
+    
+    parser.add_argument(
+        "--socket",
+        help="Transcription daemon socket path (optional)"
+    )
+    
+    parser.add_argument(
+        "--metrics-json",
+        metavar="FILE",
+        help="Time every stage and write a JSON report"
+    )
+    
+    parser.add_argument(
+        "--metrics-prom",
+        metavar="FILE",
+        help="Time every stage and write a Prometheus textfile (for node exporter)"
+    )
+    
     args = parser.parse_args()
     
+    if args.chunk_length <= 0:
+        parser.error("--chunk-length must be positive")
+    
+    if args.threads is not None and args.threads < 1:
+        parser.error("--threads must be at least 1")
+    
+    if args.stream and (args.metrics_json or args.metrics_prom):
+        parser.error("--metrics-json/--metrics-prom cannot be combined with --stream")
+    
+    if args.cascade and (args.stream or args.chunk_workers > 1):
+        parser.error("--cascade cannot be combined with --stream or --chunk-workers")
+    
+    if args.cascade == args.model:
+        parser.error("--cascade must name a different model than --model")
+    
+    # Quantized models have their own registry and cache entries (e.g. base-int8)
+    model_name = quantized_name(args.model, args.quantize)
+    cascade = quantized_name(args.cascade, args.quantize) if args.cascade else None
+    
+    formats = None
+    if args.formats:
+        if args.stream:
+            parser.error("--formats cannot be combined with --stream")
+        try:
+            formats = parse_formats(args.formats)
+        except ValueError as e:
+            parser.error(f"--formats: {e}")
+    
+    if args.final and not args.incremental:
+        parser.error("--final needs --incremental")
+    
+    if args.incremental:
+        if args.stream or args.chunk_workers > 1 or args.cascade:
+            parser.error("--incremental cannot be combined with --stream, --chunk-workers or --cascade")
+        incremental_formats = formats or [args.format]
+        unsupported = [name for name in incremental_formats if name not in INCREMENTAL_FORMATS]
+        if unsupported:
+            parser.error(f"--incremental appends to {', '.join(INCREMENTAL_FORMATS)} outputs, "
+                         f"not {', '.join(unsupported)}")
+    
     # Validate input file
     if not os.path.isfile(args.file):
         print(f"Error: '{args.file}' is not a valid file.")
         sys.exit(1)
     
+    if args.stream:
+        success = stream_transcription(args.file, model_name, args.stream, args.output, vad=args.vad)
+        sys.exit(0 if success else 1)
+    
+    threads = args.threads
+    if threads is None and not args.no_profile:
+        layout = best_layout(model_name, workers=1)
+        threads = layout[1] if layout else None
+    
+    if args.incremental:
+        success = incremental_transcription(args.file, model_name, incremental_formats, args.output,
+                                            vad=args.vad, final=args.final, threads=threads)
+        sys.exit(0 if success else 1)
+    
+    metrics = None
+    if args.metrics_json or args.metrics_prom:
+        metrics = StageMetrics("cli", model_name)
+    
     # Transcribe
+    start_time = time.time()
     success = transcribe_audio(
         args.file, 
-        args.model, 
+        model_name, 
         args.format, 
-        args.output
+        args.output,
+        use_cache=not args.no_cache,
+        cache_dir=args.cache_dir,
+        cache_size_mb=args.cache_size,
+        use_daemon=not args.no_daemon,
+        socket_path=args.socket,
+        vad=args.vad,
+        chunk_workers=args.chunk_workers,
+        chunk_seconds=args.chunk_length,
+        metrics=metrics,
+        formats=formats,
+        cascade=cascade,
+        cascade_thresholds={
+            "logprob": args.escalate_logprob,
+            "no_speech": args.escalate_no_speech,
+            "compression": args.escalate_compression,
+        },
+        threads=threads
     )
     
+    if metrics is not None:
+        metrics.wall_seconds = time.time() - start_time
+        metrics.export(args.metrics_json, args.metrics_prom)
+    
     if not success:
         sys.exit(1)
 
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Transcription Daemon
+Keeps Whisper models loaded and serves transcription jobs over a Unix domain socket
+"""
+
+import os
+import sys
+import json
+import socket
+import signal
+import argparse
+import threading
+import socketserver
+from pathlib import Path
+from transcript_cache import TranscriptCache, cached_transcribe, DEFAULT_CACHE_SIZE_MB
+from model_registry import get_model, get_registry, DEFAULT_MEMORY_BUDGET_MB
+
+DEFAULT_SOCKET_PATH = os.environ.get(
+    "WHISPER_DAEMON_SOCKET",
+    str(Path.home() / ".cache" / "whisper_transcripts" / "daemon.sock")
+)
+
+class DaemonUnavailable(Exception):
+    """Raised by the client when no daemon is listening on the socket"""
+
+def _send_message(sock, message):
+    sock.sendall(json.dumps(message, ensure_ascii=False).encode('utf-8') + b"\n")
+
+def _read_message(sock_file):
+    line = sock_file.readline()
+    if not line:
+        raise ConnectionError("Connection closed before a reply was received")
+    return json.loads(line)
+
+class TranscriptionDaemon:
+    def __init__(self, socket_path=None, preload=()):
+        """
+        Initialize the daemon
+        
+        Args:
+            socket_path (str): Unix socket to listen on (optional)
+            preload (list): Model sizes to load before accepting jobs
+        """
+        self.socket_path = socket_path or DEFAULT_SOCKET_PATH
+        self.model_locks = {}
+        self.lock = threading.Lock()
+        self.server = None
+        
+        for model_size in preload:
+            self.get_model(model_size)
+    
+    def get_model(self, model_size):
+        """Return a model from the registry (loading it on first use) and its job lock"""
+        model = get_model(model_size)
+        with self.lock:
+            model_lock = self.model_locks.setdefault(model_size, threading.Lock())
+        return model, model_lock
+    
+    def handle_request(self, request):
+        """Process one decoded request and return the reply message"""
+        command = request.get("command", "transcribe")
+        
+        if command == "ping":
+            return {"ok": True, "models": sorted(get_registry().loaded_models())}
+        
+        if command == "shutdown":
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+            return {"ok": True}
+        
+        if command != "transcribe":
+            return {"ok": False, "error": f"Unknown command: {command}"}
+        
+        file_path = request["file"]
+        if not os.path.exists(file_path):
+            return {"ok": False, "error": f"File '{file_path}' not found."}
+        
+        model_size = request.get("model", "base")
+        cache = None
+        if request.get("use_cache", True):
+            cache = TranscriptCache(
+                request.get("cache_dir"),
+                request.get("cache_size_mb", DEFAULT_CACHE_SIZE_MB)
+            )
+        
+        model, model_lock = self.get_model(model_size)
+        
+        # One job per model at a time; different models can run side by side
+        with model_lock:
+            print(f"Transcribing: {os.path.basename(file_path)} ({model_size})")
+            result, cached = cached_transcribe(
+                model, file_path, model_size, cache, vad=request.get("vad", False)
+            )
+        
+        return {"ok": True, "result": result, "cached": cached}
+    
+    def serve_forever(self):
+        """Listen on the socket until interrupted or asked to shut down"""
+        socket_path = Path(self.socket_path)
+        socket_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        if socket_path.exists():
+            if is_daemon_running(str(socket_path)):
+                raise RuntimeError(f"A daemon is already listening on {socket_path}")
+            # Left behind by a daemon that did not shut down cleanly
+            socket_path.unlink()
+        
+        daemon = self
+        
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                try:
+                    request = _read_message(self.rfile)
+                    reply = daemon.handle_request(request)
+                except Exception as e:
+                    reply = {"ok": False, "error": str(e)}
+                _send_message(self.connection, reply)
+        
+        self.server = socketserver.ThreadingUnixStreamServer(str(socket_path), Handler)
+        self.server.daemon_threads = True
+        os.chmod(socket_path, 0o600)
+        
+        print(f"Transcription daemon listening on {socket_path}")
+        try:
+            self.server.serve_forever()
+        finally:
+            self.server.server_close()
+            try:
+                socket_path.unlink()
+            except OSError:
+                pass
+            print("Transcription daemon stopped")
+
+def _connect(socket_path=None, timeout=2.0):
+    """Open a client connection, raising DaemonUnavailable if nobody is listening"""
+    socket_path = socket_path or DEFAULT_SOCKET_PATH
+    
+    if not hasattr(socket, "AF_UNIX") or not os.path.exists(socket_path):
+        raise DaemonUnavailable(f"No daemon socket at {socket_path}")
+    
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(socket_path)
+    except OSError as e:
+        sock.close()
+        raise DaemonUnavailable(f"Could not connect to {socket_path}: {e}")
+    
+    # Transcription can take a long time; only the connect is time-limited
+    sock.settimeout(None)
+    return sock
+
+def send_request(request, socket_path=None):
+    """Send one request to the daemon and return its reply"""
+    sock = _connect(socket_path)
+    with sock, sock.makefile('rb') as sock_file:
+        _send_message(sock, request)
+        return _read_message(sock_file)
+
+def is_daemon_running(socket_path=None):
+    """Check whether a daemon answers on the socket"""
+    try:
+        return send_request({"command": "ping"}, socket_path).get("ok", False)
+    except (DaemonUnavailable, ConnectionError, ValueError):
+        return False
+
+def request_transcription(file_path, model_size="base", socket_path=None,
+                          use_cache=True, cache_dir=None, cache_size_mb=DEFAULT_CACHE_SIZE_MB,
+                          vad=False):
+    """
+    Ask a running daemon to transcribe a file
+    
+    Args:
+        file_path (str): Path to the audio file
+        model_size (str): Whisper model size to use
+        socket_path (str): Daemon socket (optional)
+        use_cache (bool): Let the daemon reuse cached results
+        cache_dir (str): Transcript cache directory (optional)
+        cache_size_mb (float): Transcript cache size limit in MB
+        vad (bool): Skip silence with voice activity detection
+    
+    Returns:
+        tuple: (result dict, True if the result came from the cache)
+    
+    Raises:
+        DaemonUnavailable: If no daemon is running
+        RuntimeError: If the daemon reports an error
+    """
+    reply = send_request({
+        "command": "transcribe",
+        "file": os.path.abspath(file_path),
+        "model": model_size,
+        "use_cache": use_cache,
+        "cache_dir": os.path.abspath(cache_dir) if cache_dir else None,
+        "cache_size_mb": cache_size_mb,
+        "vad": vad,
+    }, socket_path)
+    
+    if not reply.get("ok"):
+        raise RuntimeError(reply.get("error", "Unknown daemon error"))
+    return reply["result"], reply.get("cached", False)
+
+def main():
+    """Main CLI function for the daemon"""
+    parser = argparse.ArgumentParser(
+        description="Keep Whisper models loaded and serve transcription jobs",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python transcribe_daemon.py
+  python transcribe_daemon.py --models base small
+  python transcribe_daemon.py --status
+  python transcribe_daemon.py --stop
+        """
+    )
+    
+    parser.add_argument(
+        "--models",
+        nargs='+',
+        choices=["tiny", "base", "small", "medium", "large"],
+        default=["base"],
+        help="Models to load at startup; others load on first request (default: base)"
+    )
+    
+    parser.add_argument(
+        "--model-budget",
+        type=float,
+        default=DEFAULT_MEMORY_BUDGET_MB,
+        metavar="MB",
+        help=f"Memory the resident models may use; least recently used are unloaded (default: {DEFAULT_MEMORY_BUDGET_MB:.0f})"
+    )
+    
+    parser.add_argument(
+        "--socket",
+        default=DEFAULT_SOCKET_PATH,
+        help=f"Unix socket path (default: {DEFAULT_SOCKET_PATH})"
+    )
+    
+    parser.add_argument(
+        "--status",
+        action="store_true",
+        help="Report whether a daemon is running and which models it holds"
+    )
+    
+    parser.add_argument(
+        "--stop",
+        action="store_true",
+        help="Ask a running daemon to shut down"
+    )
+    
+    args = parser.parse_args()
+    
+    if not hasattr(socket, "AF_UNIX"):
+        print("Error: Unix domain sockets are not supported on this platform.")
+        sys.exit(1)
+    
+    if args.status or args.stop:
+        try:
+            command = "shutdown" if args.stop else "ping"
+            reply = send_request({"command": command}, args.socket)
+        except (DaemonUnavailable, ConnectionError) as e:
+            print(f"No daemon running ({e})")
+            sys.exit(1)
+        if args.stop:
+            print("Daemon is shutting down")
+        else:
+            print(f"Daemon running on {args.socket}, models loaded: {', '.join(reply['models']) or 'none'}")
+        return
+    
+    get_registry().set_budget(args.model_budget)
+    daemon = TranscriptionDaemon(args.socket, preload=args.models)
+    
+    # Let SIGTERM (service managers, kill) go through the normal cleanup path
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    except RuntimeError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
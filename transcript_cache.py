@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Transcript Cache
+On-disk cache of Whisper results keyed on the audio content, model and options
+"""
+
+import os
+import json
+import hashlib
+import tempfile
+from pathlib import Path
+
+DEFAULT_CACHE_DIR = Path(os.environ.get(
+    "WHISPER_TRANSCRIPT_CACHE",
+    Path.home() / ".cache" / "whisper_transcripts"
+))
+DEFAULT_CACHE_SIZE_MB = 500
+
+class TranscriptCache:
+    def __init__(self, cache_dir=None, max_size_mb=DEFAULT_CACHE_SIZE_MB):
+        """
+        Initialize the cache
+        
+        Args:
+            cache_dir (str): Directory holding cached results (optional)
+            max_size_mb (float): Size limit; least recently used entries are evicted
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else DEFAULT_CACHE_DIR
+        self.max_size_mb = max_size_mb
+        self.max_bytes = int(max_size_mb * 1024 * 1024)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._total_bytes = None
+    
+    def make_key(self, file_path, model_size, options=None):
+        """
+        Build the cache key for a file
+        
+        Args:
+            file_path (str): Path to the audio file
+            model_size (str): Whisper model size
+            options (dict): Decode options passed to model.transcribe
+        """
+        hasher = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                hasher.update(block)
+        
+        settings = {"model": model_size, "options": options or {}}
+        hasher.update(json.dumps(settings, sort_keys=True, default=str).encode('utf-8'))
+        return hasher.hexdigest()
+    
+    def _entry_path(self, key):
+        return self.cache_dir / key[:2] / f"{key}.json"
+    
+    def get(self, key):
+        """Return the cached result for a key, or None on a miss"""
+        path = self._entry_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                result = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            # Corrupt or half-written entry: drop it and treat as a miss
+            self._remove(path)
+            return None
+        
+        # Touch the entry so eviction sees it as recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        
+        return result
+    
+    def put(self, key, result):
+        """Store a result and evict old entries if over the size limit"""
+        path = self._entry_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        
+        # Overwriting an entry replaces its bytes rather than adding to them
+        try:
+            old_size = path.stat().st_size
+        except FileNotFoundError:
+            old_size = 0
+        
+        # Write to a temp file and rename so readers never see partial entries
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(result, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except Exception:
+            self._remove(tmp_path)
+            raise
+        
+        if self._total_bytes is None:
+            self._total_bytes = self._scan_size()
+        else:
+            self._total_bytes += path.stat().st_size - old_size
+        
+        if self._total_bytes > self.max_bytes:
+            self.evict()
+    
+    def evict(self):
+        """Remove least recently used entries until the cache fits its limit"""
+        entries = []
+        for path in self.cache_dir.glob("*/*.json"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+        
+        self._total_bytes = total
+    
+    def clear(self):
+        """Remove every cached entry"""
+        for path in self.cache_dir.glob("*/*.json"):
+            self._remove(path)
+        self._total_bytes = 0
+    
+    def _scan_size(self):
+        total = 0
+        for path in self.cache_dir.glob("*/*.json"):
+            try:
+                total += path.stat().st_size
+            except FileNotFoundError:
+                pass
+        return total
+    
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+def cached_transcribe(model, file_path, model_size, cache=None, vad=False, **options):
+    """
+    Transcribe a file, reusing a cached result when one exists
+    
+    Returns:
+        tuple: (result dict, True if the result came from the cache)
+    """
+    from voice_activity import transcribe_file
+    
+    if cache is None:
+        return transcribe_file(model, file_path, vad, **options), False
+    
+    key_options = dict(options, vad=True) if vad else options
+    key = cache.make_key(file_path, model_size, key_options)
+    result = cache.get(key)
+    if result is not None:
+        return result, True
+    
+    result = transcribe_file(model, file_path, vad, **options)
+    cache.put(key, result)
+    return result, False
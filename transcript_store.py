@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Transcript Store
+SQLite database of transcripts and segments with full-text search
+"""
+
+import os
+import sys
+import json
+import time
+import sqlite3
+import hashlib
+import argparse
+from pathlib import Path
+
+# Transcripts buffered before they are written in one transaction
+DEFAULT_BATCH_ROWS = 200
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transcripts (
+    id INTEGER PRIMARY KEY,
+    audio_path TEXT NOT NULL UNIQUE,
+    size INTEGER,
+    mtime REAL,
+    sha256 TEXT,
+    model TEXT NOT NULL,
+    language TEXT,
+    audio_seconds REAL,
+    timings TEXT,
+    transcribed_at REAL NOT NULL,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS transcripts_mtime ON transcripts (mtime);
+CREATE INDEX IF NOT EXISTS transcripts_sha256 ON transcripts (sha256);
+
+CREATE TABLE IF NOT EXISTS segments (
+    transcript_id INTEGER NOT NULL REFERENCES transcripts (id) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    start REAL NOT NULL,
+    end REAL NOT NULL,
+    text TEXT NOT NULL,
+    PRIMARY KEY (transcript_id, seq)
+) WITHOUT ROWID;
+
+-- Full-text index over transcripts.text, kept in step by the triggers below
+CREATE VIRTUAL TABLE IF NOT EXISTS transcripts_fts USING fts5 (
+    text, content='transcripts', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS transcripts_fts_insert AFTER INSERT ON transcripts BEGIN
+    INSERT INTO transcripts_fts (rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS transcripts_fts_delete AFTER DELETE ON transcripts BEGIN
+    INSERT INTO transcripts_fts (transcripts_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+"""
+
+def file_sha256(file_path):
+    """SHA-256 of a file's contents, read in 1 MB blocks"""
+    hasher = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+def parse_time(text):
+    """
+    Parse a date or date and time (local time) into a Unix timestamp
+    
+    Accepts "YYYY-MM-DD", "YYYY-MM-DD HH:MM" and "YYYY-MM-DD HH:MM:SS".
+    
+    Raises:
+        ValueError: If the text matches none of these
+    """
+    for pattern in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d"):
+        try:
+            return time.mktime(time.strptime(text, pattern))
+        except ValueError:
+            continue
+    raise ValueError(f"unrecognised time '{text}' (use YYYY-MM-DD or 'YYYY-MM-DD HH:MM')")
+
+class TranscriptStore:
+    def __init__(self, db_path, batch_rows=DEFAULT_BATCH_ROWS):
+        """
+        Open (or create) a transcript database
+        
+        Args:
+            db_path (str): SQLite database file
+            batch_rows (int): Transcripts buffered before they are committed together
+        """
+        self.db_path = Path(db_path)
+        self.batch_rows = max(1, int(batch_rows))
+        self.pending = []
+        
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # Rows may be added from a pipeline's writer thread; only one thread uses it at a time
+        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        try:
+            self.conn.executescript(SCHEMA)
+        except sqlite3.OperationalError as e:
+            self.conn.close()
+            if "fts5" in str(e):
+                raise RuntimeError("This Python's SQLite library was built without FTS5") from e
+            raise
+    
+    def add(self, audio_file, result, model_size, timings=None, audio_seconds=None):
+        """
+        Queue one transcript; it is written with the next batch
+        
+        A transcript already stored for the same audio path is replaced.
+        
+        Args:
+            audio_file (str): Path to the audio file
+            result (dict): Whisper result
+            model_size (str): Whisper model size used
+            timings (dict): Stage name -> seconds (optional)
+            audio_seconds (float): Audio duration (optional)
+        """
+        audio_path = str(Path(audio_file).resolve())
+        try:
+            stat = os.stat(audio_path)
+            size, mtime, sha256 = stat.st_size, stat.st_mtime, file_sha256(audio_path)
+        except OSError:
+            size, mtime, sha256 = None, None, None
+        
+        segments = [
+            (index, float(segment["start"]), float(segment["end"]), segment["text"].strip())
+            for index, segment in enumerate(result.get("segments") or [])
+        ]
+        self.pending.append((
+            (audio_path, size, mtime, sha256, model_size, result.get("language"), audio_seconds,
+             json.dumps(timings or {}), time.time(), result["text"].strip()),
+            segments,
+        ))
+        if len(self.pending) >= self.batch_rows:
+            self.flush()
+    
+    def flush(self):
+        """Write all queued transcripts in a single transaction"""
+        if not self.pending:
+            return
+        with self.conn:
+            for row, segments in self.pending:
+                self.conn.execute("DELETE FROM transcripts WHERE audio_path = ?", (row[0],))
+                cursor = self.conn.execute(
+                    "INSERT INTO transcripts (audio_path, size, mtime, sha256, model, language, "
+                    "audio_seconds, timings, transcribed_at, text) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    row
+                )
+                self.conn.executemany(
+                    "INSERT INTO segments (transcript_id, seq, start, end, text) VALUES (?, ?, ?, ?, ?)",
+                    [(cursor.lastrowid,) + segment for segment in segments]
+                )
+        self.pending = []
+    
+    def is_complete(self, audio_file, model_size):
+        """Whether the file is stored with this model and is unchanged since"""
+        self.flush()
+        audio_path = str(Path(audio_file).resolve())
+        row = self.conn.execute(
+            "SELECT size, mtime, model FROM transcripts WHERE audio_path = ?", (audio_path,)
+        ).fetchone()
+        if row is None:
+            return False
+        try:
+            stat = os.stat(audio_path)
+        except OSError:
+            return False
+        return row == (stat.st_size, stat.st_mtime, model_size)
+    
+    def search(self, query=None, since=None, until=None, limit=20):
+        """
+        Find transcripts by content and/or recording time
+        
+        Args:
+            query (str): FTS5 query, e.g. 'refund', '"call me back"' or 'invoice NOT paid'
+                         (optional; without it the newest recordings in the range are listed)
+            since (float): Only recordings modified at or after this Unix time (optional)
+            until (float): Only recordings modified before this Unix time (optional)
+            limit (int): Largest number of matches returned
+        
+        Returns:
+            list: Matches as dicts with audio_path, recorded, model, audio_seconds and snippet,
+                  best match first (newest first without a query)
+        """
+        self.flush()
+        conditions = []
+        params = []
+        if since is not None:
+            conditions.append("t.mtime >= ?")
+            params.append(since)
+        if until is not None:
+            conditions.append("t.mtime < ?")
+            params.append(until)
+        
+        if query:
+            sql = ("SELECT t.audio_path, t.mtime, t.model, t.audio_seconds, "
+                   "snippet(transcripts_fts, 0, '[', ']', '...', 12) "
+                   "FROM transcripts_fts JOIN transcripts t ON t.id = transcripts_fts.rowid "
+                   "WHERE transcripts_fts MATCH ?")
+            params.insert(0, query)
+            order = " ORDER BY rank"
+        else:
+            sql = ("SELECT t.audio_path, t.mtime, t.model, t.audio_seconds, substr(t.text, 1, 80) "
+                   "FROM transcripts t WHERE 1")
+            order = " ORDER BY t.mtime DESC"
+        
+        for condition in conditions:
+            sql += " AND " + condition
+        rows = self.conn.execute(sql + order + " LIMIT ?", params + [limit]).fetchall()
+        
+        return [
+            {"audio_path": path, "recorded": mtime, "model": model,
+             "audio_seconds": audio_seconds, "snippet": snippet}
+            for path, mtime, model, audio_seconds, snippet in rows
+        ]
+    
+    def segments(self, audio_file):
+        """Stored (start, end, text) segments of one recording"""
+        return self.conn.execute(
+            "SELECT s.start, s.end, s.text FROM segments s JOIN transcripts t ON t.id = s.transcript_id "
+            "WHERE t.audio_path = ? ORDER BY s.seq", (str(Path(audio_file).resolve()),)
+        ).fetchall()
+    
+    def count(self):
+        """Number of stored transcripts"""
+        self.flush()
+        return self.conn.execute("SELECT COUNT(*) FROM transcripts").fetchone()[0]
+    
+    def close(self):
+        """Write anything still queued and close the database"""
+        self.flush()
+        self.conn.close()
+
+def main():
+    """Main CLI function for searching a transcript database"""
+    parser = argparse.ArgumentParser(
+        description="Search transcripts stored by batch_transcribe.py --db",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python transcript_store.py transcripts.db refund
+  python transcript_store.py transcripts.db '"call me back"' --since 2025-03-01
+  python transcript_store.py transcripts.db --since '2025-03-01 09:00' --until '2025-03-01 17:00'
+  python transcript_store.py transcripts.db invoice --segments
+        """
+    )
+    
+    parser.add_argument(
+        "database",
+        help="Transcript database written by batch_transcribe.py --db"
+    )
+    
+    parser.add_argument(
+        "query",
+        nargs='?',
+        help="Full-text query (words, \"exact phrases\", AND/OR/NOT, prefix*)"
+    )
+    
+    parser.add_argument(
+        "--since",
+        help="Only recordings from this time on (YYYY-MM-DD or 'YYYY-MM-DD HH:MM')"
+    )
+    
+    parser.add_argument(
+        "--until",
+        help="Only recordings before this time (YYYY-MM-DD or 'YYYY-MM-DD HH:MM')"
+    )
+    
+    parser.add_argument(
+        "--limit",
+        type=int,
+        default=20,
+        help="Maximum number of results (default: 20)"
+    )
+    
+    parser.add_argument(
+        "--segments",
+        action="store_true",
+        help="Also print the timestamped segments of each match"
+    )
+    
+    args = parser.parse_args()
+    
+    try:
+        since = parse_time(args.since) if args.since else None
+        until = parse_time(args.until) if args.until else None
+    except ValueError as e:
+        parser.error(str(e))
+    
+    if not os.path.isfile(args.database):
+        print(f"Error: Database '{args.database}' not found.")
+        sys.exit(1)
+    
+    store = TranscriptStore(args.database)
+    try:
+        matches = store.search(args.query, since, until, args.limit)
+    except sqlite3.OperationalError as e:
+        print(f"Error: Invalid query: {e}")
+        sys.exit(1)
+    
+    for match in matches:
+        recorded = time.strftime('%Y-%m-%d %H:%M', time.localtime(match["recorded"])) if match["recorded"] else "?"
+        duration = f", {match['audio_seconds']:.0f}s" if match["audio_seconds"] else ""
+        print(f"{recorded}  {match['audio_path']} ({match['model']}{duration})")
+        print(f"    {match['snippet']}")
+        if args.segments:
+            for start, end, text in store.segments(match["audio_path"]):
+                print(f"      [{start:7.1f}s - {end:7.1f}s] {text}")
+    
+    print(f"{len(matches)} matches")
+    store.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,464 @@
+#!/usr/bin/env python3
+"""
+Transcription Job API
+Local HTTP service for submitting transcription jobs and fetching their results
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import shutil
+import signal
+import asyncio
+import argparse
+import tempfile
+import multiprocessing
+from http import HTTPStatus
+from pathlib import Path
+from urllib.parse import urlsplit, parse_qs
+from concurrent.futures import ProcessPoolExecutor
+from transcript_cache import TranscriptCache, cached_transcribe, DEFAULT_CACHE_SIZE_MB
+from model_registry import get_model
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_QUEUE_SIZE = 32
+DEFAULT_MAX_UPLOAD_MB = 200
+# Finished jobs kept for polling; the oldest are forgotten first
+MAX_FINISHED_JOBS = 1000
+
+MODEL_SIZES = ["tiny", "base", "small", "medium", "large"]
+
+def _init_worker(threads, preload):
+    """Worker process initializer: share the CPU fairly and load the startup models"""
+    import torch
+    torch.set_num_threads(threads)
+    for model_size in preload:
+        get_model(model_size)
+
+def _warm_up():
+    """No-op task that makes the pool start a worker (running its initializer)"""
+    return os.getpid()
+
+def _run_job(file_path, model_size, vad, use_cache, cache_dir, cache_size_mb):
+    """Transcribe one file in a worker process"""
+    cache = TranscriptCache(cache_dir, cache_size_mb) if use_cache else None
+    model = get_model(model_size)
+    return cached_transcribe(model, file_path, model_size, cache, vad=vad)
+
+class HTTPError(Exception):
+    """Raised by request handlers to send an error response"""
+    
+    def __init__(self, status, message, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = headers or {}
+
+class TranscriptionAPI:
+    def __init__(self, workers=1, queue_size=DEFAULT_QUEUE_SIZE, preload=("base",),
+                 cache_dir=None, cache_size_mb=DEFAULT_CACHE_SIZE_MB, upload_dir=None,
+                 max_upload_mb=DEFAULT_MAX_UPLOAD_MB):
+        """
+        Initialize the service
+        
+        Args:
+            workers (int): Model worker processes; at most this many jobs run at once
+            queue_size (int): Jobs allowed to wait; further submissions get 429
+            preload (list): Model sizes each worker loads at startup
+            cache_dir (str): Transcript cache directory (optional)
+            cache_size_mb (float): Transcript cache size limit in MB
+            upload_dir (str): Where uploaded audio is kept until its job finishes
+            max_upload_mb (float): Largest accepted upload in MB
+        """
+        self.workers = max(1, int(workers))
+        self.queue_size = max(1, int(queue_size))
+        self.preload = list(preload)
+        self.cache_dir = cache_dir
+        self.cache_size_mb = cache_size_mb
+        self.own_upload_dir = upload_dir is None
+        self.upload_dir = Path(upload_dir or tempfile.mkdtemp(prefix="whisper_uploads_"))
+        self.max_upload_bytes = int(max_upload_mb * 1024 * 1024)
+        
+        self.jobs = {}
+        self.queue = None
+        self.executor = None
+    
+    def submit(self, file_path, model_size="base", vad=False, use_cache=True, upload=False):
+        """
+        Queue a job
+        
+        Returns:
+            dict: The new job
+        
+        Raises:
+            HTTPError: 429 when the queue is full
+        """
+        job = {
+            "id": uuid.uuid4().hex,
+            "status": "queued",
+            "file": str(file_path),
+            "model": model_size,
+            "vad": vad,
+            "use_cache": use_cache,
+            "upload": upload,
+            "submitted": time.time(),
+            "started": None,
+            "finished": None,
+            "error": None,
+            "cached": None,
+            "result": None,
+        }
+        try:
+            self.queue.put_nowait(job)
+        except asyncio.QueueFull:
+            if upload:
+                self._remove_upload(job)
+            raise self._queue_full()
+        self.jobs[job["id"]] = job
+        return job
+    
+    @staticmethod
+    def _queue_full():
+        return HTTPError(HTTPStatus.TOO_MANY_REQUESTS, "Job queue is full, retry later",
+                         {"Retry-After": "5"})
+    
+    async def _worker(self):
+        """Take queued jobs one at a time and run them on the process pool"""
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self.queue.get()
+            job["status"] = "running"
+            job["started"] = time.time()
+            try:
+                result, cached = await loop.run_in_executor(
+                    self.executor, _run_job, job["file"], job["model"], job["vad"],
+                    job["use_cache"], self.cache_dir, self.cache_size_mb
+                )
+                job.update(status="done", result=result, cached=cached)
+                print(f"✓ Job {job['id']}: {os.path.basename(job['file'])}")
+            except Exception as e:
+                job.update(status="failed", error=str(e) or type(e).__name__)
+                print(f"✗ Job {job['id']}: {job['error']}")
+            finally:
+                job["finished"] = time.time()
+                if job["upload"]:
+                    self._remove_upload(job)
+                self._forget_old_jobs()
+                self.queue.task_done()
+    
+    def _remove_upload(self, job):
+        try:
+            os.remove(job["file"])
+        except OSError:
+            pass
+    
+    def _forget_old_jobs(self):
+        finished = [job for job in self.jobs.values() if job["finished"] is not None]
+        finished.sort(key=lambda job: job["finished"])
+        for job in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self.jobs[job["id"]]
+    
+    @staticmethod
+    def describe(job):
+        """Public view of a job, without the result"""
+        view = {key: job[key] for key in
+                ("id", "status", "file", "model", "vad", "submitted", "started", "finished",
+                 "error", "cached")}
+        view["result_url"] = f"/jobs/{job['id']}/result"
+        return view
+    
+    async def route(self, method, path, query, headers, body):
+        """
+        Dispatch one request
+        
+        Returns:
+            tuple: (status, content type, body bytes, extra headers)
+        """
+        parts = [part for part in path.split("/") if part]
+        
+        if method == "GET" and parts == ["health"]:
+            return self._json(HTTPStatus.OK, {
+                "ok": True,
+                "workers": self.workers,
+                "queued": self.queue.qsize(),
+                "queue_size": self.queue_size,
+                "running": sum(job["status"] == "running" for job in self.jobs.values()),
+            })
+        
+        if parts == ["jobs"]:
+            if method == "POST":
+                job = await self._submit_from_request(query, headers, body)
+                return self._json(HTTPStatus.ACCEPTED, self.describe(job),
+                                  {"Location": f"/jobs/{job['id']}"})
+            if method == "GET":
+                return self._json(HTTPStatus.OK, {"jobs": [self.describe(job) for job in self.jobs.values()]})
+            raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, f"{method} not allowed on /jobs")
+        
+        if len(parts) in (2, 3) and parts[0] == "jobs":
+            if method != "GET":
+                raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, f"{method} not allowed on {path}")
+            job = self.jobs.get(parts[1])
+            if job is None:
+                raise HTTPError(HTTPStatus.NOT_FOUND, f"No job {parts[1]}")
+            
+            if len(parts) == 2:
+                return self._json(HTTPStatus.OK, self.describe(job))
+            
+            if parts[2] != "result":
+                raise HTTPError(HTTPStatus.NOT_FOUND, f"Unknown resource {path}")
+            if job["status"] == "failed":
+                raise HTTPError(HTTPStatus.CONFLICT, f"Job failed: {job['error']}")
+            if job["status"] != "done":
+                raise HTTPError(HTTPStatus.CONFLICT, f"Job is {job['status']}, poll /jobs/{job['id']}")
+            
+            output_format = query.get("format", ["txt"])[0]
+            if output_format == "txt":
+                return HTTPStatus.OK, "text/plain; charset=utf-8", job["result"]["text"].strip().encode('utf-8'), {}
+            if output_format == "json":
+                return self._json(HTTPStatus.OK, job["result"])
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "format must be txt or json")
+        
+        raise HTTPError(HTTPStatus.NOT_FOUND, f"Unknown resource {path}")
+    
+    def _save_upload(self, body, suffix):
+        """Write an uploaded body to a new file in the upload directory and return its path"""
+        fd, file_path = tempfile.mkstemp(dir=self.upload_dir, suffix=suffix)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(body)
+        return file_path
+    
+    async def _submit_from_request(self, query, headers, body):
+        """Create a job from a JSON body naming a file, or from an uploaded audio body"""
+        content_type = headers.get("content-type", "").split(";")[0].strip()
+        
+        if content_type == "application/json":
+            try:
+                request = json.loads(body or b"{}")
+            except ValueError:
+                raise HTTPError(HTTPStatus.BAD_REQUEST, "Body is not valid JSON")
+            if not isinstance(request, dict):
+                raise HTTPError(HTTPStatus.BAD_REQUEST, "JSON body must be an object")
+            file_path = request.get("file")
+            if not file_path or not isinstance(file_path, str):
+                raise HTTPError(HTTPStatus.BAD_REQUEST, "JSON body needs a \"file\" path")
+            if not os.path.isfile(file_path):
+                raise HTTPError(HTTPStatus.NOT_FOUND, f"File '{file_path}' not found.")
+            options = request
+            upload = False
+        else:
+            if not body:
+                raise HTTPError(HTTPStatus.BAD_REQUEST, "Send a JSON body with a file path, or the audio itself")
+            # The extension tells ffmpeg nothing it cannot sniff, but keeps names readable
+            suffix = Path(query.get("filename", ["upload"])[0]).suffix[:10]
+            # A large upload takes a while to write; other connections keep being served meanwhile
+            loop = asyncio.get_running_loop()
+            file_path = await loop.run_in_executor(None, self._save_upload, body, suffix)
+            options = {key: values[0] for key, values in query.items()}
+            upload = True
+        
+        model_size = options.get("model", "base")
+        if model_size not in MODEL_SIZES:
+            if upload:
+                os.remove(file_path)
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"model must be one of {', '.join(MODEL_SIZES)}")
+        
+        return self.submit(
+            os.path.abspath(file_path), model_size,
+            vad=str(options.get("vad", False)).lower() in ("1", "true", "yes"),
+            use_cache=str(options.get("use_cache", True)).lower() not in ("0", "false", "no"),
+            upload=upload,
+        )
+    
+    @staticmethod
+    def _json(status, payload, headers=None):
+        return status, "application/json", json.dumps(payload, ensure_ascii=False).encode('utf-8'), headers or {}
+    
+    async def handle_connection(self, reader, writer):
+        """Read one HTTP/1.1 request, answer it and close the connection"""
+        try:
+            try:
+                request_line = await reader.readline()
+                method, target, _ = request_line.decode('latin-1').split(" ", 2)
+                headers = {}
+                while True:
+                    line = (await reader.readline()).decode('latin-1').strip()
+                    if not line:
+                        break
+                    name, _, value = line.partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                
+                length = int(headers.get("content-length", 0))
+                if length > self.max_upload_bytes:
+                    raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                                    f"Body larger than {self.max_upload_bytes // (1024 * 1024)} MB")
+                
+                url = urlsplit(target)
+                # Turn a job away before reading its body: an upload can be large and would be thrown away
+                if method.upper() == "POST" and url.path.strip("/") == "jobs" and self.queue.full():
+                    raise self._queue_full()
+                body = await reader.readexactly(length) if length else b""
+                
+                status, content_type, payload, extra = await self.route(
+                    method.upper(), url.path, parse_qs(url.query), headers, body)
+            except HTTPError as e:
+                status, content_type, extra = e.status, "application/json", e.headers
+                payload = json.dumps({"error": e.message}).encode('utf-8')
+            except (ValueError, asyncio.IncompleteReadError):
+                status, content_type, extra = HTTPStatus.BAD_REQUEST, "application/json", {}
+                payload = json.dumps({"error": "Malformed request"}).encode('utf-8')
+            except ConnectionError:
+                raise
+            except Exception as e:
+                # A bug in one handler must still answer the client, not drop the connection
+                print(f"✗ Request failed: {type(e).__name__}: {e}")
+                status, content_type, extra = HTTPStatus.INTERNAL_SERVER_ERROR, "application/json", {}
+                payload = json.dumps({"error": "Internal server error"}).encode('utf-8')
+            
+            head = [f"HTTP/1.1 {status.value} {status.phrase}",
+                    f"Content-Type: {content_type}",
+                    f"Content-Length: {len(payload)}",
+                    "Connection: close"]
+            head += [f"{name}: {value}" for name, value in extra.items()]
+            writer.write(("\r\n".join(head) + "\r\n\r\n").encode('latin-1') + payload)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+    
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """Start the workers and serve HTTP until cancelled"""
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        threads = max(1, (os.cpu_count() or 1) // self.workers)
+        # Spawn rather than fork: torch does not survive forking reliably
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(threads, self.preload),
+        )
+        
+        # Start every worker (and load its models) before accepting jobs
+        print(f"Starting {self.workers} workers ({threads} torch threads each)")
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*[loop.run_in_executor(self.executor, _warm_up)
+                               for _ in range(self.workers)])
+        
+        workers = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        
+        print(f"Transcription API listening on http://{host}:{port} "
+              f"({self.workers} workers, queue of {self.queue_size})")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            for task in workers:
+                task.cancel()
+            self.executor.shutdown(wait=False)
+            if self.own_upload_dir:
+                shutil.rmtree(self.upload_dir, ignore_errors=True)
+            print("Transcription API stopped")
+
+def main():
+    """Main CLI function for the job API"""
+    parser = argparse.ArgumentParser(
+        description="Serve transcription jobs over a local HTTP API",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python transcription_api.py
+  python transcription_api.py --workers 4 --queue-size 100 --port 9000
+  
+  curl -X POST localhost:8765/jobs -H 'Content-Type: application/json' -d '{"file": "/data/call.mp3"}'
+  curl -X POST 'localhost:8765/jobs?filename=call.mp3&model=small' --data-binary @call.mp3
+  curl localhost:8765/jobs/<id>
+  curl 'localhost:8765/jobs/<id>/result?format=json'
+        """
+    )
+    
+    parser.add_argument(
+        "--host",
+        default=DEFAULT_HOST,
+        help=f"Address to listen on (default: {DEFAULT_HOST}, this machine only)"
+    )
+    
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=DEFAULT_PORT,
+        help=f"Port to listen on (default: {DEFAULT_PORT})"
+    )
+    
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Model worker processes, i.e. jobs run at once (default: 1)"
+    )
+    
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=DEFAULT_QUEUE_SIZE,
+        help=f"Jobs allowed to wait before new ones are refused with 429 (default: {DEFAULT_QUEUE_SIZE})"
+    )
+    
+    parser.add_argument(
+        "--models",
+        nargs='+',
+        choices=MODEL_SIZES,
+        default=["base"],
+        help="Models each worker loads at startup; others load on first use (default: base)"
+    )
+    
+    parser.add_argument(
+        "--cache-dir",
+        help="Transcript cache directory (default: ~/.cache/whisper_transcripts)"
+    )
+    
+    parser.add_argument(
+        "--cache-size",
+        type=float,
+        default=DEFAULT_CACHE_SIZE_MB,
+        help=f"Transcript cache size limit in MB (default: {DEFAULT_CACHE_SIZE_MB})"
+    )
+    
+    parser.add_argument(
+        "--max-upload",
+        type=float,
+        default=DEFAULT_MAX_UPLOAD_MB,
+        metavar="MB",
+        help=f"Largest accepted upload (default: {DEFAULT_MAX_UPLOAD_MB})"
+    )
+    
+    args = parser.parse_args()
+    
+    if args.workers < 1 or args.queue_size < 1:
+        parser.error("--workers and --queue-size must be at least 1")
+    
+    api = TranscriptionAPI(
+        workers=args.workers,
+        queue_size=args.queue_size,
+        preload=args.models,
+        cache_dir=args.cache_dir,
+        cache_size_mb=args.cache_size,
+        max_upload_mb=args.max_upload,
+    )
+    
+    # Let SIGTERM (service managers, kill) go through the normal cleanup path
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    
+    try:
+        asyncio.run(api.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -6,12 +6,25 @@ A GUI application for transcribing MP3 and WAV audio files using OpenAI Whisper
 
 import tkinter as tk
 from tkinter import filedialog, messagebox, scrolledtext, ttk
-import whisper
 import threading
 import os
 import sys
 from pathlib import Path
 import time
+from segment_stream import PCMWindowReader, iter_segments
+from model_registry import get_registry, quantized_name
+from output_writers import FORMATS, write_output
+
+# Save-as dialog entries, in the order offered
+SAVE_FILETYPES = [
+    ('Text files', '*.txt'),
+    ('SubRip captions', '*.srt'),
+    ('WebVTT captions', '*.vtt'),
+    ('Tab-separated segments', '*.tsv'),
+    ('JSON (full result)', '*.json'),
+    ('JSON Lines segments', '*.jsonl'),
+    ('All files', '*.*'),
+]
 
 class TranscriptionApp:
     def __init__(self, root):
@@ -22,10 +35,17 @@ class TranscriptionApp:
         # Initialize Whisper model
         self.model = None
         self.model_size = tk.StringVar(value="base")
+        self.quantize = tk.BooleanVar(value=False)
+        
+        # Segments of the last transcription, for timed formats in Save as
+        self.segments = []
         
         # Create GUI elements
         self.setup_ui()
         
+        # Import Whisper (and torch) once the window is on screen
+        self.root.after_idle(self.import_libraries)
+        
     def setup_ui(self):
         """Setup the user interface"""
         # Main frame
@@ -49,6 +69,12 @@ class TranscriptionApp:
                                   values=["tiny", "base", "small", "medium", "large"], 
                                   state="readonly", width=15)
         model_combo.grid(row=1, column=1, sticky=tk.W, pady=5)
+        model_combo.bind("<<ComboboxSelected>>", self.on_model_selected)
+        
+        # Int8 quantization for CPU-only machines
+        quantize_check = ttk.Checkbutton(main_frame, text="Int8 (faster on CPU)",
+                                         variable=self.quantize, command=self.on_model_selected)
+        quantize_check.grid(row=1, column=1, sticky=tk.E, pady=5)
         
         # Load model button
         load_model_btn = ttk.Button(main_frame, text="Load Model", 
@@ -108,15 +134,44 @@ class TranscriptionApp:
                               command=self.clear_transcript)
         clear_btn.pack(side=tk.LEFT, padx=5)
         
+    def import_libraries(self):
+        """Import Whisper in the background so the window appears straight away"""
+        importing = "Loading speech recognition libraries..."
+        
+        def show_ready(message):
+            # Leave the status alone if the user has already moved on (e.g. loading a model)
+            if self.status_var.get() == importing:
+                self.status_var.set(message)
+        
+        def import_in_thread():
+            try:
+                import whisper
+                self.root.after(0, show_ready, "Select a model and audio file to begin")
+            except Exception as e:
+                self.root.after(0, show_ready, f"Failed to import Whisper: {str(e)}")
+        
+        self.status_var.set(importing)
+        thread = threading.Thread(target=import_in_thread)
+        thread.daemon = True
+        thread.start()
+    
+    def selected_model(self):
+        """Registry name of the chosen model size and quantization"""
+        return quantized_name(self.model_size.get(), "int8" if self.quantize.get() else None)
+    
     def load_model(self):
         """Load the selected Whisper model"""
+        model_size = self.selected_model()
+        
         def load_in_thread():
             try:
-                self.status_var.set(f"Loading {self.model_size.get()} model...")
-                self.progress.start()
-                self.model = whisper.load_model(self.model_size.get())
+                # Models already in the registry come back instantly
+                if not get_registry().is_loaded(model_size):
+                    self.status_var.set(f"Loading {model_size} model...")
+                    self.progress.start()
+                self.model = get_registry().get(model_size)
                 self.progress.stop()
-                self.status_var.set(f"Model '{self.model_size.get()}' loaded successfully")
+                self.status_var.set(f"Model '{model_size}' loaded successfully")
                 self.check_ready_state()
             except Exception as e:
                 self.progress.stop()
@@ -128,6 +183,11 @@ class TranscriptionApp:
         thread.daemon = True
         thread.start()
     
+    def on_model_selected(self, event=None):
+        """Switch straight away when the chosen model is already loaded"""
+        if get_registry().is_loaded(self.selected_model()):
+            self.load_model()
+    
     def browse_file(self):
         """Browse for audio file"""
         filetypes = (
@@ -169,14 +229,19 @@ class TranscriptionApp:
                 self.transcribe_btn.config(state="disabled")
                 
                 # Clear previous transcript
-                self.transcript_text.delete(1.0, tk.END)
+                self.root.after(0, self.transcript_text.delete, 1.0, tk.END)
+                self.segments = []
                 
-                # Transcribe
-                result = self.model.transcribe(file_path)
-                transcript = result["text"].strip()
-                
-                # Display transcript
-                self.transcript_text.insert(tk.END, transcript)
+                # Transcribe window by window, showing each segment as it arrives.
+                # Tk widgets may only be touched from the main thread.
+                first = True
+                for segment in iter_segments(self.model, PCMWindowReader(file_path)):
+                    self.segments.append(segment)
+                    text = segment["text"].strip()
+                    if not text:
+                        continue
+                    self.root.after(0, self.append_transcript, text if first else " " + text)
+                    first = False
                 
                 self.progress.stop()
                 self.status_var.set(f"Transcription completed for: {os.path.basename(file_path)}")
@@ -193,6 +258,11 @@ class TranscriptionApp:
         thread.daemon = True
         thread.start()
     
+    def append_transcript(self, text):
+        """Append streamed text to the transcript box (main thread only)"""
+        self.transcript_text.insert(tk.END, text)
+        self.transcript_text.see(tk.END)
+    
     def save_transcript(self):
         """Save transcript to file"""
         transcript = self.transcript_text.get(1.0, tk.END).strip()
@@ -203,13 +273,22 @@ class TranscriptionApp:
         filename = filedialog.asksaveasfilename(
             title='Save transcript',
             defaultextension='.txt',
-            filetypes=[('Text files', '*.txt'), ('All files', '*.*')]
+            filetypes=SAVE_FILETYPES
         )
         
         if filename:
+            # The format follows the chosen extension; anything unknown is saved as text
+            output_format = Path(filename).suffix.lower().lstrip('.')
+            if output_format not in FORMATS:
+                output_format = "txt"
+            if output_format != "txt" and not self.segments:
+                messagebox.showwarning("Warning", "Timed formats need a transcription from this session")
+                return
+            
+            # The text box may have been edited, so plain text comes from there
+            result = {"text": transcript, "segments": self.segments}
             try:
-                with open(filename, 'w', encoding='utf-8') as f:
-                    f.write(transcript)
+                write_output(filename, output_format, result)
                 messagebox.showinfo("Success", f"Transcript saved to: {filename}")
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to save transcript: {str(e)}")
@@ -228,6 +307,7 @@ class TranscriptionApp:
     def clear_transcript(self):
         """Clear the transcript text"""
         self.transcript_text.delete(1.0, tk.END)
+        self.segments = []
         self.status_var.set("Transcript cleared")
 
 def main():
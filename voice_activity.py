@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Voice Activity Detection
+Energy and zero-crossing based speech detection used to skip silence before transcription
+"""
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+def detect_speech(audio, sample_rate=SAMPLE_RATE, frame_ms=30, threshold_db=None,
+                  min_speech_ms=250, min_silence_ms=500, padding_ms=200):
+    """
+    Find the speech regions of a waveform
+    
+    Args:
+        audio (np.ndarray): Mono float32 waveform
+        sample_rate (int): Sample rate of the waveform
+        frame_ms (int): Analysis frame length in milliseconds
+        threshold_db (float): Energy threshold; derived from the noise floor if not given
+        min_speech_ms (int): Shorter bursts of energy are ignored
+        min_silence_ms (int): Shorter pauses are kept inside the surrounding speech
+        padding_ms (int): Audio kept on each side of a region so words are not clipped
+    
+    Returns:
+        list: (start_sample, end_sample) pairs in ascending order
+    """
+    audio = np.asarray(audio, dtype=np.float32)
+    frame_len = int(sample_rate * frame_ms / 1000)
+    num_frames = len(audio) // frame_len
+    if num_frames == 0:
+        return []
+    
+    frames = audio[:num_frames * frame_len].reshape(num_frames, frame_len)
+    
+    energy_db = 10.0 * np.log10(np.mean(frames ** 2, axis=1) + 1e-10)
+    signs = np.signbit(frames)
+    zcr = np.mean(signs[:, 1:] != signs[:, :-1], axis=1)
+    
+    if threshold_db is None:
+        # Sit comfortably above the noise floor, but never treat near-silence as speech
+        noise_floor = np.percentile(energy_db, 10)
+        threshold_db = max(noise_floor + 10.0, -50.0)
+    
+    # Voiced speech is loud with a moderate zero-crossing rate; quieter frames
+    # still count when their crossing rate looks like unvoiced consonants.
+    # Very high crossing rates are hiss or broadband noise.
+    voiced = (energy_db > threshold_db) & (zcr < 0.5)
+    unvoiced = (energy_db > threshold_db - 6.0) & (zcr > 0.1) & (zcr < 0.5)
+    is_speech = voiced | unvoiced
+    
+    regions = _runs(is_speech)
+    
+    # Merge regions separated by short pauses
+    min_gap = int(np.ceil(min_silence_ms / frame_ms))
+    merged = []
+    for start, end in regions:
+        if merged and start - merged[-1][1] < min_gap:
+            merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    
+    # Drop clicks and other bursts too short to be speech
+    min_frames = int(np.ceil(min_speech_ms / frame_ms))
+    merged = [(start, end) for start, end in merged if end - start >= min_frames]
+    
+    # Convert to samples, pad, and merge regions the padding made overlap
+    pad = int(sample_rate * padding_ms / 1000)
+    speech = []
+    for start, end in merged:
+        start = max(0, start * frame_len - pad)
+        end = min(len(audio), end * frame_len + pad)
+        if speech and start <= speech[-1][1]:
+            speech[-1] = (speech[-1][0], end)
+        else:
+            speech.append((start, end))
+    
+    return speech
+
+def frame_energy_db(audio, sample_rate=SAMPLE_RATE, frame_ms=30):
+    """Return the log energy (dB) of consecutive non-overlapping frames"""
+    audio = np.asarray(audio, dtype=np.float32)
+    frame_len = int(sample_rate * frame_ms / 1000)
+    num_frames = len(audio) // frame_len
+    frames = audio[:num_frames * frame_len].reshape(num_frames, frame_len)
+    return 10.0 * np.log10(np.mean(frames ** 2, axis=1) + 1e-10)
+
+def _runs(mask):
+    """Return (start, end) index pairs of the True runs in a boolean array"""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    return list(zip(starts.tolist(), ends.tolist()))
+
+def extract_speech(audio, regions):
+    """Concatenate the speech regions of a waveform"""
+    if not regions:
+        return np.zeros(0, dtype=np.float32)
+    return np.concatenate([audio[start:end] for start, end in regions]).astype(np.float32)
+
+def remap_timestamps(result, regions, sample_rate=SAMPLE_RATE):
+    """
+    Map segment (and word) timestamps from the speech-only audio back to the original
+    
+    Args:
+        result (dict): Whisper result for the concatenated speech regions
+        regions (list): Regions passed to extract_speech
+        sample_rate (int): Sample rate of the waveform
+    """
+    if not regions:
+        return result
+    
+    starts = np.array([start for start, _ in regions], dtype=np.float64) / sample_rate
+    lengths = np.array([end - start for start, end in regions], dtype=np.float64) / sample_rate
+    # Where each region begins in the speech-only timeline
+    offsets = np.concatenate(([0.0], np.cumsum(lengths)[:-1]))
+    
+    def to_original(t):
+        i = max(0, int(np.searchsorted(offsets, t, side='right')) - 1)
+        return round(float(starts[i] + (t - offsets[i])), 3)
+    
+    for segment in result.get("segments", []):
+        segment["start"] = to_original(segment["start"])
+        segment["end"] = to_original(segment["end"])
+        for word in segment.get("words", []):
+            word["start"] = to_original(word["start"])
+            word["end"] = to_original(word["end"])
+    
+    return result
+
+def transcribe_speech_only(model, audio, sample_rate=SAMPLE_RATE, **options):
+    """
+    Transcribe only the speech regions of a waveform
+    
+    Args:
+        model: Loaded Whisper model
+        audio (np.ndarray): Mono float32 waveform at 16 kHz
+        sample_rate (int): Sample rate of the waveform
+        **options: Passed through to model.transcribe
+    
+    Returns:
+        dict: Whisper result on the original timeline, with a "vad" entry giving
+              the total, speech and skipped seconds
+    """
+    regions = detect_speech(audio, sample_rate)
+    
+    if regions:
+        result = model.transcribe(extract_speech(audio, regions), **options)
+        remap_timestamps(result, regions, sample_rate)
+    else:
+        result = {"text": "", "segments": [], "language": options.get("language")}
+    
+    result["vad"] = speech_stats(len(audio), regions, sample_rate)
+    return result
+
+def speech_stats(num_samples, regions, sample_rate=SAMPLE_RATE):
+    """Total, speech and skipped seconds of a waveform with the given speech regions"""
+    total = num_samples / sample_rate
+    speech = sum(end - start for start, end in regions) / sample_rate
+    return {
+        "total_seconds": round(total, 2),
+        "speech_seconds": round(speech, 2),
+        "skipped_seconds": round(total - speech, 2),
+    }
+
+def describe_skipped(vad_stats):
+    """Short human-readable report of how much audio VAD skipped"""
+    total = vad_stats["total_seconds"]
+    skipped = vad_stats["skipped_seconds"]
+    percent = 100.0 * skipped / total if total else 0.0
+    return f"skipped {skipped:.1f}s of {total:.1f}s as silence ({percent:.0f}%)"
+
+def transcribe_file(model, file_path, vad=False, **options):
+    """
+    Transcribe an audio file, optionally skipping silence first
+    
+    Args:
+        model: Loaded Whisper model
+        file_path (str): Path to the audio file
+        vad (bool): Run voice activity detection and transcribe only speech
+        **options: Passed through to model.transcribe
+    """
+    if not vad:
+        return model.transcribe(str(file_path), **options)
+    
+    import whisper
+    audio = whisper.load_audio(str(file_path))
+    return transcribe_speech_only(model, audio, **options)
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Watch Folder
+Transcribe audio files as they arrive in a directory tree, keeping the model loaded
+"""
+
+import os
+import time
+import queue
+import threading
+from pathlib import Path
+from batch_transcribe import AUDIO_EXTENSIONS
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    WATCHDOG_AVAILABLE = False
+
+DEFAULT_POLL_INTERVAL = 2.0
+DEFAULT_SETTLE_SECONDS = 2.0
+DEFAULT_QUEUE_SIZE = 100
+
+def is_audio_file(path):
+    """Whether a path has one of the supported audio extensions"""
+    return Path(path).suffix.lower() in AUDIO_EXTENSIONS
+
+class FolderWatcher:
+    def __init__(self, folder, transcriber, output_dir=None, poll_interval=DEFAULT_POLL_INTERVAL,
+                 settle_seconds=DEFAULT_SETTLE_SECONDS, queue_size=DEFAULT_QUEUE_SIZE,
+                 use_polling=False):
+        """
+        Initialize a watcher for a directory tree
+        
+        Args:
+            folder (str): Directory to watch, including subdirectories
+            transcriber (BatchTranscriber): Single-process transcriber with its model loaded
+            output_dir (str): Directory for transcripts, mirroring the watched tree
+                              (default: next to each audio file)
+            poll_interval (float): Seconds between scans when polling
+            settle_seconds (float): How long a file must stop changing before it is taken
+            queue_size (int): Files waiting for the model before detection pauses
+            use_polling (bool): Poll even if filesystem events (watchdog) are available
+        """
+        self.folder = Path(folder).resolve()
+        self.transcriber = transcriber
+        self.output_dir = Path(output_dir) if output_dir else None
+        self.poll_interval = poll_interval
+        self.settle_seconds = settle_seconds
+        self.use_polling = use_polling or not WATCHDOG_AVAILABLE
+        
+        self.work_queue = queue.Queue(maxsize=queue_size)
+        # Files seen changing: path -> ((size, mtime), time that stat was first seen)
+        self.candidates = {}
+        self.queued = set()
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.processed = 0
+        self.failed = 0
+    
+    def output_for(self, audio_file):
+        """Transcript path for an audio file"""
+        audio_file = Path(audio_file)
+        name = self.transcriber.output_name(audio_file)
+        if self.output_dir is None:
+            return audio_file.parent / name
+        return self.output_dir / audio_file.parent.relative_to(self.folder) / name
+    
+    def notice(self, path):
+        """Note that a file appeared or changed; it is queued once it stops changing"""
+        path = Path(path)
+        if not is_audio_file(path):
+            return
+        with self.lock:
+            # Restart the settle timer on every change
+            self.candidates.pop(path, None)
+            self.candidates[path] = (None, time.monotonic())
+    
+    def _scan(self, snapshot):
+        """Walk the tree once and notice files that are new or changed since the last walk"""
+        current = {}
+        for dirpath, _, filenames in os.walk(self.folder):
+            for filename in filenames:
+                path = Path(dirpath) / filename
+                if not is_audio_file(path):
+                    continue
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                current[path] = (stat.st_size, stat.st_mtime)
+                if snapshot.get(path) != current[path]:
+                    self.notice(path)
+        return current
+    
+    def _poll_loop(self):
+        """Detection by periodically walking the tree"""
+        snapshot = {}
+        while not self.stop_event.is_set():
+            snapshot = self._scan(snapshot)
+            self.stop_event.wait(self.poll_interval)
+    
+    def _settle_loop(self):
+        """Move files that have stopped changing from the candidates to the work queue"""
+        while not self.stop_event.is_set():
+            now = time.monotonic()
+            ready = []
+            
+            with self.lock:
+                for path, (last_stat, since) in list(self.candidates.items()):
+                    try:
+                        stat = path.stat()
+                        current = (stat.st_size, stat.st_mtime)
+                    except OSError:
+                        # Deleted or renamed before it settled
+                        del self.candidates[path]
+                        continue
+                    
+                    if current != last_stat:
+                        self.candidates[path] = (current, now)
+                    elif (current[0] > 0 and now - since >= self.settle_seconds
+                          and path not in self.queued):
+                        # A file that changed while queued waits here until it is taken
+                        del self.candidates[path]
+                        self.queued.add(path)
+                        ready.append(path)
+            
+            for path in ready:
+                # Blocks while the queue is full, so a flood of files cannot use unbounded memory
+                while not self.stop_event.is_set():
+                    try:
+                        self.work_queue.put(path, timeout=0.5)
+                        break
+                    except queue.Full:
+                        continue
+            
+            self.stop_event.wait(min(0.5, self.settle_seconds / 2 or 0.1))
+    
+    def _start_events(self):
+        """Detection by filesystem events (inotify on Linux) through watchdog"""
+        watcher = self
+        
+        class Handler(FileSystemEventHandler):
+            def on_created(self, event):
+                if not event.is_directory:
+                    watcher.notice(event.src_path)
+            
+            def on_modified(self, event):
+                if not event.is_directory:
+                    watcher.notice(event.src_path)
+            
+            def on_moved(self, event):
+                if not event.is_directory:
+                    watcher.notice(event.dest_path)
+        
+        observer = Observer()
+        observer.schedule(Handler(), str(self.folder), recursive=True)
+        observer.start()
+        return observer
+    
+    def _transcribe(self, audio_file):
+        """Transcribe one settled file unless the journal shows it is already done"""
+        output_file = self.output_for(audio_file)
+        if self.transcriber.resume and self.transcriber._is_done(audio_file, output_file):
+            return
+        
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        ok, info = self.transcriber.transcribe_job(audio_file, output_file)
+        if self.transcriber.store is not None:
+            # Files arrive one at a time, so commit each straight away
+            self.transcriber.store.flush()
+        stamp = time.strftime('%H:%M:%S')
+        if ok:
+            self.processed += 1
+            print(f"[{stamp}] ✓ {audio_file.name} -> {self.transcriber._destination(output_file)}{self.transcriber._describe(info)}")
+        else:
+            self.failed += 1
+            print(f"[{stamp}] ✗ {audio_file.name}: {info}")
+    
+    def run(self):
+        """Watch and transcribe until interrupted with Ctrl+C"""
+        if not self.folder.is_dir():
+            print(f"Error: Folder '{self.folder}' not found.")
+            return
+        
+        method = "polling" if self.use_polling else "filesystem events"
+        print(f"Watching {self.folder} for audio files ({method})")
+        print(f"Output directory: {self.output_dir or 'Same as input files'}")
+        print("Press Ctrl+C to stop")
+        print("-" * 50)
+        
+        threads = [threading.Thread(target=self._settle_loop, daemon=True)]
+        observer = None
+        if self.use_polling:
+            threads.append(threading.Thread(target=self._poll_loop, daemon=True))
+        else:
+            observer = self._start_events()
+            # Files already present (or added while stopped) are picked up once;
+            # anything the journal records as done is skipped
+            self._scan({})
+        for thread in threads:
+            thread.start()
+        
+        try:
+            while True:
+                try:
+                    audio_file = self.work_queue.get(timeout=1)
+                except queue.Empty:
+                    continue
+                with self.lock:
+                    self.queued.discard(audio_file)
+                self._transcribe(audio_file)
+        except KeyboardInterrupt:
+            print("\nStopping watcher...")
+        finally:
+            self.stop_event.set()
+            if observer is not None:
+                observer.stop()
+                observer.join()
+            for thread in threads:
+                thread.join(timeout=2)
+        
+        print(f"Transcribed {self.processed} files, {self.failed} failed")